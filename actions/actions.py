@@ -1,127 +1,129 @@
 # Custom Rasa actions for logic
 import os
-import sqlite3
-import requests
 import json
 from typing import Any, Text, Dict, List
 from rasa_sdk import Action, Tracker
 from rasa_sdk.executor import CollectingDispatcher
 from rasa_sdk.events import SlotSet, AllSlotsReset
-import nltk
-from nltk.stem import WordNetLemmatizer
-from nltk.corpus import stopwords
-from nltk.tokenize import word_tokenize
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.metrics.pairwise import cosine_similarity
-from reportlab.pdfgen import canvas
-from reportlab.lib.pagesizes import letter
-from reportlab.lib.styles import getSampleStyleSheet
-from reportlab.platypus import Paragraph, Spacer
 from dotenv import load_dotenv
+from .career_index import get_career_index
+from .catalog import get_catalog
+from . import sidecar
+from .content_pool import get_content_pool, preload_content_pool, prompt_for
+from .embeddings import preload_embedding_matcher, rank_profile
+from .inverted_index import Recommendation, get_inverted_index
+from .llm_client import LLMError, get_llm_client
+from .metrics import instrument_action, span, timed
+from .preprocessing import get_preprocessor
+from .resources import preload_indexes
+from .reports import get_report_renderer, status_url as report_status_url
+from .skills import get_skill_taxonomy
+from .store import get_session_store
+from .streaming import start_stream
 
 # --- Initial Setup ---
+# NLTK data is read from the pre-baked nltk_data/ directory (see resources.py) and nltk,
+# sklearn and reportlab are only imported on first use, so importing this module is cheap.
+# The preprocessor and career indexes are built in the background; /ready waits for them.
 load_dotenv()
-nltk.download('punkt', quiet=True)
-nltk.download('stopwords', quiet=True)
-nltk.download('wordnet', quiet=True)
-
-lemmatizer = WordNetLemmatizer()
-stop_words = set(stopwords.words('english'))
 GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
-
-# --- Database Setup ---
-def init_db():
-    """Initializes the SQLite database and the sessions table."""
-    conn = sqlite3.connect('career_counsellor.db')
-    c = conn.cursor()
-    c.execute('''
-        CREATE TABLE IF NOT EXISTS sessions (
-            session_id TEXT PRIMARY KEY,
-            name TEXT,
-            interests TEXT,
-            strengths TEXT,
-            subjects TEXT,
-            resume_keywords TEXT,
-            recommended_career TEXT,
-            report_path TEXT
-        )
-    ''')
-    conn.commit()
-    conn.close()
-
-init_db()
-
-# --- Career Data (Can be expanded) ---
-CAREER_DATA = {
-    'Tech / Data Science': {
-        'keywords': ['python', 'java', 'data', 'analysis', 'machine learning', 'ai', 'software', 'developer', 'engineer', 'code', 'computer', 'statistics', 'math', 'backend', 'frontend', 'cloud'],
-        'description': 'Careers in this field involve designing, developing, and applying technology and data to solve complex problems. Roles include Software Engineer, Data Scientist, AI Specialist, and Cloud Architect.',
-        'courses': [
-            {'title': 'Google Data Analytics Professional Certificate', 'url': 'https://www.coursera.org/professional-certificates/google-data-analytics'},
-            {'title': 'Meta Back-End Developer Professional Certificate', 'url': 'https://www.coursera.org/professional-certificates/meta-back-end-developer'}
-        ]
-    },
-    'Arts / Design': {
-        'keywords': ['creative', 'art', 'design', 'music', 'drawing', 'painting', 'visual', 'style', 'photoshop', 'illustrator', 'ui', 'ux', 'figma'],
-        'description': 'This domain is for creative individuals who enjoy expressing themselves visually or through performance. Careers include Graphic Designer, UX/UI Designer, Artist, and Animator.',
-        'courses': [
-            {'title': 'Google UX Design Professional Certificate', 'url': 'https://www.coursera.org/professional-certificates/google-ux-design'},
-            {'title': 'CalArts Graphic Design Specialization', 'url': 'https://www.coursera.org/specializations/graphic-design'}
-        ]
-    },
-    'Commerce / Management': {
-        'keywords': ['business', 'management', 'finance', 'economics', 'marketing', 'leadership', 'sales', 'trade', 'commerce', 'accounts'],
-        'description': 'This field focuses on business operations, finance, and leadership. Potential careers are Business Analyst, Marketing Manager, Financial Advisor, and Entrepreneur.',
-        'courses': [
-            {'title': 'Introduction to Marketing by Wharton', 'url': 'https://www.coursera.org/learn/wharton-marketing'},
-            {'title': 'Financial Markets by Yale', 'url': 'https://www.coursera.org/learn/financial-markets-global'}
-        ]
-    },
-    'Medicine / Biology': {
-        'keywords': ['biology', 'chemistry', 'doctor', 'nurse', 'health', 'medical', 'research', 'genetics', 'anatomy', 'patient', 'care'],
-        'description': 'For those passionate about health, science, and helping others. Careers range from Doctor and Nurse to Medical Researcher and Pharmacist.',
-        'courses': [
-            {'title': 'Anatomy Specialization by University of Michigan', 'url': 'https://www.coursera.org/specializations/anatomy'},
-            {'title': 'Introduction to the Biology of Cancer', 'url': 'https://www.coursera.org/learn/cancer'}
-        ]
-    },
-    'Law / Social Sciences': {
-        'keywords': ['law', 'justice', 'social', 'history', 'psychology', 'debate', 'argue', 'rights', 'policy', 'government', 'sociology'],
-        'description': 'This domain is for those interested in society, human behavior, and justice. Careers include Lawyer, Psychologist, Social Worker, and Policy Analyst.',
-        'courses': [
-            {'title': 'Introduction to Psychology by Yale', 'url': 'https://www.coursera.org/learn/introduction-psychology'},
-            {'title': 'A Law Student\'s Toolkit by Yale', 'url': 'https://www.coursera.org/learn/law-student'}
-        ]
-    }
-}
+CAREER_TOP_K = int(os.getenv("CAREER_TOP_K", "3"))
+# "tfidf" (keyword matching) or "embedding" (local sentence encoder, see embeddings.py)
+CAREER_MATCHER = os.getenv("CAREER_MATCHER", "tfidf")
+LLM_STREAMING = os.getenv("LLM_STREAMING", "true").lower() in ("1", "true", "yes")
+# Skill gaps come from the local taxonomy (skills.py); set this to also merge in Gemini's skill list.
+SKILL_GAP_LLM_ENRICH = os.getenv("SKILL_GAP_LLM_ENRICH", "false").lower() in ("1", "true", "yes")
+preload_indexes()
+# Day-in-the-life texts and first interview questions are served from a precomputed pool (content_pool.py).
+preload_content_pool()
+if CAREER_MATCHER == "embedding":
+    preload_embedding_matcher()
+# Serve /ready, /metrics, streams and report status from start-up (ACTION_SIDECAR_ENABLED=false to disable).
+sidecar.ensure_started()
+
+# --- Persistence ---
+# Session profiles are written through actions.store (pooled, WAL-mode SQLite with group commit).
+
+# --- Career Data ---
+# Domains, keywords, descriptions and courses live in the on-disk catalog (actions/data/careers.jsonl).
+# Extend the catalog file (or point CAREER_CATALOG_PATH at a larger one) to add careers.
 
 # --- Helper Functions ---
+@timed("preprocess")
 def preprocess_text(text: str) -> str:
     """Cleans and preprocesses user input text."""
-    if not isinstance(text, str): return ""
-    tokens = word_tokenize(text.lower())
-    lemmatized_tokens = [lemmatizer.lemmatize(w) for w in tokens if w.isalpha() and w not in stop_words]
-    return " ".join(lemmatized_tokens)
-
-def call_gemini_api(prompt: str) -> str:
-    """Calls the Google Gemini API for generative tasks."""
+    return get_preprocessor().process(text)
+
+@timed("preprocess_profile")
+def processed_profile_text(tracker: Tracker) -> str:
+    """Preprocessed interests, strengths, subjects and resume of the current conversation."""
+    preprocessor = get_preprocessor()
+    # The resume is normalised once per conversation; the short answers are batched together.
+    return " ".join(preprocessor.process_many([
+        tracker.get_slot("user_interests"),
+        tracker.get_slot("user_strengths"),
+        tracker.get_slot("user_subjects"),
+    ]) + [preprocessor.for_session(tracker.sender_id, "resume_keywords", tracker.get_slot("resume_keywords"))])
+
+def raw_profile_text(tracker: Tracker) -> str:
+    """The conversation's profile slots as written, for the semantic matcher."""
+    slots = ("user_interests", "user_strengths", "user_subjects", "resume_keywords")
+    return ". ".join(tracker.get_slot(s) for s in slots if tracker.get_slot(s))
+
+@timed("career_ranking")
+async def rank_careers(processed_profile: str, raw_profile: str = "", top_k: int = CAREER_TOP_K) -> List[Recommendation]:
+    """Top-k career domains for a profile, with the keywords behind each score."""
+    inverted = get_inverted_index(get_catalog(), preprocess_text)
+    if CAREER_MATCHER == "embedding":
+        try:
+            matches = await rank_profile(raw_profile or processed_profile, top_k)
+        except Exception as e:
+            # A missing or broken encoder must not take recommendations down with it.
+            print(f"Semantic matching failed, falling back to TF-IDF: {e}")
+        else:
+            # Rank semantically, but still explain with whichever keywords overlap.
+            explanations = inverted.explain(processed_profile, [domain for domain, _ in matches])
+            return [Recommendation(domain, score, explanations.get(domain, [])) for domain, score in matches]
+    return inverted.search(processed_profile, top_k)
+
+def format_match_terms(match: Recommendation, limit: int = 5) -> str:
+    """Comma-separated keywords that contributed most to a match."""
+    return ", ".join(term for term, _ in match.terms[:limit])
+
+@timed("gemini")
+async def call_gemini_api(prompt: str, use_cache: bool = True) -> str:
+    """Calls the Google Gemini API for generative tasks through the shared async client."""
     if not GEMINI_API_KEY:
         return "Generative AI feature is not configured. (API key missing)"
-    
-    api_url = f"https://generativelanguage.googleapis.com/v1beta/models/gemini-pro:generateContent?key={GEMINI_API_KEY}"
-    headers = {'Content-Type': 'application/json'}
-    data = {"contents": [{"parts": [{"text": prompt}]}]}
-    
+
+    try:
+        return await get_llm_client().generate(prompt, use_cache=use_cache)
+    except LLMError as e:
+        print(f"Gemini API Error: {e}")
+        return f"Error connecting to the Generative AI model: {e}"
+
+@timed("gemini")
+async def generate_for_pool(kind: str, career: str) -> str:
+    """Live answer for a content-pool miss; it joins the pool, so no background refresh is needed."""
+    if not GEMINI_API_KEY:
+        return await call_gemini_api(prompt_for(kind, career))
     try:
-        response = requests.post(api_url, headers=headers, json=data, timeout=60)
-        response.raise_for_status()
-        return response.json()['candidates'][0]['content']['parts'][0]['text']
-    except requests.exceptions.RequestException as e:
+        return await get_content_pool().generate(kind, career)
+    except LLMError as e:
         print(f"Gemini API Error: {e}")
         return f"Error connecting to the Generative AI model: {e}"
-    except (KeyError, IndexError) as e:
-        print(f"Gemini API Response Error: {response.text}")
-        return "Could not parse the response from the Generative AI model."
+
+@timed("gemini_skills")
+async def llm_required_skills(career: str) -> List[str]:
+    """Optional Gemini enrichment of a career's skill profile, mapped onto the local taxonomy."""
+    prompt = f"List the top 15 most important technical skills and soft skills for a '{career}' role, based on current industry standards. Format as a single comma-separated string. Example: Python, SQL, Communication, Teamwork, Project Management."
+    try:
+        skills_str = await get_llm_client().generate(prompt)
+    except LLMError as e:
+        print(f"Gemini API Error: {e}")
+        return []
+    taxonomy = get_skill_taxonomy()
+    return [taxonomy.canonicalize(skill) for skill in skills_str.split(',') if skill.strip()]
 
 # --- Rasa Actions ---
 
@@ -130,9 +132,11 @@ class ActionStoreName(Action):
     def name(self) -> Text:
         return "action_store_name"
 
+    @instrument_action
     def run(self, dispatcher: CollectingDispatcher, tracker: Tracker, domain: Dict[Text, Any]) -> List[Dict[Text, Any]]:
         name = tracker.latest_message.get('text')
         dispatcher.utter_message(response="utter_ask_interest", name=name)
+        get_session_store().upsert(tracker.sender_id, name=name)
         return [SlotSet("name", name)]
 
 class ActionSuggestCareer(Action):
@@ -140,39 +144,41 @@ class ActionSuggestCareer(Action):
     def name(self) -> Text:
         return "action_suggest_career"
 
-    def run(self, dispatcher: CollectingDispatcher, tracker: Tracker, domain: Dict[Text, Any]) -> List[Dict[Text, Any]]:
-        full_profile_text = " ".join([
-            tracker.get_slot("user_interests") or "",
-            tracker.get_slot("user_strengths") or "",
-            tracker.get_slot("user_subjects") or "",
-            preprocess_text(tracker.get_slot("resume_keywords") or "")
-        ])
-        processed_profile = preprocess_text(full_profile_text)
+    @instrument_action
+    async def run(self, dispatcher: CollectingDispatcher, tracker: Tracker, domain: Dict[Text, Any]) -> List[Dict[Text, Any]]:
+        processed_profile = processed_profile_text(tracker)
 
         if not processed_profile.strip():
             dispatcher.utter_message(text="I need more information to make a recommendation. Could you tell me about your interests?")
             return []
 
-        scores = {domain: 0 for domain in CAREER_DATA.keys()}
-        vectorizer = TfidfVectorizer()
-        for domain_name, data in CAREER_DATA.items():
-            domain_keywords = " ".join(data['keywords'])
-            corpus = [processed_profile, domain_keywords]
-            tfidf_matrix = vectorizer.fit_transform(corpus)
-            scores[domain_name] = cosine_similarity(tfidf_matrix[0:1], tfidf_matrix[1:2])[0][0] * 100
+        catalog = get_catalog()
+        ranking = await rank_careers(processed_profile, raw_profile_text(tracker))
+        # No keyword overlap at all: fall back to the first domain, as the max over all-zero scores did.
+        recommended_career = ranking[0].domain if ranking else get_career_index(catalog, preprocess_text).domains[0]
 
-        recommended_career = max(scores, key=scores.get)
-        
-        career_info = CAREER_DATA[recommended_career]
+        career_info = catalog.get(recommended_career)
         response = f"### Based on your profile, I recommend exploring **{recommended_career}**!\n\n"
         response += f"**About this field:**\n{career_info['description']}\n\n"
         response += "**Suggested Online Courses to Explore:**\n"
         for course in career_info['courses']:
             response += f"- [{course['title']}]({course['url']})\n"
-        
+        if ranking:
+            response += "\n**How your profile matched:**\n"
+            for i, match in enumerate(ranking, 1):
+                response += f"{i}. **{match.domain}** ({match.score:.0f}% match): {format_match_terms(match)}\n"
+
         dispatcher.utter_message(text=response)
         dispatcher.utter_message(response="utter_now_what")
-        
+
+        get_session_store().upsert(
+            tracker.sender_id,
+            interests=tracker.get_slot("user_interests"),
+            strengths=tracker.get_slot("user_strengths"),
+            subjects=tracker.get_slot("user_subjects"),
+            resume_keywords=tracker.get_slot("resume_keywords"),
+            recommended_career=recommended_career,
+        )
         return [SlotSet("recommended_career", recommended_career)]
 
 class ActionGenerateReport(Action):
@@ -180,7 +186,8 @@ class ActionGenerateReport(Action):
     def name(self) -> Text:
         return "action_generate_report"
 
-    def run(self, dispatcher: CollectingDispatcher, tracker: Tracker, domain: Dict[Text, Any]) -> List[Dict[Text, Any]]:
+    @instrument_action
+    async def run(self, dispatcher: CollectingDispatcher, tracker: Tracker, domain: Dict[Text, Any]) -> List[Dict[Text, Any]]:
         name = tracker.get_slot("name") or "User"
         recommended_career = tracker.get_slot("recommended_career")
         
@@ -188,62 +195,41 @@ class ActionGenerateReport(Action):
             dispatcher.utter_message("I need to suggest a career first before I can generate a report.")
             return []
 
-        report_path = f"reports/Career_Report_{name.replace(' ', '_')}_{tracker.sender_id[:8]}.pdf"
-        os.makedirs("reports", exist_ok=True)
-
-        c = canvas.Canvas(report_path, pagesize=letter)
-        width, height = letter
-        styles = getSampleStyleSheet()
-        style_body = styles['BodyText']
-        style_heading = styles['h2']
-
-        # Content Flowable List
-        story = []
-
-        # Title
-        story.append(Paragraph("Personalized Career Report", styles['h1']))
-        story.append(Spacer(1, 24))
-        story.append(Paragraph(f"For: {name}", style_heading))
-        story.append(Spacer(1, 24))
-
-        # Recommended Career
-        story.append(Paragraph("Recommended Career Path:", style_heading))
-        story.append(Paragraph(f"<b>{recommended_career}</b>", style_body))
-        story.append(Spacer(1, 12))
-
-        # Description
-        career_info = CAREER_DATA.get(recommended_career, {})
-        story.append(Paragraph("About this Field:", style_heading))
-        story.append(Paragraph(career_info.get('description', 'No details available.'), style_body))
-        story.append(Spacer(1, 12))
-        
-        # User Inputs
-        story.append(Paragraph("Your Profile Summary:", style_heading))
-        story.append(Paragraph(f"<b>Interests:</b> {tracker.get_slot('user_interests')}", style_body))
-        story.append(Paragraph(f"<b>Strengths:</b> {tracker.get_slot('user_strengths')}", style_body))
-        story.append(Paragraph(f"<b>Subjects:</b> {tracker.get_slot('user_subjects')}", style_body))
-        story.append(Spacer(1, 24))
-
-        # Build the PDF
-        doc_template = c.beginText(72, height - 72)
-        for item in story:
-            item.wrapOn(c, width - 144, height)
-            item.drawOn(c, 72, height - 100) # Manual positioning for simplicity here
-            # A more robust solution uses platypus PageTemplates
-        
-        c.save()
-        
-        dispatcher.utter_message(text=f"I have generated your report! You can download it from the sidebar in the app.",
-                                 custom={"report_path": report_path})
-        
+        profile = {
+            "name": name,
+            "interests": tracker.get_slot("user_interests"),
+            "strengths": tracker.get_slot("user_strengths"),
+            "subjects": tracker.get_slot("user_subjects"),
+            "ranking": [
+                {"domain": m.domain, "score": round(m.score, 1), "terms": format_match_terms(m)}
+                for m in await rank_careers(processed_profile_text(tracker), raw_profile_text(tracker))
+            ],
+        }
+        career_info = get_catalog().get(recommended_career, {})
+        # Rendering happens in the report worker pool; identical reports reuse the cached PDF.
+        with span("report_submit"):
+            job = get_report_renderer().submit(recommended_career, career_info.get('description', ''), profile)
+        report_path = job["report_path"]
+
+        dispatcher.utter_message(text="I'm preparing your report! You can download it from the sidebar in the app as soon as it's ready.",
+                                 custom={
+                                     "report_path": report_path,
+                                     "report_name": f"Career_Report_{name.replace(' ', '_')}.pdf",
+                                     "report_job": job["job_id"],
+                                     "report_status_url": report_status_url(job["job_id"]),
+                                 })
+        get_session_store().upsert(tracker.sender_id, name=tracker.get_slot("name"),
+                                   recommended_career=recommended_career, report_path=report_path)
+
         return [SlotSet("report_path", report_path)]
 
 class ActionSkillGapAnalysis(Action):
-    """Compares user's resume to a typical job description using GenAI."""
+    """Compares user's resume to the skills a career requires, using the local skill taxonomy."""
     def name(self) -> Text:
         return "action_skill_gap_analysis"
 
-    def run(self, dispatcher: CollectingDispatcher, tracker: Tracker, domain: Dict[Text, Any]) -> List[Dict[Text, Any]]:
+    @instrument_action
+    async def run(self, dispatcher: CollectingDispatcher, tracker: Tracker, domain: Dict[Text, Any]) -> List[Dict[Text, Any]]:
         resume_keywords = tracker.get_slot("resume_keywords")
         recommended_career = tracker.get_slot("recommended_career")
 
@@ -251,19 +237,21 @@ class ActionSkillGapAnalysis(Action):
             dispatcher.utter_message("I need your resume and a career recommendation first. Please upload your resume from the sidebar.")
             return []
 
-        prompt = f"List the top 15 most important technical skills and soft skills for a '{recommended_career}' role, based on current industry standards. Format as a single comma-separated string. Example: Python, SQL, Communication, Teamwork, Project Management."
-        job_skills_str = call_gemini_api(prompt)
-        job_skills = set([skill.strip().lower() for skill in job_skills_str.split(',')])
-        
-        user_skills = set(preprocess_text(resume_keywords).split())
-        missing_skills = job_skills - user_skills
-        matching_skills = job_skills.intersection(user_skills)
+        taxonomy = get_skill_taxonomy()
+        # Gemini only adds to the local profile, and is only asked when enabled or the career has no profile.
+        extra_skills = []
+        if GEMINI_API_KEY and (SKILL_GAP_LLM_ENRICH or not taxonomy.required_skills(recommended_career)):
+            extra_skills = await llm_required_skills(recommended_career)
+        with span("skill_extraction"):
+            matching_skills, missing_skills = taxonomy.gap(resume_keywords, recommended_career, extra_skills)
 
         response = f"### Skill Gap Analysis for a **{recommended_career}** role:\n\n"
         if matching_skills:
-            response += f"**✅ Skills you likely have (based on your resume):**\n- " + "\n- ".join(sorted(list(matching_skills))[:7]) + "\n\n"
+            response += f"**✅ Skills you likely have (based on your resume):**\n- " + "\n- ".join(matching_skills[:7]) + "\n\n"
         if missing_skills:
-            response += f"**🎯 Key skills to develop for this role:**\n- " + "\n- ".join(sorted(list(missing_skills))[:7]) + "\n\n"
+            response += f"**🎯 Key skills to develop for this role:**\n- " + "\n- ".join(missing_skills[:7]) + "\n\n"
+        if not matching_skills and not missing_skills:
+            response += "I don't have a skill profile for this role yet.\n\n"
         response += "Focusing on these areas will significantly strengthen your profile for this career path!"
         
         dispatcher.utter_message(text=response)
@@ -274,17 +262,34 @@ class ActionGenerateDayInLife(Action):
     def name(self) -> Text:
         return "action_generate_day_in_life"
         
-    def run(self, dispatcher: CollectingDispatcher, tracker: Tracker, domain: Dict[Text, Any]) -> List[Dict[Text, Any]]:
+    @instrument_action
+    async def run(self, dispatcher: CollectingDispatcher, tracker: Tracker, domain: Dict[Text, Any]) -> List[Dict[Text, Any]]:
         career = tracker.get_slot("recommended_career")
         if not career:
             dispatcher.utter_message("Please let me recommend a career first.")
             return []
 
-        prompt = f"Create an engaging, first-person narrative of a 'day in the life' of a {career}. Make it realistic, covering daily tasks, challenges, and rewarding moments. Write it in about 150 words."
-        
+        heading = f"### A Day in the Life of a {career}:\n\n"
+        pool = get_content_pool()
+        day_in_life_text = pool.sample("day_in_life", career)
+        if day_in_life_text:
+            if GEMINI_API_KEY:
+                pool.schedule_refresh("day_in_life", career)
+            dispatcher.utter_message(text=heading + day_in_life_text)
+            return []
+
+        # A miss is answered live, and the finished narrative is added to the pool.
+        if GEMINI_API_KEY and LLM_STREAMING:
+            # Return straight away and let the app read the narrative token by token from the sidecar.
+            chunks = get_llm_client().stream(prompt_for("day_in_life", career))
+            stream_url = start_stream(pool.collect("day_in_life", career, chunks))
+            if stream_url:
+                dispatcher.utter_message(text=heading, custom={"stream_url": stream_url})
+                return []
+
         dispatcher.utter_message(text="🎨 Generating a simulation of a day in this career... this might take a moment.")
-        day_in_life_text = call_gemini_api(prompt)
-        dispatcher.utter_message(text=f"### A Day in the Life of a {career}:\n\n" + day_in_life_text)
+        day_in_life_text = await generate_for_pool("day_in_life", career)
+        dispatcher.utter_message(text=heading + day_in_life_text)
         return []
 
 class ActionMockInterview(Action):
@@ -292,14 +297,22 @@ class ActionMockInterview(Action):
     def name(self) -> Text:
         return "action_mock_interview"
 
-    def run(self, dispatcher: CollectingDispatcher, tracker: Tracker, domain: Dict[Text, Any]) -> List[Dict[Text, Any]]:
+    @instrument_action
+    async def run(self, dispatcher: CollectingDispatcher, tracker: Tracker, domain: Dict[Text, Any]) -> List[Dict[Text, Any]]:
         career = tracker.get_slot("recommended_career")
         if not career:
             dispatcher.utter_message("I need to know which career to interview you for!")
             return []
 
-        prompt = f"Generate one common behavioral or technical interview question for a {career} role."
-        question = call_gemini_api(prompt)
+        # A random pre-generated question; the background refresh keeps adding new ones.
+        pool = get_content_pool()
+        question = pool.sample("interview_question", career)
+        if question:
+            if GEMINI_API_KEY:
+                pool.schedule_refresh("interview_question", career)
+        else:
+            # Generated live (uncached) and added to the pool for the next interview.
+            question = await generate_for_pool("interview_question", career)
 
         dispatcher.utter_message(f"Great! Let's start a mock interview for a **{career}** role. Here is your first question:\n\n*'{question}'*")
         return [SlotSet("interview_mode", True)]
@@ -309,5 +322,6 @@ class ActionRestart(Action):
     def name(self) -> Text:
         return "action_restart"
 
+    @instrument_action
     def run(self, dispatcher: CollectingDispatcher, tracker: Tracker, domain: Dict[Text, Any]) -> List[Dict[Text, Any]]:
         return [AllSlotsReset()]
\ No newline at end of file
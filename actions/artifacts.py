@@ -0,0 +1,74 @@
+# Content-addressed artifact directory
+#
+# Generated files (PDF reports) are stored under the hash of everything that
+# went into them, fanned out into two-character subdirectories:
+#   <root>/<key[:2]>/<key>.<ext>
+# A file's name fully determines its content, so any number of action workers,
+# on one node or on several nodes mounting the same directory, can share the
+# root without coordination. Writers publish with an atomic rename, readers
+# never see partial files, and two workers producing the same artifact simply
+# write the same bytes.
+import os
+import time
+from typing import Iterator, Optional, Text, Tuple
+
+ARTIFACT_DIR = os.getenv("ARTIFACT_DIR", "")
+
+
+class ArtifactStore:
+    """Content-addressed files under one (possibly shared) root directory."""
+
+    def __init__(self, root: Text):
+        # Absolute, so paths handed to other processes (the app, other workers) resolve the same way.
+        self.root = os.path.abspath(root)
+
+    def path(self, key: Text, ext: Text) -> Text:
+        return os.path.join(self.root, key[:2], f"{key}.{ext}")
+
+    def lookup(self, key: Text, ext: Text) -> Optional[Text]:
+        """Returns the path of an existing artifact and marks it as recently used, or None."""
+        path = self.path(key, ext)
+        try:
+            # Refresh the mtime so age-based eviction treats it as recently used.
+            os.utime(path)
+        except OSError:
+            return None
+        return path
+
+    def reserve(self, key: Text, ext: Text) -> Text:
+        """Creates the parent directory and returns the final path of an artifact about to be written."""
+        path = self.path(key, ext)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        return path
+
+    def _files(self, ext: Text) -> Iterator[Tuple[float, int, Text]]:
+        if not os.path.isdir(self.root):
+            return
+        suffix = f".{ext}"
+        for shard in os.scandir(self.root):
+            entries = [shard] if shard.is_file() else os.scandir(shard.path) if shard.is_dir() else []
+            for entry in entries:
+                # Flat files are reports written before the directory was sharded.
+                if entry.is_file() and entry.name.endswith(suffix):
+                    try:
+                        st = entry.stat()
+                    except OSError:
+                        continue  # evicted by another worker meanwhile
+                    yield st.st_mtime, st.st_size, entry.path
+
+    def evict(self, ext: Text, max_age: float, max_bytes: int) -> int:
+        """Deletes artifacts older than ``max_age`` seconds, then the oldest ones until under ``max_bytes``."""
+        now = time.time()
+        files = sorted(self._files(ext))
+        removed = 0
+        total = sum(size for _, size, _ in files)
+        for mtime, size, path in files:
+            if now - mtime <= max_age and total <= max_bytes:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            total -= size
+            removed += 1
+        return removed
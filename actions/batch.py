@@ -0,0 +1,136 @@
+# Batch / offline career recommendations for whole cohorts of profiles
+#
+#   python -m actions.batch students.csv -o recommendations.jsonl --top-k 3 --workers 8
+#
+# Uses the same preprocessing and career index as ActionSuggestCareer. Input rows
+# are read in chunks (CSV or Parquet), each chunk is vectorized into one sparse
+# matrix and scored against every domain with a single sparse product in a worker
+# process, and the top-k domains per profile are streamed to the output file.
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Text, Tuple
+
+DEFAULT_TEXT_COLUMNS = ("interests", "strengths", "subjects", "resume_keywords")
+
+_index = None
+_preprocessor = None
+
+
+def _init_worker() -> None:
+    """Builds the preprocessor and career index once per worker process."""
+    global _index, _preprocessor
+    from .career_index import CareerIndex
+    from .catalog import get_catalog
+    from .preprocessing import get_preprocessor
+
+    _preprocessor = get_preprocessor()
+    _index = CareerIndex.from_catalog(get_catalog(), _preprocessor.process)
+
+
+def score_profiles(texts: Sequence[Optional[Text]], top_k: int = 3) -> List[List[Tuple[Text, float]]]:
+    """Returns the top-k (domain, score 0-100) for every raw profile text."""
+    import numpy as np
+
+    if _index is None:
+        _init_worker()
+    processed = _preprocessor.process_many(texts)
+    # (n_profiles x n_terms) @ (n_terms x n_domains) -> cosine similarities for the whole chunk.
+    sims = (_index.vectorize(processed) @ _index.matrix.T).toarray()
+    k = min(top_k, sims.shape[1])
+    top = np.argpartition(-sims, k - 1, axis=1)[:, :k]
+    results = []
+    for row, cols in zip(sims, top):
+        cols = cols[np.argsort(-row[cols])]
+        results.append([(_index.domains[c], round(float(row[c]) * 100, 2)) for c in cols if row[c] > 0])
+    return results
+
+
+def _score_chunk(task: Tuple[List[Any], List[Text], int]) -> List[Dict[Text, Any]]:
+    ids, texts, top_k = task
+    return [{"id": i, "recommendations": [{"domain": d, "score": s} for d, s in recs]}
+            for i, recs in zip(ids, score_profiles(texts, top_k))]
+
+
+def read_chunks(path: Text, columns: Sequence[Text], id_column: Optional[Text],
+                chunk_size: int) -> Iterator[Tuple[List[Any], List[Text]]]:
+    """Yields (ids, profile_texts) chunks from a CSV or Parquet file without loading it whole."""
+    import pandas as pd
+
+    if path.endswith(".parquet"):
+        try:
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise ImportError("Reading Parquet input needs pyarrow (`pip install pyarrow`); "
+                              "CSV input works without it.") from None
+
+        wanted = list(columns) + ([id_column] if id_column else [])
+        frames = (batch.to_pandas() for batch in
+                  pq.ParquetFile(path).iter_batches(batch_size=chunk_size, columns=wanted))
+    else:
+        frames = pd.read_csv(path, chunksize=chunk_size, dtype=str, keep_default_na=False)
+
+    offset = 0
+    for frame in frames:
+        present = [c for c in columns if c in frame.columns]
+        if not present:
+            raise ValueError(f"None of the profile columns {list(columns)} are in {path}")
+        texts = frame[present].fillna("").astype(str).agg(" ".join, axis=1).tolist()
+        ids = frame[id_column].tolist() if id_column else list(range(offset, offset + len(frame)))
+        offset += len(frame)
+        yield ids, texts
+
+
+def run_batch(input_path: Text, output_path: Text, columns: Sequence[Text] = DEFAULT_TEXT_COLUMNS,
+              id_column: Optional[Text] = None, top_k: int = 3, chunk_size: int = 2048,
+              workers: Optional[int] = None) -> Dict[Text, float]:
+    """Scores every profile in ``input_path`` and writes one JSON line per profile to ``output_path``."""
+    workers = workers or os.cpu_count() or 1
+    tasks: Iterable = ((ids, texts, top_k) for ids, texts in read_chunks(input_path, columns, id_column, chunk_size))
+    start = time.perf_counter()
+    count = 0
+    with open(output_path, "w", encoding="utf-8") as out, \
+            ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as pool:
+        # Keep a bounded window of chunks in flight so memory stays flat on huge inputs; results stay in order.
+        pending = []
+        for task in tasks:
+            pending.append(pool.submit(_score_chunk, task))
+            if len(pending) >= workers * 2:
+                count += _write(out, pending.pop(0).result())
+        for future in pending:
+            count += _write(out, future.result())
+    elapsed = time.perf_counter() - start
+    return {"profiles": count, "seconds": elapsed, "profiles_per_second": count / elapsed if elapsed else 0.0}
+
+
+def _write(out, rows: List[Dict[Text, Any]]) -> int:
+    out.writelines(json.dumps(row, ensure_ascii=False) + "\n" for row in rows)
+    return len(rows)
+
+
+def main(argv: Optional[Sequence[Text]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Score a cohort of profiles against the career catalog.")
+    parser.add_argument("input", help="CSV or .parquet file, one profile per row")
+    parser.add_argument("-o", "--output", required=True, help="JSON Lines output file")
+    parser.add_argument("--columns", default=",".join(DEFAULT_TEXT_COLUMNS),
+                        help="comma-separated text columns that make up a profile")
+    parser.add_argument("--id-column", help="column to copy into the output as the profile id")
+    parser.add_argument("--top-k", type=int, default=3)
+    parser.add_argument("--chunk-size", type=int, default=2048)
+    parser.add_argument("--workers", type=int, default=None, help="defaults to the number of cores")
+    args = parser.parse_args(argv)
+
+    try:
+        stats = run_batch(args.input, args.output, args.columns.split(","), args.id_column,
+                          args.top_k, args.chunk_size, args.workers)
+    except ImportError as e:
+        parser.error(str(e))
+    print(f"Scored {stats['profiles']} profiles in {stats['seconds']:.2f}s "
+          f"({stats['profiles_per_second']:.0f} profiles/s)", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
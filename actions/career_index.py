@@ -0,0 +1,66 @@
+# Precomputed TF-IDF index over the career domains
+from typing import Callable, Hashable, Iterable, List, Optional, Text, Tuple
+
+from .catalog import CareerCatalog
+
+
+class CareerIndex:
+    """Fitted vocabulary plus a sparse domain x term matrix, built once and reused per request.
+
+    Rows are L2-normalised TF-IDF vectors of each domain's keywords, so a single
+    sparse matrix-vector product with a transformed profile gives the cosine
+    similarity against every domain at once.
+    """
+
+    def __init__(self, entries: Iterable[Tuple[Text, List[Text]]], fingerprint: Hashable = None,
+                 preprocess: Optional[Callable[[Text], Text]] = None):
+        self.preprocess = preprocess
+        self.fingerprint = fingerprint
+        self.domains: List[Text] = []
+
+        documents = []
+        for name, keywords in entries:
+            self.domains.append(name)
+            doc = " ".join(keywords)
+            documents.append(preprocess(doc) if preprocess else doc)
+
+        # Imported on first build; sklearn is by far the slowest import in the action server.
+        from sklearn.feature_extraction.text import TfidfVectorizer
+
+        self.vectorizer = TfidfVectorizer()
+        # CSR matrix of shape (n_domains, n_terms), rows already L2-normalised.
+        self.matrix = self.vectorizer.fit_transform(documents).tocsr()
+
+    @classmethod
+    def from_catalog(cls, catalog: CareerCatalog,
+                     preprocess: Optional[Callable[[Text], Text]] = None) -> "CareerIndex":
+        return cls(catalog.iter_keywords(), catalog.fingerprint, preprocess)
+
+    def vectorize(self, processed_texts: List[Text]):
+        """Transforms already preprocessed profile texts into the index's term space."""
+        return self.vectorizer.transform(processed_texts)
+
+    def score(self, processed_profile: Text) -> dict:
+        """Returns the cosine similarity (0-100) of a preprocessed profile against every domain."""
+        profile_vec = self.vectorize([processed_profile])
+        sims = (self.matrix @ profile_vec.T).toarray().ravel() * 100
+        return dict(zip(self.domains, sims.tolist()))
+
+    def best_match(self, processed_profile: Text) -> Tuple[Text, float]:
+        """Returns the highest scoring domain and its score."""
+        profile_vec = self.vectorize([processed_profile])
+        sims = (self.matrix @ profile_vec.T).toarray().ravel()
+        best = int(sims.argmax())
+        return self.domains[best], float(sims[best] * 100)
+
+
+_index: Optional[CareerIndex] = None
+
+
+def get_career_index(catalog: CareerCatalog,
+                     preprocess: Optional[Callable[[Text], Text]] = None) -> CareerIndex:
+    """Returns the shared index, rebuilding it only when the catalog file has changed."""
+    global _index
+    if _index is None or _index.fingerprint != catalog.fingerprint:
+        _index = CareerIndex.from_catalog(catalog, preprocess)
+    return _index
@@ -0,0 +1,248 @@
+# Career catalog backed by an on-disk JSON Lines file
+#
+# Each line of the catalog is one career domain:
+#   {"domain": "...", "keywords": [...], "description": "...", "courses": [{"title": ..., "url": ...}]}
+#
+# A sidecar ``<catalog>.idx`` file maps domain names to byte ranges in the catalog.
+# Both files are memory-mapped, so records are parsed one at a time on demand and
+# the pages are shared between action-server workers instead of being copied into
+# every process.
+#
+# Update a live catalog by writing a new file and renaming it over the old one
+# (as build_index does for the index). Rewriting the mapped file in place would
+# pull pages out from under readers.
+import json
+import mmap
+import os
+import struct
+import sys
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Iterator, List, Optional, Text, Tuple
+
+DEFAULT_CATALOG_PATH = os.path.join(os.path.dirname(__file__), "data", "careers.jsonl")
+# Seconds between checks of the catalog file for changes.
+CHECK_INTERVAL = float(os.getenv("CAREER_CATALOG_CHECK_SECONDS", "5"))
+
+_INDEX_MAGIC = b"CCIX"
+_INDEX_VERSION = 1
+# magic, version, catalog size, catalog mtime (ns), record count
+_HEADER = struct.Struct("<4sIQQI")
+# name offset, name length, record offset, record length
+_ENTRY = struct.Struct("<QIQI")
+
+
+def _source_stat(path: Text) -> Tuple[int, int]:
+    st = os.stat(path)
+    return st.st_size, st.st_mtime_ns
+
+
+def build_index(catalog_path: Text, index_path: Optional[Text] = None) -> Text:
+    """Scans the catalog once and writes the sorted name -> byte range index next to it."""
+    index_path = index_path or catalog_path + ".idx"
+    size, mtime_ns = _source_stat(catalog_path)
+
+    entries = []
+    offset = 0
+    with open(catalog_path, "rb") as f:
+        for line in f:
+            stripped = line.strip()
+            if stripped:
+                name = json.loads(stripped)["domain"].encode("utf-8")
+                entries.append((name, offset, len(line)))
+            offset += len(line)
+    entries.sort(key=lambda e: e[0])
+
+    names_blob = bytearray()
+    packed = bytearray()
+    for name, rec_offset, rec_len in entries:
+        packed += _ENTRY.pack(len(names_blob), len(name), rec_offset, rec_len)
+        names_blob += name
+
+    tmp_path = f"{index_path}.{os.getpid()}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(_HEADER.pack(_INDEX_MAGIC, _INDEX_VERSION, size, mtime_ns, len(entries)))
+        f.write(packed)
+        f.write(names_blob)
+    # Atomic so concurrently starting workers never see a half-written index.
+    os.replace(tmp_path, index_path)
+    return index_path
+
+
+class _CatalogView:
+    """One immutable mapping of the catalog and its index.
+
+    A reload builds a new view and swaps it in; readers keep using whichever
+    view they picked up, so a mapping is never closed under them. Unreferenced
+    views are unmapped by the garbage collector.
+    """
+
+    def __init__(self, path: Text, index_path: Text):
+        with open(path, "rb") as f:
+            self.data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) if os.fstat(f.fileno()).st_size else b""
+        with open(index_path, "rb") as f:
+            self.index = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        _, _, size, mtime_ns, count = _HEADER.unpack_from(self.index, 0)
+        self.fingerprint: Tuple[int, int] = (size, mtime_ns)
+        self.count = count
+        self.names_start = _HEADER.size + count * _ENTRY.size
+        self.cache: "OrderedDict[Text, Dict[Text, Any]]" = OrderedDict()
+
+    def entry(self, i: int) -> Tuple[int, int, int, int]:
+        return _ENTRY.unpack_from(self.index, _HEADER.size + i * _ENTRY.size)
+
+    def name_at(self, i: int) -> bytes:
+        name_off, name_len, _, _ = self.entry(i)
+        start = self.names_start + name_off
+        return self.index[start:start + name_len]
+
+    def find(self, name: Text) -> int:
+        key = name.encode("utf-8")
+        lo, hi = 0, self.count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self.name_at(mid) < key:
+                lo = mid + 1
+            else:
+                hi = mid
+        if lo < self.count and self.name_at(lo) == key:
+            return lo
+        return -1
+
+    def read_record(self, i: int) -> Dict[Text, Any]:
+        _, _, rec_off, rec_len = self.entry(i)
+        return json.loads(self.data[rec_off:rec_off + rec_len])
+
+    def close(self) -> None:
+        for m in (self.data, self.index):
+            if isinstance(m, mmap.mmap):
+                m.close()
+
+
+class CareerCatalog:
+    """Read-only, memory-mapped view of a career catalog file. Safe to share between threads."""
+
+    def __init__(self, path: Text = DEFAULT_CATALOG_PATH, cache_size: int = 256,
+                 check_interval: float = CHECK_INTERVAL):
+        self.path = path
+        self.index_path = path + ".idx"
+        self._cache_size = cache_size
+        self.check_interval = check_interval
+        self._lock = threading.Lock()
+        self._checked_at = time.monotonic()
+        self._view = self._load()
+
+    # --- Loading ---
+    def _index_is_current(self) -> bool:
+        if not os.path.exists(self.index_path):
+            return False
+        with open(self.index_path, "rb") as f:
+            header = f.read(_HEADER.size)
+        if len(header) < _HEADER.size:
+            return False
+        magic, version, size, mtime_ns, _ = _HEADER.unpack(header)
+        return (magic == _INDEX_MAGIC and version == _INDEX_VERSION
+                and (size, mtime_ns) == _source_stat(self.path))
+
+    def _load(self) -> _CatalogView:
+        if not self._index_is_current():
+            build_index(self.path, self.index_path)
+        return _CatalogView(self.path, self.index_path)
+
+    @property
+    def fingerprint(self) -> Tuple[int, int]:
+        return self._view.fingerprint
+
+    def close(self) -> None:
+        """Unmaps the catalog. Only call this once no other thread uses the catalog."""
+        self._view.close()
+
+    def reload_if_changed(self, force: bool = False) -> bool:
+        """Re-maps the catalog if the file on disk was modified. Returns True if it was.
+
+        The file is stat'ed at most once per ``check_interval`` seconds unless ``force`` is set.
+        """
+        now = time.monotonic()
+        if not force and now - self._checked_at < self.check_interval:
+            return False
+        with self._lock:
+            if not force and now - self._checked_at < self.check_interval:
+                return False
+            self._checked_at = now
+            if _source_stat(self.path) == self._view.fingerprint:
+                return False
+            self._view = self._load()
+            return True
+
+    # --- Public API ---
+    def __len__(self) -> int:
+        return self._view.count
+
+    def __contains__(self, name: Text) -> bool:
+        return self._view.find(name) >= 0
+
+    def get(self, name: Text, default: Optional[Dict[Text, Any]] = None) -> Optional[Dict[Text, Any]]:
+        """Returns a single domain record, parsing it from the mapped file on a cache miss."""
+        view = self._view
+        with self._lock:
+            record = view.cache.get(name)
+            if record is not None:
+                view.cache.move_to_end(name)
+                return record
+        i = view.find(name) if name else -1
+        if i < 0:
+            return default
+        record = view.read_record(i)
+        with self._lock:
+            view.cache[name] = record
+            if len(view.cache) > self._cache_size:
+                view.cache.popitem(last=False)
+        return record
+
+    def names(self) -> List[Text]:
+        """Domain names in sorted order."""
+        view = self._view
+        return [view.name_at(i).decode("utf-8") for i in range(view.count)]
+
+    def iter_records(self) -> Iterator[Dict[Text, Any]]:
+        """Streams every record in file order without caching them."""
+        data = self._view.data
+        if not data:
+            return
+        start = 0
+        end = len(data)
+        while start < end:
+            nl = data.find(b"\n", start)
+            nl = end if nl < 0 else nl
+            line = data[start:nl].strip()
+            if line:
+                yield json.loads(line)
+            start = nl + 1
+
+    def iter_keywords(self) -> Iterator[Tuple[Text, List[Text]]]:
+        """Streams (domain, keywords) pairs, which is all the scoring index needs."""
+        for record in self.iter_records():
+            yield record["domain"], record.get("keywords", [])
+
+
+_catalog: Optional[CareerCatalog] = None
+_catalog_lock = threading.Lock()
+
+
+def get_catalog() -> CareerCatalog:
+    """Returns the process-wide catalog, opened from CAREER_CATALOG_PATH on first use."""
+    global _catalog
+    if _catalog is None:
+        with _catalog_lock:
+            if _catalog is None:
+                _catalog = CareerCatalog(os.getenv("CAREER_CATALOG_PATH", DEFAULT_CATALOG_PATH))
+                return _catalog
+    _catalog.reload_if_changed()
+    return _catalog
+
+
+if __name__ == "__main__":
+    # python -m actions.catalog [path]  -- (re)builds the sidecar index ahead of deployment
+    target = sys.argv[1] if len(sys.argv) > 1 else os.getenv("CAREER_CATALOG_PATH", DEFAULT_CATALOG_PATH)
+    print(f"Wrote {build_index(target)}")
@@ -0,0 +1,175 @@
+# Launcher for a scale-out action server
+#
+#   python -m actions.cluster --workers 4 --state-dir /srv/counsellor
+#
+# Starts N stateless `python -m rasa_sdk` workers and the sender_id router
+# (actions.router) on the port Rasa's endpoints.yml already points to (5055).
+# Each worker gets its own webhook and sidecar port. All workers share:
+#   - the session store (SESSION_DB in --state-dir, WAL mode)
+#   - the LLM response cache (LLM_CACHE_DB in --state-dir)
+#   - the content-addressed artifact directory (ARTIFACT_DIR, reports)
+# Variables already set in the environment take precedence, e.g. a network
+# ARTIFACT_DIR or a SESSION_STORE plug-in for a multi-node setup. On more than
+# one node, run `--no-router` on every node and point one router at all of them
+# with `python -m actions.router --workers ...`. Workers that exit are restarted.
+import argparse
+import asyncio
+import os
+import signal
+import subprocess
+import sys
+import time
+import urllib.request
+from typing import Dict, List, Optional, Sequence, Text
+
+from .router import ActionRouter, create_app
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# Seconds between checks for exited workers.
+SUPERVISE_INTERVAL = 2.0
+
+
+class WorkerPool:
+    """N action-server processes on consecutive ports, restarted when they exit."""
+
+    def __init__(self, count: int, host: Text = "localhost", worker_port: int = 5060,
+                 sidecar_port: int = 5156, public_host: Text = "localhost",
+                 env: Optional[Dict[Text, Text]] = None):
+        self.count = count
+        self.host = host
+        self.worker_port = worker_port
+        self.sidecar_port = sidecar_port
+        self.public_host = public_host
+        # The app reaches the sidecars on --public-host; only listen beyond loopback when that is another host.
+        self.sidecar_host = "127.0.0.1" if public_host in ("localhost", "127.0.0.1") else "0.0.0.0"
+        self.env = env or {}
+        self.processes: List[Optional[subprocess.Popen]] = [None] * count
+
+    @property
+    def urls(self) -> List[Text]:
+        return [f"http://{self.host}:{self.worker_port + i}" for i in range(self.count)]
+
+    def _spawn(self, i: int) -> subprocess.Popen:
+        sidecar = self.sidecar_port + i
+        env = dict(os.environ, **self.env,
+                   ACTION_SIDECAR_HOST=os.getenv("ACTION_SIDECAR_HOST", self.sidecar_host),
+                   ACTION_SIDECAR_PORT=str(sidecar),
+                   ACTION_SIDECAR_URL=f"http://{self.public_host}:{sidecar}")
+        return subprocess.Popen(
+            [sys.executable, "-m", "rasa_sdk", "--actions", "actions", "--port", str(self.worker_port + i)],
+            # Own process group, so the worker's report render processes can be reaped with it.
+            cwd=PROJECT_ROOT, env=env, start_new_session=True)
+
+    @staticmethod
+    def _kill_group(process: subprocess.Popen) -> None:
+        # Leftover children (e.g. report render processes) would still hold the worker's port.
+        try:
+            os.killpg(process.pid, signal.SIGKILL)
+        except OSError:
+            pass
+
+    def start(self) -> None:
+        for i in range(self.count):
+            self.processes[i] = self._spawn(i)
+
+    def wait_ready(self, timeout: float = 120) -> int:
+        """Waits until every worker answers /health (or ``timeout``). Returns the number that are ready."""
+        deadline = time.time() + timeout
+        pending = set(self.urls)
+        while pending and time.time() < deadline:
+            for url in list(pending):
+                try:
+                    urllib.request.urlopen(f"{url}/health", timeout=2).read()
+                    pending.discard(url)
+                except OSError:
+                    pass
+            if pending:
+                time.sleep(0.5)
+        return self.count - len(pending)
+
+    def restart_exited(self) -> None:
+        for i, process in enumerate(self.processes):
+            if process is not None and process.poll() is not None:
+                print(f"Action worker on port {self.worker_port + i} exited with code {process.returncode}, "
+                      f"restarting")
+                self._kill_group(process)
+                self.processes[i] = self._spawn(i)
+
+    def stop(self, timeout: float = 30) -> None:
+        for process in self.processes:
+            if process is not None and process.poll() is None:
+                process.terminate()
+        for process in self.processes:
+            if process is not None:
+                try:
+                    process.wait(timeout=timeout)
+                except subprocess.TimeoutExpired:
+                    pass
+                self._kill_group(process)
+
+
+def shared_state_env(state_dir: Text) -> Dict[Text, Text]:
+    """Environment that points every worker at the same state, unless already configured."""
+    state_dir = os.path.abspath(state_dir)
+    defaults = {
+        "SESSION_DB": os.path.join(state_dir, "career_counsellor.db"),
+        "LLM_CACHE_DB": os.path.join(state_dir, "career_counsellor_cache.db"),
+        "ARTIFACT_DIR": os.path.join(state_dir, "artifacts"),
+    }
+    return {k: v for k, v in defaults.items() if k not in os.environ}
+
+
+async def _supervise(pool: WorkerPool) -> None:
+    while True:
+        await asyncio.sleep(SUPERVISE_INTERVAL)
+        pool.restart_exited()
+
+
+def main(argv: Optional[Sequence[Text]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Run several action server workers behind the sender_id router.")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="worker processes (default: cores)")
+    parser.add_argument("--host", default="0.0.0.0", help="router bind address")
+    parser.add_argument("--port", type=int, default=5055, help="router port, i.e. Rasa's action_endpoint")
+    parser.add_argument("--worker-port", type=int, default=5060, help="webhook port of the first worker")
+    parser.add_argument("--sidecar-port", type=int, default=5156, help="sidecar port of the first worker")
+    parser.add_argument("--public-host", default="localhost",
+                        help="host name the Streamlit app uses to reach the workers' sidecars")
+    parser.add_argument("--state-dir", default=".", help="directory for the shared databases and artifacts")
+    parser.add_argument("--no-router", action="store_true",
+                        help="only run the workers (a router on another node forwards to them)")
+    args = parser.parse_args(argv)
+
+    os.makedirs(os.path.abspath(args.state_dir), exist_ok=True)
+    pool = WorkerPool(args.workers, worker_port=args.worker_port, sidecar_port=args.sidecar_port,
+                      public_host=args.public_host, env=shared_state_env(args.state_dir))
+    pool.start()
+    try:
+        # Routing to workers that are still importing would mark them down and bounce their conversations.
+        ready = pool.wait_ready()
+        print(f"{ready}/{args.workers} action worker(s) ready: {', '.join(pool.urls)}")
+        if args.no_router:
+            asyncio.run(_supervise(pool))
+            return
+
+        from aiohttp import web
+
+        app = create_app(ActionRouter(pool.urls))
+
+        async def start_supervisor(app):
+            app["supervisor"] = asyncio.ensure_future(_supervise(pool))
+
+        async def stop_supervisor(app):
+            app["supervisor"].cancel()
+
+        app.on_startup.append(start_supervisor)
+        app.on_cleanup.append(stop_supervisor)
+        print(f"Routing action calls on port {args.port}")
+        web.run_app(app, host=args.host, port=args.port, print=None)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        pool.stop()
+
+
+if __name__ == "__main__":
+    main()
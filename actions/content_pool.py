@@ -0,0 +1,357 @@
+# Precomputed generative content for every career domain
+#
+#   python -m actions.content_pool build --variants 8 --concurrency 4
+#   python -m actions.content_pool stats
+#
+# Day-in-the-life narratives and first mock-interview questions do not depend on
+# the user, only on the career, so a pool of variants per (kind, domain) is
+# generated ahead of time by a batch job and stored as one gzip-compressed JSON
+# file. The action server loads it in the background at start-up. Actions then
+# answer from the pool in microseconds, whether or not Gemini is slow or
+# reachable. Each answer also schedules a background refresh of that pool
+# entry: rate-limited, with bounded concurrency, and never on the request path.
+# A miss is answered live and the answer joins the pool. The newest variants
+# replace the oldest, and the file is rewritten now and then so the refreshed
+# pool survives restarts. All workers of a node share the file: a save merges
+# with what is on disk under a file lock rather than overwriting it.
+import argparse
+import asyncio
+import gzip
+import hashlib
+import json
+import os
+import random
+import threading
+import time
+from contextlib import contextmanager
+from typing import AsyncIterator, Dict, Iterable, Iterator, List, Optional, Sequence, Set, Text, Tuple
+
+from . import metrics
+
+DEFAULT_POOL_PATH = os.path.join(os.path.dirname(__file__), "data", "content_pool.json.gz")
+POOL_PATH = os.getenv("CONTENT_POOL_PATH", DEFAULT_POOL_PATH)
+POOL_VARIANTS = int(os.getenv("CONTENT_POOL_VARIANTS", "8"))
+# A (kind, domain) entry is regenerated in the background at most this often.
+REFRESH_INTERVAL = float(os.getenv("CONTENT_POOL_REFRESH_SECONDS", "600"))
+REFRESH_CONCURRENCY = int(os.getenv("CONTENT_POOL_REFRESH_CONCURRENCY", "2"))
+# Seconds between rewrites of the pool file with refreshed variants; 0 never rewrites it.
+SAVE_INTERVAL = float(os.getenv("CONTENT_POOL_SAVE_SECONDS", "600"))
+FORMAT_VERSION = 1
+
+PROMPTS = {
+    "day_in_life": "Create an engaging, first-person narrative of a 'day in the life' of a {career}. Make it realistic, covering daily tasks, challenges, and rewarding moments. Write it in about 150 words.",
+    "interview_question": "Generate one common behavioral or technical interview question for a {career} role.",
+}
+
+
+def prompt_for(kind: Text, career: Text) -> Text:
+    return PROMPTS[kind].format(career=career)
+
+
+def prompt_version(kind: Text) -> Text:
+    """Short hash of a prompt template; variants made from an older template are dropped on load."""
+    return hashlib.sha256(PROMPTS[kind].encode("utf-8")).hexdigest()[:12]
+
+
+@contextmanager
+def _file_lock(path: Text) -> Iterator[None]:
+    """Exclusive advisory lock on ``path`` + ".lock" across processes (no-op where fcntl is missing)."""
+    try:
+        import fcntl
+    except ImportError:
+        yield
+        return
+    with open(f"{path}.lock", "a") as f:
+        fcntl.flock(f, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(f, fcntl.LOCK_UN)
+
+
+def _read_variants(path: Text) -> Dict[Tuple[Text, Text], List[Text]]:
+    """Variants stored in a pool file, minus kinds whose prompt changed; empty if the file is missing or unreadable."""
+    try:
+        with gzip.open(path, "rt", encoding="utf-8") as f:
+            data = json.load(f)
+    except FileNotFoundError:
+        return {}
+    except (OSError, ValueError) as e:
+        print(f"Could not read content pool {path}: {e}")
+        return {}
+    if data.get("format") != FORMAT_VERSION:
+        return {}
+    entries: Dict[Tuple[Text, Text], List[Text]] = {}
+    for kind, section in data.get("kinds", {}).items():
+        if kind not in PROMPTS or section.get("prompt") != prompt_version(kind):
+            continue  # the prompt changed since this pool was built
+        for career, texts in section.get("variants", {}).items():
+            entries[(kind, career)] = list(texts)
+    return entries
+
+
+class ContentPool:
+    """Bounded sets of pre-generated texts per (kind, career), with background refresh."""
+
+    def __init__(self, path: Optional[Text] = None, max_variants: int = POOL_VARIANTS,
+                 refresh_interval: float = REFRESH_INTERVAL, refresh_concurrency: int = REFRESH_CONCURRENCY,
+                 save_interval: float = SAVE_INTERVAL):
+        self.path = path
+        self.max_variants = max_variants
+        self.refresh_interval = refresh_interval
+        self.refresh_concurrency = refresh_concurrency
+        self.save_interval = save_interval
+        self._entries: Dict[Tuple[Text, Text], List[Text]] = {}
+        self._lock = threading.Lock()
+        self._random = random.Random()
+        self._refreshed_at: Dict[Tuple[Text, Text], float] = {}
+        self._refreshing: Set[Tuple[Text, Text]] = set()
+        self._tasks: Set["asyncio.Task"] = set()
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._dirty = False
+        self._saved_at = time.time()
+        self.hits = 0
+        self.misses = 0
+        self.refreshes = 0
+
+    # --- Artifact ---
+    @classmethod
+    def load(cls, path: Text, **kwargs) -> "ContentPool":
+        """Reads a pool file; a missing or unreadable file gives an empty pool."""
+        pool = cls(path, **kwargs)
+        for key, texts in _read_variants(path).items():
+            pool._entries[key] = texts[-pool.max_variants:]
+        return pool
+
+    def save(self, path: Optional[Text] = None, merge: bool = True) -> Text:
+        """Writes the pool atomically, so readers (and other workers) never see a partial file.
+
+        With ``merge``, variants other workers saved since are kept (and adopted by this pool);
+        this pool's own variants count as the newest.
+        """
+        path = path or self.path
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with _file_lock(path):
+            on_disk = _read_variants(path) if merge else {}
+            with self._lock:
+                for key, texts in on_disk.items():
+                    mine = self._entries.get(key, [])
+                    merged = [t for t in texts if t not in mine] + mine
+                    self._entries[key] = merged[-self.max_variants:]
+                kinds: Dict[Text, Dict] = {}
+                for (kind, career), texts in sorted(self._entries.items()):
+                    section = kinds.setdefault(kind, {"prompt": prompt_version(kind), "variants": {}})
+                    section["variants"][career] = list(texts)
+                self._dirty = False
+                self._saved_at = time.time()
+            data = {"format": FORMAT_VERSION, "created_at": time.time(), "kinds": kinds}
+            tmp_path = f"{path}.{os.getpid()}.tmp"
+            with gzip.open(tmp_path, "wt", encoding="utf-8", compresslevel=9) as f:
+                json.dump(data, f, ensure_ascii=False, separators=(",", ":"))
+            os.replace(tmp_path, path)
+        return path
+
+    # --- Reads ---
+    def sample(self, kind: Text, career: Text) -> Optional[Text]:
+        """A random pre-generated text for ``career``, or None if the pool has none yet."""
+        with self._lock:
+            texts = self._entries.get((kind, career))
+            if not texts:
+                self.misses += 1
+                return None
+            self.hits += 1
+            return self._random.choice(texts)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return sum(len(texts) for texts in self._entries.values())
+
+    def stats(self) -> Dict[Text, int]:
+        with self._lock:
+            counts: Dict[Text, int] = {}
+            for (kind, _), texts in self._entries.items():
+                counts[kind] = counts.get(kind, 0) + len(texts)
+            return counts
+
+    # --- Writes ---
+    def add(self, kind: Text, career: Text, text: Text) -> None:
+        """Adds a variant; once the entry is full, the oldest variant makes room."""
+        text = text.strip()
+        if not text:
+            return
+        with self._lock:
+            texts = self._entries.setdefault((kind, career), [])
+            if text in texts:
+                return
+            texts.append(text)
+            del texts[:-self.max_variants]
+            self._dirty = True
+
+    async def generate(self, kind: Text, career: Text) -> Text:
+        """Generates a variant live, for a miss, and adds it to the pool. Raises LLMError."""
+        from .llm_client import get_llm_client
+
+        text = await get_llm_client().generate(prompt_for(kind, career), use_cache=False)
+        self.add(kind, career, text)
+        await self._maybe_save()
+        return text
+
+    async def collect(self, kind: Text, career: Text, chunks: AsyncIterator[Text]) -> AsyncIterator[Text]:
+        """Passes a live stream through and adds the complete text to the pool once it has finished."""
+        parts: List[Text] = []
+        async for chunk in chunks:
+            parts.append(chunk)
+            yield chunk
+        self.add(kind, career, "".join(parts))
+        await self._maybe_save()
+
+    def schedule_refresh(self, kind: Text, career: Text) -> bool:
+        """Starts a background regeneration of one entry unless it is fresh or already running.
+
+        Must be called from the event loop the LLM client runs on. Returns True if a refresh was started.
+        """
+        key = (kind, career)
+        now = time.monotonic()
+        with self._lock:
+            if key in self._refreshing or now - self._refreshed_at.get(key, float("-inf")) < self.refresh_interval:
+                return False
+            self._refreshing.add(key)
+            self._refreshed_at[key] = now
+        task = asyncio.get_running_loop().create_task(self._refresh(kind, career))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return True
+
+    async def _refresh(self, kind: Text, career: Text) -> None:
+        from .llm_client import LLMError, get_llm_client
+
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.refresh_concurrency)
+        try:
+            async with self._semaphore:
+                # Uncached, so every refresh can bring a new variant.
+                text = await get_llm_client().generate(prompt_for(kind, career), use_cache=False)
+            self.add(kind, career, text)
+            self.refreshes += 1
+        except LLMError as e:
+            print(f"Content pool refresh for {kind}/{career} failed: {e}")
+        finally:
+            with self._lock:
+                self._refreshing.discard((kind, career))
+        await self._maybe_save()
+
+    async def _maybe_save(self) -> None:
+        if self.path and self.save_interval > 0 and self._dirty and time.time() - self._saved_at > self.save_interval:
+            await asyncio.get_running_loop().run_in_executor(None, self.save)
+
+
+_pool: Optional[ContentPool] = None
+_pool_lock = threading.Lock()
+
+
+def get_content_pool() -> ContentPool:
+    """Returns the process-wide pool, loaded from CONTENT_POOL_PATH on first use."""
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = ContentPool.load(POOL_PATH)
+    return _pool
+
+
+def _preload() -> None:
+    get_content_pool()
+    if os.getenv("GEMINI_API_KEY"):
+        # Build the client (and import aiohttp) here rather than in the first refresh, on the event loop.
+        from .llm_client import get_llm_client
+
+        get_llm_client()
+        import aiohttp  # noqa: F401
+
+
+def preload_content_pool() -> None:
+    """Loads the pool in a background thread so the first request does not pay for it."""
+    threading.Thread(target=_preload, name="content-pool-load", daemon=True).start()
+
+
+# --- Batch job ---
+async def build_pool(pool: ContentPool, careers: Sequence[Text], kinds: Sequence[Text], variants: int,
+                     concurrency: int) -> Tuple[int, int]:
+    """Generates ``variants`` texts per (kind, career) with at most ``concurrency`` requests in flight.
+
+    Returns (generated, failed).
+    """
+    from .llm_client import LLMError, get_llm_client
+
+    client = get_llm_client()
+    semaphore = asyncio.Semaphore(concurrency)
+    counts = {"generated": 0, "failed": 0}
+
+    async def one(kind: Text, career: Text) -> None:
+        async with semaphore:
+            try:
+                text = await client.generate(prompt_for(kind, career), use_cache=False)
+            except LLMError as e:
+                print(f"{kind}/{career}: {e}")
+                counts["failed"] += 1
+                return
+        pool.add(kind, career, text)
+        counts["generated"] += 1
+
+    await asyncio.gather(*(one(kind, career) for kind in kinds for career in careers for _ in range(variants)))
+    await client.close()
+    return counts["generated"], counts["failed"]
+
+
+def main(argv: Optional[Sequence[Text]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Precompute generative content for every career domain.")
+    parser.add_argument("command", choices=["build", "stats"])
+    parser.add_argument("--path", default=POOL_PATH)
+    parser.add_argument("--variants", type=int, default=POOL_VARIANTS, help="variants per domain and kind")
+    parser.add_argument("--concurrency", type=int, default=4, help="Gemini requests in flight")
+    parser.add_argument("--kinds", default=",".join(PROMPTS), help="comma-separated prompt kinds")
+    parser.add_argument("--careers", help="comma-separated domains (default: the whole catalog)")
+    parser.add_argument("--fresh", action="store_true", help="discard the existing pool instead of topping it up")
+    args = parser.parse_args(argv)
+
+    if args.command == "stats":
+        pool = ContentPool.load(args.path)
+        print(json.dumps({"path": args.path, "variants": len(pool), "by_kind": pool.stats()}, indent=2))
+        return
+
+    if not os.getenv("GEMINI_API_KEY"):
+        parser.error("GEMINI_API_KEY is not set")
+    from .catalog import get_catalog
+
+    kinds = args.kinds.split(",")
+    unknown = set(kinds) - set(PROMPTS)
+    if unknown:
+        parser.error(f"unknown kinds: {sorted(unknown)}")
+    careers = args.careers.split(",") if args.careers else get_catalog().names()
+    pool = (ContentPool(args.path, max_variants=args.variants) if args.fresh
+            else ContentPool.load(args.path, max_variants=args.variants))
+
+    start = time.perf_counter()
+    generated, failed = asyncio.run(build_pool(pool, careers, kinds, args.variants, args.concurrency))
+    elapsed = time.perf_counter() - start
+    pool.save(merge=not args.fresh)
+    print(f"Generated {generated} variants ({failed} failed) for {len(careers)} domains in {elapsed:.1f}s; "
+          f"{len(pool)} variants, {os.path.getsize(args.path) / 1024:.1f} KB in {args.path}")
+
+
+def _collect_metrics() -> Iterable[metrics.Sample]:
+    if _pool is None:
+        return []
+    return [
+        ("content_pool_hits_total", "counter", "Generative answers served from the precomputed pool.", _pool.hits),
+        ("content_pool_misses_total", "counter", "Generative answers the pool had no variant for.", _pool.misses),
+        ("content_pool_refreshes_total", "counter", "Pool variants regenerated in the background.", _pool.refreshes),
+        ("content_pool_variants", "gauge", "Variants currently held in the pool.", len(_pool)),
+    ]
+
+
+metrics.register_collector(_collect_metrics)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,262 @@
+# Semantic career matching with a local sentence encoder (CPU only)
+#
+# Optional alternative to the lexical TF-IDF matcher, enabled with
+# CAREER_MATCHER=embedding. "I enjoy building apps" has no keyword in common
+# with the Tech domain but lands close to it in embedding space.
+#
+#   python -m actions.embeddings build --model-dir models/all-MiniLM-L6-v2
+#
+# encodes every catalog domain once and writes a float32 matrix (.npy) plus a
+# small JSON manifest. At query time the matrix is memory-mapped and searched
+# exactly with one matrix-vector product. The encoder is loaded from a local
+# directory only (no hub downloads) and its Linear layers are dynamically
+# quantized to int8 for faster CPU inference.
+#
+# The action server loads the encoder in a background thread at start-up, and
+# queries are encoded on a dedicated thread, never on the event loop. The
+# manifest records a hash of the domain documents plus the encoder and its
+# dimension; an index built from other domain text or another model is not
+# used, and the domains are re-encoded in memory instead (run the build command
+# to persist them).
+import argparse
+import asyncio
+import hashlib
+import json
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Sequence, Text, Tuple
+
+from .catalog import CareerCatalog, get_catalog
+
+DEFAULT_INDEX_DIR = os.path.join(os.path.dirname(__file__), "data", "embeddings")
+ENCODER_DIR = os.getenv("CAREER_ENCODER_DIR", "")
+INDEX_DIR = os.getenv("CAREER_EMBEDDING_INDEX", DEFAULT_INDEX_DIR)
+
+
+def domain_document(name: Text, record: Dict[Text, Any]) -> Text:
+    """Text that represents a domain in embedding space."""
+    return f"{name}. {record.get('description', '')} Keywords: {', '.join(record.get('keywords', []))}"
+
+
+def catalog_documents(catalog: CareerCatalog) -> Tuple[List[Text], List[Text]]:
+    """Domain names and their documents, in catalog order."""
+    names, documents = [], []
+    for record in catalog.iter_records():
+        names.append(record["domain"])
+        documents.append(domain_document(record["domain"], record))
+    return names, documents
+
+
+def content_hash(names: Sequence[Text], documents: Sequence[Text]) -> Text:
+    """Hash of the text that was encoded; unlike the catalog's mtime, it only changes with the content."""
+    digest = hashlib.sha256()
+    for name, document in zip(names, documents):
+        digest.update(f"{name}\x00{document}\x00".encode("utf-8"))
+    return digest.hexdigest()
+
+
+class SentenceEncoder:
+    """Mean-pooled transformer sentence encoder, int8-quantized, loaded from a local directory."""
+
+    def __init__(self, model_dir: Text, quantize: bool = True, batch_size: int = 32,
+                 max_length: int = 256, num_threads: Optional[int] = None):
+        import torch
+        from transformers import AutoModel, AutoTokenizer
+
+        if not os.path.isdir(model_dir):
+            raise FileNotFoundError(f"Sentence encoder directory not found: {model_dir}")
+        if num_threads:
+            torch.set_num_threads(num_threads)
+        self.model_dir = model_dir
+        self.model_id = os.path.realpath(model_dir)
+        self.batch_size = batch_size
+        self.max_length = max_length
+        self.tokenizer = AutoTokenizer.from_pretrained(model_dir, local_files_only=True)
+        model = AutoModel.from_pretrained(model_dir, local_files_only=True).eval()
+        self.dim = int(model.config.hidden_size)
+        if quantize:
+            model = torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+        self.model = model
+        self._torch = torch
+
+    def encode(self, texts: Sequence[Text]):
+        """Returns an (n, dim) float32 array of L2-normalised embeddings."""
+        import numpy as np
+
+        torch = self._torch
+        batches = []
+        with torch.inference_mode():
+            for start in range(0, len(texts), self.batch_size):
+                batch = self.tokenizer(list(texts[start:start + self.batch_size]), padding=True,
+                                       truncation=True, max_length=self.max_length, return_tensors="pt")
+                hidden = self.model(**batch).last_hidden_state
+                mask = batch["attention_mask"].unsqueeze(-1).to(hidden.dtype)
+                pooled = (hidden * mask).sum(dim=1) / mask.sum(dim=1).clamp(min=1e-9)
+                batches.append(torch.nn.functional.normalize(pooled, dim=1).cpu().numpy())
+        if not batches:
+            return np.zeros((0, 0), dtype=np.float32)
+        return np.concatenate(batches).astype(np.float32, copy=False)
+
+
+class DomainEmbeddingIndex:
+    """(n_domains, dim) matrix of domain embeddings with exact top-k search."""
+
+    MATRIX_FILE = "domain_embeddings.npy"
+    MANIFEST_FILE = "domain_embeddings.json"
+
+    def __init__(self, domains: List[Text], matrix, content_hash: Text = "", model_id: Text = ""):
+        self.domains = domains
+        self.matrix = matrix
+        self.content_hash = content_hash
+        self.model_id = model_id
+
+    @property
+    def dim(self) -> int:
+        return int(self.matrix.shape[1]) if len(self.matrix.shape) == 2 else 0
+
+    @classmethod
+    def load(cls, index_dir: Text = INDEX_DIR,
+             encoder: Optional[SentenceEncoder] = None) -> "DomainEmbeddingIndex":
+        """Memory-maps a prebuilt index; raises ValueError if it was built with a different encoder."""
+        import numpy as np
+
+        with open(os.path.join(index_dir, cls.MANIFEST_FILE), encoding="utf-8") as f:
+            manifest = json.load(f)
+        matrix = np.load(os.path.join(index_dir, cls.MATRIX_FILE), mmap_mode="r")
+        index = cls(manifest["domains"], matrix, manifest.get("content_hash", ""), manifest.get("model_id", ""))
+        if matrix.ndim != 2 or matrix.shape[0] != len(index.domains) or index.dim != manifest.get("dim"):
+            raise ValueError(f"{cls.MATRIX_FILE} does not match its manifest")
+        if encoder is not None and not index.built_with(encoder):
+            raise ValueError(f"index was built with {index.model_id or 'an unknown model'} ({index.dim} dims), "
+                             f"not {encoder.model_id} ({encoder.dim} dims)")
+        return index
+
+    @classmethod
+    def encode_catalog(cls, catalog: CareerCatalog, encoder: SentenceEncoder) -> "DomainEmbeddingIndex":
+        """Encodes every catalog domain into an in-memory index."""
+        names, documents = catalog_documents(catalog)
+        return cls(names, encoder.encode(documents), content_hash(names, documents), encoder.model_id)
+
+    @classmethod
+    def build(cls, catalog: CareerCatalog, encoder: SentenceEncoder, index_dir: Text = INDEX_DIR) -> Text:
+        """Encodes every catalog domain and writes the matrix and manifest to ``index_dir``."""
+        import numpy as np
+
+        index = cls.encode_catalog(catalog, encoder)
+        os.makedirs(index_dir, exist_ok=True)
+        np.save(os.path.join(index_dir, cls.MATRIX_FILE), index.matrix)
+        with open(os.path.join(index_dir, cls.MANIFEST_FILE), "w", encoding="utf-8") as f:
+            json.dump({"domains": index.domains, "model_id": index.model_id,
+                       "content_hash": index.content_hash, "dim": index.dim}, f)
+        return index_dir
+
+    def built_with(self, encoder: SentenceEncoder) -> bool:
+        return self.model_id == encoder.model_id and self.dim == encoder.dim
+
+    def is_current(self, catalog: CareerCatalog, encoder: SentenceEncoder) -> bool:
+        """Whether the index encodes exactly ``catalog``'s domain documents with ``encoder``."""
+        return self.built_with(encoder) and self.content_hash == content_hash(*catalog_documents(catalog))
+
+    def search(self, query, top_k: int = 3) -> List[Tuple[Text, float]]:
+        """Exact cosine search of one normalised query vector; returns (domain, score 0-100)."""
+        import numpy as np
+
+        sims = np.asarray(self.matrix @ query, dtype=np.float32)
+        k = min(top_k, len(sims))
+        top = np.argpartition(-sims, k - 1)[:k]
+        top = top[np.argsort(-sims[top])]
+        return [(self.domains[i], float(sims[i]) * 100) for i in top]
+
+
+class EmbeddingMatcher:
+    """Encoder + domain index; ranks raw profile text by semantic similarity."""
+
+    def __init__(self, model_dir: Text = ENCODER_DIR, index_dir: Text = INDEX_DIR):
+        self.encoder = SentenceEncoder(model_dir)
+        self.index_dir = index_dir
+        self._lock = threading.Lock()
+        # Catalog fingerprint the index was last checked against; the content is only hashed when it changes.
+        self._checked: Any = None
+        try:
+            self.index: Optional[DomainEmbeddingIndex] = DomainEmbeddingIndex.load(index_dir, self.encoder)
+        except (OSError, ValueError, KeyError) as e:
+            print(f"Could not load domain embeddings from {index_dir}: {e}")
+            self.index = None
+
+    def current_index(self, catalog: CareerCatalog) -> DomainEmbeddingIndex:
+        """The index for ``catalog``; re-encodes the domains if their text has changed since it was built."""
+        with self._lock:
+            fingerprint = catalog.fingerprint
+            if self.index is not None and self._checked == fingerprint:
+                return self.index
+            if self.index is None or not self.index.is_current(catalog, self.encoder):
+                print("Domain embeddings are missing or do not match the career catalog; re-encoding them "
+                      "(run `python -m actions.embeddings build` to persist them).")
+                self.index = DomainEmbeddingIndex.encode_catalog(catalog, self.encoder)
+            self._checked = fingerprint
+            return self.index
+
+    def rank(self, profile_text: Text, top_k: int = 3,
+             catalog: Optional[CareerCatalog] = None) -> List[Tuple[Text, float]]:
+        catalog = catalog or get_catalog()
+        index = self.current_index(catalog)
+        matches = index.search(self.encoder.encode([profile_text])[0], top_k)
+        # The catalog may have been reloaded since; only return domains it still has.
+        return [(domain, score) for domain, score in matches if catalog.get(domain) is not None]
+
+
+_matcher: Optional[EmbeddingMatcher] = None
+_matcher_lock = threading.Lock()
+# One thread: queries are encoded one at a time, each using torch's own intra-op threads.
+_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="embedding-encoder")
+
+
+def get_embedding_matcher() -> EmbeddingMatcher:
+    """Loads the encoder and domain index on first use (CAREER_ENCODER_DIR, CAREER_EMBEDDING_INDEX)."""
+    global _matcher
+    if _matcher is None:
+        with _matcher_lock:
+            if _matcher is None:
+                if not ENCODER_DIR:
+                    raise RuntimeError("CAREER_MATCHER=embedding needs CAREER_ENCODER_DIR to point at a local model.")
+                _matcher = EmbeddingMatcher(ENCODER_DIR, INDEX_DIR)
+    return _matcher
+
+
+def _preload() -> None:
+    try:
+        get_embedding_matcher().current_index(get_catalog())
+    except Exception as e:
+        # Reported again, with the traceback, by the first request that needs the matcher.
+        print(f"Could not load the sentence encoder: {e}")
+
+
+def preload_embedding_matcher() -> None:
+    """Loads the encoder and index in a background thread so the first recommendation does not pay for it."""
+    threading.Thread(target=_preload, name="embedding-load", daemon=True).start()
+
+
+async def rank_profile(profile_text: Text, top_k: int = 3) -> List[Tuple[Text, float]]:
+    """``EmbeddingMatcher.rank`` on the encoder thread, keeping model loading and inference off the event loop."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_executor, lambda: get_embedding_matcher().rank(profile_text, top_k))
+
+
+def main(argv: Optional[Sequence[Text]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Precompute career domain embeddings.")
+    parser.add_argument("command", choices=["build"])
+    parser.add_argument("--model-dir", default=ENCODER_DIR, required=not ENCODER_DIR,
+                        help="local sentence-encoder directory (defaults to $CAREER_ENCODER_DIR)")
+    parser.add_argument("--index-dir", default=INDEX_DIR)
+    parser.add_argument("--no-quantize", action="store_true")
+    args = parser.parse_args(argv)
+
+    catalog = get_catalog()
+    encoder = SentenceEncoder(args.model_dir, quantize=not args.no_quantize)
+    index_dir = DomainEmbeddingIndex.build(catalog, encoder, args.index_dir)
+    print(f"Encoded {len(catalog)} domains into {index_dir}")
+
+
+if __name__ == "__main__":
+    main()
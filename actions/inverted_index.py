@@ -0,0 +1,90 @@
+# Keyword inverted index over the career catalog
+#
+# term -> postings of (domain, TF-IDF weight), taken from the fitted career index.
+# A query only walks the postings of terms that occur in the profile, so the cost
+# depends on the profile and on how many domains share its terms, not on the size
+# of the catalog. Each match also records which terms contributed to its score.
+import heapq
+import math
+from collections import Counter, defaultdict
+from typing import Callable, Dict, List, NamedTuple, Optional, Text, Tuple
+
+from .career_index import CareerIndex, get_career_index
+from .catalog import CareerCatalog
+
+
+class Recommendation(NamedTuple):
+    domain: Text
+    score: float
+    # (term, contribution to the score) in descending order of contribution
+    terms: List[Tuple[Text, float]]
+
+
+class InvertedIndex:
+    """Postings lists built from a CareerIndex's L2-normalised domain x term matrix."""
+
+    def __init__(self, career_index: CareerIndex):
+        self.fingerprint = career_index.fingerprint
+        self.domains = career_index.domains
+        self._ids = {name: i for i, name in enumerate(self.domains)}
+        vectorizer = career_index.vectorizer
+        self.idf: Dict[Text, float] = {}
+        self.postings: Dict[Text, List[Tuple[int, float]]] = {}
+
+        csc = career_index.matrix.tocsc()
+        for term, col in vectorizer.vocabulary_.items():
+            start, end = csc.indptr[col], csc.indptr[col + 1]
+            self.postings[term] = list(zip(csc.indices[start:end].tolist(), csc.data[start:end].tolist()))
+            self.idf[term] = float(vectorizer.idf_[col])
+
+    def profile_weights(self, processed_profile: Text) -> Dict[Text, float]:
+        """TF-IDF weights of the profile's indexed terms, L2-normalised like TfidfVectorizer."""
+        # TfidfVectorizer's default token pattern ignores single-character tokens.
+        counts = Counter(t for t in processed_profile.split() if len(t) > 1 and t in self.idf)
+        weights = {t: n * self.idf[t] for t, n in counts.items()}
+        norm = math.sqrt(sum(w * w for w in weights.values()))
+        return {t: w / norm for t, w in weights.items()} if norm else {}
+
+    def search(self, processed_profile: Text, top_k: int = 3) -> List[Recommendation]:
+        """Returns the top-k domains by cosine similarity (0-100) with their contributing terms."""
+        scores: Dict[int, float] = defaultdict(float)
+        contributions: Dict[int, List[Tuple[Text, float]]] = defaultdict(list)
+        for term, q in self.profile_weights(processed_profile).items():
+            for domain_id, weight in self.postings[term]:
+                contribution = q * weight * 100
+                scores[domain_id] += contribution
+                contributions[domain_id].append((term, contribution))
+
+        best = heapq.nlargest(top_k, scores.items(), key=lambda item: item[1])
+        return [
+            Recommendation(
+                self.domains[domain_id],
+                score,
+                sorted(contributions[domain_id], key=lambda tc: tc[1], reverse=True),
+            )
+            for domain_id, score in best
+        ]
+
+    def explain(self, processed_profile: Text, domains: List[Text]) -> Dict[Text, List[Tuple[Text, float]]]:
+        """Contributing terms for specific domains, e.g. ones ranked by another matcher."""
+        wanted = {self._ids[name] for name in domains if name in self._ids}
+        contributions: Dict[int, List[Tuple[Text, float]]] = defaultdict(list)
+        for term, q in self.profile_weights(processed_profile).items():
+            for domain_id, weight in self.postings[term]:
+                if domain_id in wanted:
+                    contributions[domain_id].append((term, q * weight * 100))
+        return {self.domains[i]: sorted(terms, key=lambda tc: tc[1], reverse=True)
+                for i, terms in contributions.items()}
+
+
+_inverted: Optional[InvertedIndex] = None
+
+
+def get_inverted_index(catalog: CareerCatalog,
+                       preprocess: Optional[Callable[[Text], Text]] = None) -> InvertedIndex:
+    """Returns the shared inverted index, rebuilt together with the career index."""
+    global _inverted
+    career_index = get_career_index(catalog, preprocess)
+    if _inverted is None or _inverted.fingerprint != career_index.fingerprint:
+        _inverted = InvertedIndex(career_index)
+    return _inverted
@@ -0,0 +1,240 @@
+# Cache for generative (Gemini) responses
+#
+# Two tiers: an in-process LRU dict in front of an optional SQLite table that
+# survives restarts and is shared by every worker on the node. Both tiers expire
+# entries after a TTL and are bounded in size.
+#
+# The SQLite tier uses the WAL-mode ConnectionPool of actions.store, so lookups
+# never wait for another worker's writes. New responses go to the in-process tier
+# straight away and are written to SQLite by a background thread in batches, so
+# nothing on the event loop waits for a commit. Expired and surplus rows are
+# trimmed periodically by the same thread instead of on every write.
+import atexit
+import hashlib
+import os
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Iterable, Optional, Text, Tuple
+
+from . import metrics
+from .store import ConnectionPool
+
+DEFAULT_CACHE_DB = "career_counsellor_cache.db"
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def cache_key(prompt: Text, model: Text) -> Text:
+    """Hashes the whitespace-normalised prompt together with the model name."""
+    normalized = _WHITESPACE.sub(" ", prompt).strip()
+    return hashlib.sha256(f"{model}\x00{normalized}".encode("utf-8")).hexdigest()
+
+
+class ResponseCache:
+    """LRU + TTL cache for LLM responses with an optional persistent SQLite tier."""
+
+    def __init__(self, max_entries: int = 512, ttl: float = 24 * 3600,
+                 db_path: Optional[Text] = None, max_db_entries: int = 10000,
+                 flush_interval: float = 0.5, evict_interval: float = 300.0):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.db_path = db_path
+        self.max_db_entries = max_db_entries
+        self.flush_interval = flush_interval
+        self.evict_interval = evict_interval
+        self._memory: "OrderedDict[Text, Tuple[float, Text]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.db_hits = 0
+        self.evictions = 0
+        self._pending: Dict[Text, Tuple[Text, Text, float]] = {}
+        self._flush_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._closed = False
+        self._last_eviction = time.monotonic()
+        self._pool: Optional[ConnectionPool] = None
+        if db_path:
+            self._pool = ConnectionPool(db_path, size=2, busy_timeout_ms=5000)
+            self._init_db()
+            self._writer = threading.Thread(target=self._run_writer, name="llm-cache-writer", daemon=True)
+            self._writer.start()
+            atexit.register(self.close)
+
+    # --- SQLite tier ---
+    def _init_db(self) -> None:
+        with self._pool.connection() as conn:
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS llm_cache (
+                    key TEXT PRIMARY KEY,
+                    model TEXT,
+                    response TEXT,
+                    created_at REAL
+                )
+            ''')
+            conn.execute('CREATE INDEX IF NOT EXISTS idx_llm_cache_created ON llm_cache(created_at)')
+
+    def _db_get(self, key: Text) -> Optional[Tuple[float, Text]]:
+        with self._pool.connection() as conn:
+            row = conn.execute('SELECT created_at, response FROM llm_cache WHERE key = ?', (key,)).fetchone()
+        return (row[0], row[1]) if row else None
+
+    def flush(self) -> int:
+        """Writes queued responses in one transaction. Returns the number of rows written."""
+        if self._pool is None:
+            return 0
+        with self._flush_lock:
+            with self._lock:
+                batch, self._pending = self._pending, {}
+            if not batch:
+                return 0
+            rows = [(key, model, response, created_at) for key, (model, response, created_at) in batch.items()]
+            try:
+                with self._pool.connection() as conn:
+                    conn.execute("BEGIN IMMEDIATE")
+                    try:
+                        conn.executemany('INSERT OR REPLACE INTO llm_cache (key, model, response, created_at) '
+                                         'VALUES (?, ?, ?, ?)', rows)
+                        conn.execute("COMMIT")
+                    except BaseException:
+                        conn.execute("ROLLBACK")
+                        raise
+            except sqlite3.Error as e:
+                # The responses are still in the in-process tier; losing them here only costs a future miss.
+                print(f"LLM cache write error: {e}")
+                return 0
+            return len(rows)
+
+    def evict_db(self) -> None:
+        """Deletes expired rows and the oldest rows beyond max_db_entries."""
+        try:
+            with self._pool.connection() as conn:
+                conn.execute('DELETE FROM llm_cache WHERE created_at < ?', (time.time() - self.ttl,))
+                conn.execute('''
+                    DELETE FROM llm_cache WHERE key IN (
+                        SELECT key FROM llm_cache ORDER BY created_at DESC LIMIT -1 OFFSET ?
+                    )
+                ''', (self.max_db_entries,))
+        except sqlite3.Error as e:
+            print(f"LLM cache eviction error: {e}")
+
+    def _run_writer(self) -> None:
+        while not self._closed:
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            self.flush()
+            if time.monotonic() - self._last_eviction > self.evict_interval:
+                self._last_eviction = time.monotonic()
+                self.evict_db()
+
+    def close(self) -> None:
+        if self._pool is None or self._closed:
+            return
+        self._closed = True
+        self._wakeup.set()
+        self._writer.join(timeout=5)
+        self.flush()
+        self._pool.close()
+
+    # --- Public API ---
+    def _remember(self, key: Text, created_at: float, response: Text) -> None:
+        self._memory[key] = (created_at, response)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+            self.evictions += 1
+
+    def get(self, prompt: Text, model: Text) -> Optional[Text]:
+        """Returns a cached, unexpired response or None."""
+        key = cache_key(prompt, model)
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                if now - entry[0] <= self.ttl:
+                    self._memory.move_to_end(key)
+                    self.hits += 1
+                    return entry[1]
+                del self._memory[key]
+
+        if self._pool is not None:
+            try:
+                entry = self._db_get(key)
+            except sqlite3.Error as e:
+                print(f"LLM cache read error: {e}")
+                entry = None
+            if entry is not None and now - entry[0] <= self.ttl:
+                with self._lock:
+                    self._remember(key, entry[0], entry[1])
+                    self.hits += 1
+                    self.db_hits += 1
+                return entry[1]
+
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def set(self, prompt: Text, model: Text, response: Text) -> None:
+        key = cache_key(prompt, model)
+        now = time.time()
+        with self._lock:
+            self._remember(key, now, response)
+            if self._pool is not None:
+                # Written by the background thread; the in-process tier serves it until then.
+                self._pending[key] = (model, response, now)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._memory.clear()
+            self._pending.clear()
+        if self._pool is not None:
+            with self._pool.connection() as conn:
+                conn.execute('DELETE FROM llm_cache')
+
+    def stats(self) -> Dict[Text, int]:
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "db_hits": self.db_hits,
+                "evictions": self.evictions,
+                "size": len(self._memory),
+            }
+
+
+_cache: Optional[ResponseCache] = None
+
+
+def get_response_cache() -> ResponseCache:
+    """Returns the process-wide cache configured from LLM_CACHE_* environment variables.
+
+    Set LLM_CACHE_DB to an empty string to keep the cache in memory only.
+    """
+    global _cache
+    if _cache is None:
+        _cache = ResponseCache(
+            max_entries=int(os.getenv("LLM_CACHE_SIZE", "512")),
+            ttl=float(os.getenv("LLM_CACHE_TTL", str(24 * 3600))),
+            db_path=os.getenv("LLM_CACHE_DB", DEFAULT_CACHE_DB) or None,
+            max_db_entries=int(os.getenv("LLM_CACHE_DB_SIZE", "10000")),
+        )
+    return _cache
+
+
+def _collect_metrics() -> Iterable[metrics.Sample]:
+    if _cache is None:
+        return []
+    stats = _cache.stats()
+    return [
+        ("llm_cache_hits_total", "counter", "LLM responses served from the cache (both tiers).", stats["hits"]),
+        ("llm_cache_db_hits_total", "counter", "LLM responses served from the SQLite tier.", stats["db_hits"]),
+        ("llm_cache_misses_total", "counter", "LLM cache lookups that missed.", stats["misses"]),
+        ("llm_cache_evictions_total", "counter", "Entries evicted from the in-process tier.", stats["evictions"]),
+        ("llm_cache_entries", "gauge", "Entries in the in-process tier.", stats["size"]),
+    ]
+
+
+metrics.register_collector(_collect_metrics)
@@ -0,0 +1,252 @@
+# Asynchronous Gemini client shared by the generative actions
+#
+# One pooled aiohttp session per action-server process, a semaphore bounding the
+# number of upstream requests, jittered exponential backoff for 429/5xx, and
+# coalescing so concurrent identical prompts share a single upstream call.
+import asyncio
+import json
+import os
+import random
+from typing import TYPE_CHECKING, Any, AsyncIterator, Dict, Iterable, List, Optional, Text
+
+from . import metrics
+from .llm_cache import ResponseCache, cache_key, get_response_cache
+
+if TYPE_CHECKING:
+    import aiohttp
+
+DEFAULT_API_BASE = "https://generativelanguage.googleapis.com/v1beta"
+RETRYABLE_STATUSES = {429, 500, 502, 503, 504}
+
+
+class LLMError(Exception):
+    """Raised when the model could not be reached or returned an unusable response."""
+
+
+class GeminiClient:
+    """Async, connection-pooled client for the Gemini generateContent endpoint."""
+
+    def __init__(self, api_key: Optional[Text], model: Text = "gemini-pro",
+                 api_base: Text = DEFAULT_API_BASE, max_concurrency: int = 32,
+                 max_retries: int = 3, timeout: float = 60.0, backoff_base: float = 0.5,
+                 backoff_cap: float = 8.0, cache: Optional[ResponseCache] = None):
+        self.api_key = api_key
+        self.model = model
+        self.api_base = api_base.rstrip("/")
+        self.max_concurrency = max_concurrency
+        self.max_retries = max_retries
+        self.timeout = timeout
+        self.backoff_base = backoff_base
+        self.backoff_cap = backoff_cap
+        self.cache = cache
+        self._session: Optional["aiohttp.ClientSession"] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._inflight: Dict[Text, "asyncio.Future[Text]"] = {}
+        self.upstream_requests = 0
+        self.coalesced = 0
+
+    # --- Session management ---
+    def _ensure_session(self) -> "aiohttp.ClientSession":
+        import aiohttp
+
+        loop = asyncio.get_running_loop()
+        if self._session is None or self._session.closed or self._loop is not loop:
+            # Sessions and semaphores are bound to the loop they were created on.
+            connector = aiohttp.TCPConnector(limit=self.max_concurrency, keepalive_timeout=60)
+            self._session = aiohttp.ClientSession(
+                connector=connector,
+                timeout=aiohttp.ClientTimeout(total=self.timeout),
+                headers={'Content-Type': 'application/json'},
+            )
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+            self._inflight = {}
+            self._loop = loop
+        return self._session
+
+    async def close(self) -> None:
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+
+    def endpoint(self, method: Text = "generateContent") -> Text:
+        return f"{self.api_base}/models/{self.model}:{method}"
+
+    @staticmethod
+    def payload(prompt: Text) -> Dict[Text, Any]:
+        return {"contents": [{"parts": [{"text": prompt}]}]}
+
+    def _backoff(self, attempt: int, retry_after: Optional[Text] = None) -> float:
+        if retry_after:
+            try:
+                return min(float(retry_after), self.backoff_cap)
+            except ValueError:
+                pass
+        delay = min(self.backoff_cap, self.backoff_base * (2 ** attempt))
+        return delay * random.uniform(0.5, 1.5)
+
+    # --- Requests ---
+    async def _post(self, prompt: Text) -> Text:
+        import aiohttp
+
+        session = self._ensure_session()
+        params = {"key": self.api_key} if self.api_key else None
+        last_error: Optional[Exception] = None
+
+        for attempt in range(self.max_retries + 1):
+            try:
+                async with self._semaphore:
+                    self.upstream_requests += 1
+                    with metrics.span("gemini_http"):
+                        async with session.post(self.endpoint(), params=params, json=self.payload(prompt)) as response:
+                            status = response.status
+                            retry_after = response.headers.get("Retry-After")
+                            if status >= 400:
+                                error_text = await response.text()
+                            else:
+                                body = await response.json(content_type=None)
+                if status in RETRYABLE_STATUSES and attempt < self.max_retries:
+                    last_error = LLMError(f"HTTP {status}")
+                    await asyncio.sleep(self._backoff(attempt, retry_after))
+                    continue
+                if status >= 400:
+                    raise LLMError(f"HTTP {status}: {error_text}")
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                last_error = e
+                if attempt < self.max_retries:
+                    await asyncio.sleep(self._backoff(attempt))
+                    continue
+                raise LLMError(str(e)) from e
+            except ValueError as e:
+                # A 200 whose body is not JSON (e.g. an HTML page from a proxy).
+                raise LLMError(f"Could not parse response: {e}") from e
+
+            try:
+                return body['candidates'][0]['content']['parts'][0]['text']
+            except (KeyError, IndexError, TypeError) as e:
+                raise LLMError(f"Could not parse response: {body}") from e
+
+        raise LLMError(str(last_error))
+
+    async def generate(self, prompt: Text, use_cache: bool = True) -> Text:
+        """Returns the model's text for a prompt, sharing the upstream call with identical in-flight prompts."""
+        if use_cache and self.cache is not None:
+            cached = self.cache.get(prompt, self.model)
+            if cached is not None:
+                return cached
+
+        self._ensure_session()
+        key = cache_key(prompt, self.model)
+        if use_cache and key in self._inflight:
+            self.coalesced += 1
+            return await asyncio.shield(self._inflight[key])
+
+        future: "asyncio.Future[Text]" = asyncio.get_running_loop().create_future()
+        if use_cache:
+            self._inflight[key] = future
+        try:
+            text = await self._post(prompt)
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            # Mark retrieved so followers that already left don't log "exception never retrieved".
+            future.exception()
+            raise
+        else:
+            future.set_result(text)
+            if use_cache and self.cache is not None:
+                self.cache.set(prompt, self.model, text)
+            return text
+        finally:
+            if self._inflight.get(key) is future:
+                del self._inflight[key]
+
+    async def stream(self, prompt: Text, use_cache: bool = True) -> AsyncIterator[Text]:
+        """Yields text chunks from the streamGenerateContent endpoint as they are produced.
+
+        A cached response is yielded as a single chunk; a completed stream is cached.
+        Connection errors and retryable statuses are retried with the same backoff as
+        generate(), but only until the first chunk has been yielded. Unlike generate(),
+        concurrent identical streams are not coalesced; each reader gets its own upstream call.
+        """
+        if use_cache and self.cache is not None:
+            cached = self.cache.get(prompt, self.model)
+            if cached is not None:
+                yield cached
+                return
+
+        import aiohttp
+
+        session = self._ensure_session()
+        params = {"alt": "sse"}
+        if self.api_key:
+            params["key"] = self.api_key
+        parts: List[Text] = []
+
+        for attempt in range(self.max_retries + 1):
+            retry_after: Optional[Text] = None
+            try:
+                async with self._semaphore:
+                    self.upstream_requests += 1
+                    async with session.post(self.endpoint("streamGenerateContent"), params=params,
+                                            json=self.payload(prompt)) as response:
+                        if response.status >= 400:
+                            if response.status not in RETRYABLE_STATUSES or attempt == self.max_retries:
+                                raise LLMError(f"HTTP {response.status}: {await response.text()}")
+                            retry_after = response.headers.get("Retry-After")
+                        else:
+                            # Server-Sent Events: one "data: {json}" line per partial GenerateContentResponse.
+                            async for raw_line in response.content:
+                                line = raw_line.decode("utf-8").strip()
+                                if not line.startswith("data:"):
+                                    continue
+                                event = json.loads(line[5:])
+                                for candidate in event.get("candidates", []):
+                                    for part in candidate.get("content", {}).get("parts", []):
+                                        chunk = part.get("text")
+                                        if chunk:
+                                            parts.append(chunk)
+                                            yield chunk
+                            break
+            except (aiohttp.ClientError, asyncio.TimeoutError, ValueError) as e:
+                # Once text has reached the reader, a retry would repeat it.
+                if parts or attempt == self.max_retries or isinstance(e, ValueError):
+                    raise LLMError(str(e)) from e
+            await asyncio.sleep(self._backoff(attempt, retry_after))
+
+        if use_cache and self.cache is not None and parts:
+            self.cache.set(prompt, self.model, "".join(parts))
+
+
+_client: Optional[GeminiClient] = None
+
+
+def get_llm_client() -> GeminiClient:
+    """Returns the process-wide client configured from GEMINI_* environment variables."""
+    global _client
+    if _client is None:
+        _client = GeminiClient(
+            api_key=os.getenv("GEMINI_API_KEY"),
+            model=os.getenv("GEMINI_MODEL", "gemini-pro"),
+            api_base=os.getenv("GEMINI_API_BASE", DEFAULT_API_BASE),
+            max_concurrency=int(os.getenv("GEMINI_MAX_CONCURRENCY", "32")),
+            max_retries=int(os.getenv("GEMINI_MAX_RETRIES", "3")),
+            timeout=float(os.getenv("GEMINI_TIMEOUT", "60")),
+            cache=get_response_cache(),
+        )
+    return _client
+
+
+def _collect_metrics() -> Iterable[metrics.Sample]:
+    if _client is None:
+        return []
+    return [
+        ("llm_requests_in_flight", "gauge", "Distinct prompts currently waiting on Gemini.", len(_client._inflight)),
+        ("llm_upstream_requests_total", "counter", "HTTP requests sent to Gemini, retries included.", _client.upstream_requests),
+        ("llm_coalesced_requests_total", "counter", "Calls that joined an identical in-flight prompt.", _client.coalesced),
+    ]
+
+
+metrics.register_collector(_collect_metrics)
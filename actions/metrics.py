@@ -0,0 +1,263 @@
+# Hot-path instrumentation for the action server
+#
+# Enabled with ACTION_METRICS=true. Action runs and named steps (preprocessing,
+# scoring, Gemini calls, report submission, SQLite flushes) are recorded in
+# fixed-bucket histograms and served in Prometheus text format at
+# http://localhost:5056/metrics. Set ACTION_TRACE_LOG to a file path to also
+# append one JSON line per action run listing the time spent in each step.
+#
+# When disabled, ``timed`` and ``instrument_action`` return the function
+# unchanged at decoration time and ``span`` returns a shared no-op context, so
+# the hot path pays at most one attribute check.
+import bisect
+import contextvars
+import functools
+import inspect
+import json
+import os
+import threading
+import time
+from contextlib import nullcontext
+from typing import Any, Callable, Dict, Iterable, List, Optional, Text, Tuple
+
+from . import sidecar
+
+ENABLED = os.getenv("ACTION_METRICS", "false").lower() in ("1", "true", "yes")
+TRACE_LOG = os.getenv("ACTION_TRACE_LOG", "")
+METRICS_PATH = "/metrics"
+
+# Seconds; wide enough for both a TF-IDF lookup and a slow Gemini generation.
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+Labels = Tuple[Tuple[Text, Text], ...]
+# (metric name, type, help, value) reported by a collector at scrape time
+Sample = Tuple[Text, Text, Text, float]
+
+
+class Histogram:
+    """Cumulative-bucket histogram; ``observe`` is a bisect and three additions under a lock."""
+
+    def __init__(self, buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float) -> None:
+        i = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            self.counts[i] += 1
+            self.sum += value
+            self.count += 1
+
+    def snapshot(self) -> Tuple[List[int], float, int]:
+        with self._lock:
+            return list(self.counts), self.sum, self.count
+
+
+class Counter:
+    """Monotonic counter, also used as a gauge through ``dec``."""
+
+    def __init__(self):
+        self.value = 0.0
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1.0) -> None:
+        with self._lock:
+            self.value += amount
+
+    def dec(self, amount: float = 1.0) -> None:
+        self.inc(-amount)
+
+
+class Registry:
+    """Named metric families with labels, plus collectors polled only when scraped."""
+
+    def __init__(self):
+        self._families: Dict[Text, Tuple[Text, Text, Dict[Labels, Any]]] = {}
+        self._collectors: List[Callable[[], Iterable[Sample]]] = []
+        self._lock = threading.Lock()
+
+    def _get(self, kind: Text, name: Text, help_text: Text, labels: Dict[Text, Text], factory):
+        key = tuple(sorted(labels.items()))
+        family = self._families.get(name)
+        if family is None or key not in family[2]:
+            with self._lock:
+                family = self._families.setdefault(name, (kind, help_text, {}))
+                family[2].setdefault(key, factory())
+        return family[2][key]
+
+    def histogram(self, name: Text, help_text: Text = "", **labels: Text) -> Histogram:
+        return self._get("histogram", name, help_text, labels, Histogram)
+
+    def counter(self, name: Text, help_text: Text = "", **labels: Text) -> Counter:
+        return self._get("counter", name, help_text, labels, Counter)
+
+    def gauge(self, name: Text, help_text: Text = "", **labels: Text) -> Counter:
+        return self._get("gauge", name, help_text, labels, Counter)
+
+    def register_collector(self, collector: Callable[[], Iterable[Sample]]) -> None:
+        self._collectors.append(collector)
+
+    def render(self) -> Text:
+        """Prometheus text exposition format (version 0.0.4)."""
+        lines: List[Text] = []
+        with self._lock:
+            families = [(name, kind, help_text, list(series.items()))
+                        for name, (kind, help_text, series) in sorted(self._families.items())]
+        for name, kind, help_text, series in families:
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+            for labels, metric in series:
+                if kind == "histogram":
+                    counts, total, count = metric.snapshot()
+                    cumulative = 0
+                    for bound, n in zip(list(metric.buckets) + [float("inf")], counts):
+                        cumulative += n
+                        le = "+Inf" if bound == float("inf") else repr(bound)
+                        lines.append(f"{name}_bucket{_format_labels(labels + (('le', le),))} {cumulative}")
+                    lines.append(f"{name}_sum{_format_labels(labels)} {total}")
+                    lines.append(f"{name}_count{_format_labels(labels)} {count}")
+                else:
+                    lines.append(f"{name}{_format_labels(labels)} {metric.value}")
+        for collector in self._collectors:
+            try:
+                for name, kind, help_text, value in collector():
+                    lines += [f"# HELP {name} {help_text}", f"# TYPE {name} {kind}", f"{name} {value}"]
+            except Exception as e:  # a broken collector must not take the endpoint down
+                print(f"Metrics collector failed: {e}")
+        return "\n".join(lines) + "\n"
+
+
+def _format_labels(labels: Labels) -> Text:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in labels) + "}"
+
+
+def _escape(value: Text) -> Text:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+REGISTRY = Registry()
+register_collector = REGISTRY.register_collector
+
+# Steps recorded during the current action run, for the trace log.
+_trace: "contextvars.ContextVar[Optional[List[Tuple[Text, float]]]]" = contextvars.ContextVar("trace", default=None)
+_trace_lock = threading.Lock()
+_NULL_SPAN = nullcontext()
+
+
+def _step_histogram(step: Text) -> Histogram:
+    return REGISTRY.histogram("action_step_duration_seconds", "Time spent in a named step.", step=step)
+
+
+class _Span:
+    __slots__ = ("step", "histogram", "start")
+
+    def __init__(self, step: Text, histogram: Optional[Histogram] = None):
+        self.step = step
+        self.histogram = histogram or _step_histogram(step)
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        elapsed = time.perf_counter() - self.start
+        self.histogram.observe(elapsed)
+        steps = _trace.get()
+        if steps is not None:
+            steps.append((self.step, elapsed))
+        return False
+
+
+def span(step: Text):
+    """Context manager timing a block as ``step``; a shared no-op when metrics are disabled."""
+    return _Span(step) if ENABLED else _NULL_SPAN
+
+
+def timed(step: Text):
+    """Decorator timing every call of a sync or async function as ``step``."""
+    def decorate(fn):
+        if not ENABLED:
+            return fn
+        histogram = _step_histogram(step)
+        if inspect.iscoroutinefunction(fn):
+            @functools.wraps(fn)
+            async def async_wrapper(*args, **kwargs):
+                with _Span(step, histogram):
+                    return await fn(*args, **kwargs)
+            return async_wrapper
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with _Span(step, histogram):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorate
+
+
+class _ActionRun:
+    """Times one Action.run, tracks in-flight runs and writes the trace line."""
+
+    def __init__(self, action: Text, tracker: Any):
+        self.action = action
+        self.sender_id = getattr(tracker, "sender_id", None)
+
+    def __enter__(self):
+        sidecar.ensure_started()
+        REGISTRY.gauge("action_runs_in_flight", "Action runs currently executing.").inc()
+        self.token = _trace.set([] if TRACE_LOG else None)
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        elapsed = time.perf_counter() - self.start
+        steps = _trace.get()
+        _trace.reset(self.token)
+        REGISTRY.gauge("action_runs_in_flight", "Action runs currently executing.").dec()
+        REGISTRY.histogram("action_run_duration_seconds", "Wall time of Action.run.", action=self.action).observe(elapsed)
+        if exc_type is not None:
+            REGISTRY.counter("action_run_errors_total", "Action runs that raised.", action=self.action).inc()
+        if steps is not None:
+            _write_trace({"ts": time.time(), "sender_id": self.sender_id, "action": self.action,
+                          "ms": round(elapsed * 1000, 3), "error": exc_type.__name__ if exc_type else None,
+                          "steps": [{"step": s, "ms": round(d * 1000, 3)} for s, d in steps]})
+        return False
+
+
+def instrument_action(run):
+    """Decorator for ``Action.run`` (sync or async) labelled with the action's ``name()``."""
+    if not ENABLED:
+        return run
+    if inspect.iscoroutinefunction(run):
+        @functools.wraps(run)
+        async def async_wrapper(self, dispatcher, tracker, domain):
+            with _ActionRun(self.name(), tracker):
+                return await run(self, dispatcher, tracker, domain)
+        return async_wrapper
+
+    @functools.wraps(run)
+    def wrapper(self, dispatcher, tracker, domain):
+        with _ActionRun(self.name(), tracker):
+            return run(self, dispatcher, tracker, domain)
+    return wrapper
+
+
+def _write_trace(record: Dict[Text, Any]) -> None:
+    line = json.dumps(record) + "\n"
+    try:
+        with _trace_lock, open(TRACE_LOG, "a", encoding="utf-8") as f:
+            f.write(line)
+    except OSError as e:
+        print(f"Could not write trace log {TRACE_LOG}: {e}")
+
+
+def _serve_metrics(request, _rest: Text) -> None:
+    sidecar.send_bytes(request, REGISTRY.render().encode("utf-8"),
+                       content_type="text/plain; version=0.0.4; charset=utf-8")
+
+
+sidecar.register_route(METRICS_PATH, _serve_metrics)
@@ -0,0 +1,117 @@
+# Text preprocessing shared by the career scoring and skill-gap actions
+#
+# Tokenize, drop stopwords and non-alphabetic tokens, lemmatize. Lemmas are
+# memoized per token, batches lemmatize each distinct token once, and processed
+# resumes are kept per conversation so a resume is normalised only once.
+#
+# Without the NLTK corpora (see resources.py) the pipeline degrades instead of
+# failing: scikit-learn's built-in English stopword list replaces NLTK's, and
+# tokens are left unlemmatized.
+import hashlib
+import os
+import re
+import threading
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Iterable, List, Optional, Text, Tuple
+
+from .resources import ensure_nltk_data
+
+# Unicode letters only, the same tokens word_tokenize + str.isalpha keeps for ordinary prose.
+_WORD = re.compile(r"[^\W\d_]+")
+
+
+def _identity(word: Text) -> Text:
+    return word
+
+
+class TextPreprocessor:
+    """Memoized tokenize -> filter -> lemmatize pipeline.
+
+    ``tokenizer`` is ``"regex"`` (fast, letters-only split) or ``"nltk"`` (word_tokenize).
+    """
+
+    def __init__(self, tokenizer: Text = "regex", lemma_cache_size: int = 100_000,
+                 session_cache_size: int = 2048):
+        if tokenizer not in ("regex", "nltk"):
+            raise ValueError(f"Unknown tokenizer mode: {tokenizer}")
+        self.tokenizer = tokenizer
+        # nltk is imported here rather than at module level to keep action-server start-up fast.
+        missing = ensure_nltk_data()
+        if "stopwords" in missing:
+            from sklearn.feature_extraction.text import ENGLISH_STOP_WORDS
+
+            self.stop_words = frozenset(ENGLISH_STOP_WORDS)
+        else:
+            from nltk.corpus import stopwords
+
+            self.stop_words = frozenset(stopwords.words('english'))
+        # word_tokenize needs punkt; fall back to the regex split without it.
+        self.tokenizer_missing = tokenizer == "nltk" and bool({"punkt", "punkt_tab"} & set(missing))
+        if "wordnet" in missing:
+            self.lemmatize = _identity
+        else:
+            from nltk.stem import WordNetLemmatizer
+
+            self.lemmatize = lru_cache(maxsize=lemma_cache_size)(WordNetLemmatizer().lemmatize)
+        self._sessions: "OrderedDict[Tuple[Text, Text, bytes], Text]" = OrderedDict()
+        self._session_cache_size = session_cache_size
+        self._lock = threading.Lock()
+
+    def tokenize(self, text: Text) -> List[Text]:
+        """Lower-cases and splits text, keeping only alphabetic, non-stopword tokens."""
+        lowered = text.lower()
+        if self.tokenizer == "regex" or self.tokenizer_missing:
+            tokens = _WORD.findall(lowered)
+        else:
+            from nltk.tokenize import word_tokenize
+
+            tokens = [w for w in word_tokenize(lowered) if w.isalpha()]
+        stop_words = self.stop_words
+        return [w for w in tokens if w not in stop_words]
+
+    def process(self, text: Text) -> Text:
+        """Cleans and preprocesses a single text."""
+        if not isinstance(text, str):
+            return ""
+        lemmatize = self.lemmatize
+        return " ".join([lemmatize(w) for w in self.tokenize(text)])
+
+    def process_many(self, texts: Iterable[Optional[Text]]) -> List[Text]:
+        """Processes many texts in one pass, lemmatizing each distinct token only once."""
+        texts = list(texts)
+        tokenized = [self.tokenize(t) if isinstance(t, str) else [] for t in texts]
+        lemmas = {}
+        for tokens in tokenized:
+            for w in tokens:
+                if w not in lemmas:
+                    lemmas[w] = self.lemmatize(w)
+        return [" ".join([lemmas[w] for w in tokens]) for tokens in tokenized]
+
+    def for_session(self, session_id: Text, field: Text, text: Optional[Text]) -> Text:
+        """Returns the processed form of a per-conversation text, normalising it only the first time."""
+        if not text:
+            return ""
+        key = (session_id, field, hashlib.blake2b(text.encode("utf-8"), digest_size=16).digest())
+        with self._lock:
+            cached = self._sessions.get(key)
+            if cached is not None:
+                self._sessions.move_to_end(key)
+                return cached
+        processed = self.process(text)
+        with self._lock:
+            self._sessions[key] = processed
+            while len(self._sessions) > self._session_cache_size:
+                self._sessions.popitem(last=False)
+        return processed
+
+
+_preprocessor: Optional[TextPreprocessor] = None
+
+
+def get_preprocessor() -> TextPreprocessor:
+    """Returns the process-wide preprocessor; PREPROCESS_TOKENIZER selects "regex" or "nltk"."""
+    global _preprocessor
+    if _preprocessor is None:
+        _preprocessor = TextPreprocessor(tokenizer=os.getenv("PREPROCESS_TOKENIZER", "regex"))
+    return _preprocessor
@@ -0,0 +1,203 @@
+# Background PDF report rendering with a content-addressed cache
+#
+# Reports are rendered by a process pool so the action can answer straight away
+# with a job handle. The output file is named after a hash of everything that
+# ends up on the page (career, profile slots, template version), so asking for
+# the same report twice reuses the existing PDF, even when another action worker
+# rendered it into a shared ARTIFACT_DIR. Old reports are evicted by age and by
+# total size of the reports directory.
+import hashlib
+import json
+import multiprocessing
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import Any, Dict, Iterable, Optional, Text
+
+from . import metrics, sidecar
+from .artifacts import ARTIFACT_DIR, ArtifactStore
+
+# Bump whenever the layout or content of the PDF changes so cached files are not reused.
+TEMPLATE_VERSION = 3
+
+REPORTS_DIR = os.getenv("REPORTS_DIR") or os.path.join(ARTIFACT_DIR or ".", "reports")
+REPORT_WORKERS = int(os.getenv("REPORT_WORKERS", "2"))
+REPORT_MAX_AGE = float(os.getenv("REPORT_MAX_AGE_DAYS", "7")) * 24 * 3600
+REPORT_MAX_BYTES = int(float(os.getenv("REPORT_MAX_MB", "500")) * 1024 * 1024)
+JOBS_PATH = "/reports/"
+# Job records kept for polling; the PDFs themselves live on in the cache directory.
+MAX_TRACKED_JOBS = 1000
+
+
+def report_key(career: Text, profile: Dict[Text, Any]) -> Text:
+    """Content address of a report: hash of the career, the profile slots and the template version."""
+    payload = json.dumps({"career": career, "profile": profile, "template": TEMPLATE_VERSION},
+                         sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def render_report(report_path: Text, career: Text, description: Text, profile: Dict[Text, Any]) -> Text:
+    """Renders the PDF. Runs inside a pool worker process."""
+    from reportlab.lib.pagesizes import letter
+    from reportlab.lib.styles import getSampleStyleSheet
+    from reportlab.platypus import Paragraph, SimpleDocTemplate, Spacer
+
+    styles = getSampleStyleSheet()
+    style_body = styles['BodyText']
+    style_heading = styles['h2']
+
+    # Content Flowable List
+    story = []
+
+    # Title
+    story.append(Paragraph("Personalized Career Report", styles['h1']))
+    story.append(Spacer(1, 24))
+    story.append(Paragraph(f"For: {profile.get('name') or 'User'}", style_heading))
+    story.append(Spacer(1, 24))
+
+    # Recommended Career
+    story.append(Paragraph("Recommended Career Path:", style_heading))
+    story.append(Paragraph(f"<b>{career}</b>", style_body))
+    story.append(Spacer(1, 12))
+
+    # Description
+    story.append(Paragraph("About this Field:", style_heading))
+    story.append(Paragraph(description or 'No details available.', style_body))
+    story.append(Spacer(1, 12))
+
+    # Ranked matches and the keywords behind them
+    if profile.get('ranking'):
+        story.append(Paragraph("How Your Profile Matched:", style_heading))
+        for i, match in enumerate(profile['ranking'], 1):
+            story.append(Paragraph(
+                f"{i}. <b>{match['domain']}</b> ({match['score']:.0f}% match): {match['terms']}", style_body))
+        story.append(Spacer(1, 12))
+
+    # User Inputs
+    story.append(Paragraph("Your Profile Summary:", style_heading))
+    story.append(Paragraph(f"<b>Interests:</b> {profile.get('interests')}", style_body))
+    story.append(Paragraph(f"<b>Strengths:</b> {profile.get('strengths')}", style_body))
+    story.append(Paragraph(f"<b>Subjects:</b> {profile.get('subjects')}", style_body))
+    story.append(Spacer(1, 24))
+
+    # Write to a temporary name first so readers never see a half-written PDF.
+    tmp_path = f"{report_path}.{os.getpid()}.tmp"
+    SimpleDocTemplate(tmp_path, pagesize=letter, leftMargin=72, rightMargin=72,
+                      topMargin=72, bottomMargin=72).build(story)
+    os.replace(tmp_path, report_path)
+    return report_path
+
+
+def evict_reports(directory: Text = REPORTS_DIR, max_age: float = REPORT_MAX_AGE,
+                  max_bytes: int = REPORT_MAX_BYTES) -> int:
+    """Deletes reports older than ``max_age`` seconds, then the oldest ones until under ``max_bytes``."""
+    return ArtifactStore(directory).evict("pdf", max_age, max_bytes)
+
+
+class ReportRenderer:
+    """Process-pool job queue for PDF reports."""
+
+    def __init__(self, directory: Text = REPORTS_DIR, workers: int = REPORT_WORKERS):
+        self.directory = directory
+        self.artifacts = ArtifactStore(directory)
+        self.workers = workers
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._jobs: Dict[Text, Dict[Text, Any]] = {}
+        self._by_key: Dict[Text, Text] = {}
+        self._lock = threading.Lock()
+        self._last_eviction = 0.0
+
+    def _pool(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            # spawn: the action server has live threads (sidecar, store flusher) that fork would copy badly.
+            self._executor = ProcessPoolExecutor(max_workers=self.workers,
+                                                 mp_context=multiprocessing.get_context("spawn"))
+        return self._executor
+
+    def submit(self, career: Text, description: Text, profile: Dict[Text, Any]) -> Dict[Text, Any]:
+        """Queues a report and returns its job record without waiting for the PDF."""
+        key = report_key(career, profile)
+        path = self.artifacts.path(key, "pdf")
+        with self._lock:
+            existing = self._jobs.get(self._by_key.get(key, ""))
+            if existing is not None and existing["status"] == "pending":
+                # Same report already rendering; share the job.
+                return existing
+            job = {"job_id": uuid.uuid4().hex, "report_path": path, "status": "pending", "cached": False}
+            self._jobs[job["job_id"]] = job
+            self._by_key[key] = job["job_id"]
+            while len(self._jobs) > MAX_TRACKED_JOBS:
+                old = self._jobs.pop(next(iter(self._jobs)))
+                self._by_key = {k: v for k, v in self._by_key.items() if v != old["job_id"]}
+
+        if self.artifacts.lookup(key, "pdf"):
+            job.update(status="done", cached=True)
+            return job
+
+        self.artifacts.reserve(key, "pdf")
+        submitted = time.perf_counter()
+        future = self._pool().submit(render_report, path, career, description, profile)
+        future.add_done_callback(lambda f: self._finish(job, f, submitted))
+        return job
+
+    def _finish(self, job: Dict[Text, Any], future: Future, submitted: float) -> None:
+        if metrics.ENABLED:
+            # Queueing plus rendering in the worker process, as the user experiences it.
+            metrics.REGISTRY.histogram("report_job_duration_seconds", "Submit-to-done time of report jobs.") \
+                .observe(time.perf_counter() - submitted)
+        error = future.exception()
+        if error is not None:
+            print(f"Report rendering failed: {error}")
+            job.update(status="error", error=str(error))
+        else:
+            job["status"] = "done"
+        now = time.time()
+        if now - self._last_eviction > 60:
+            self._last_eviction = now
+            evict_reports(self.directory)
+
+    def status(self, job_id: Text) -> Optional[Dict[Text, Any]]:
+        with self._lock:
+            job = self._jobs.get(job_id)
+            return dict(job) if job else None
+
+
+_renderer: Optional[ReportRenderer] = None
+
+
+def get_report_renderer() -> ReportRenderer:
+    global _renderer
+    if _renderer is None:
+        _renderer = ReportRenderer()
+    return _renderer
+
+
+def status_url(job_id: Text) -> Optional[Text]:
+    """URL the app can poll for a job, or None if the sidecar is not available."""
+    if not sidecar.ensure_started():
+        return None
+    return sidecar.public_url(JOBS_PATH + job_id)
+
+
+def _serve_job(request, job_id: Text) -> None:
+    job = get_report_renderer().status(job_id)
+    if job is None:
+        sidecar.send_bytes(request, b'{"status": "unknown"}', status=404)
+    else:
+        sidecar.send_bytes(request, json.dumps(job).encode("utf-8"))
+
+
+sidecar.register_route(JOBS_PATH, _serve_job)
+
+
+def _collect_metrics() -> Iterable[metrics.Sample]:
+    if _renderer is None:
+        return []
+    with _renderer._lock:
+        pending = sum(1 for job in _renderer._jobs.values() if job["status"] == "pending")
+    return [("report_jobs_pending", "gauge", "Report jobs queued or rendering.", pending)]
+
+
+metrics.register_collector(_collect_metrics)
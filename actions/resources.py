@@ -0,0 +1,166 @@
+# Startup resources for the action server: offline NLTK data and a readiness probe
+#
+# NLTK corpora are read from a pre-baked directory (``nltk_data/`` in the project
+# root, or $NLTK_DATA), installed at deploy time with --fetch. Set
+# NLTK_ALLOW_DOWNLOAD=true to download missing corpora at start-up instead. If
+# they are missing, preprocessing runs degraded (see preprocessing.py) rather
+# than failing. Heavy libraries (nltk, sklearn, reportlab) are only imported by
+# the code that needs them, so importing the actions package stays cheap; the
+# preprocessor and career indexes are then built in a background thread, and
+# /ready reports not ready until that has finished.
+#
+#   python -m actions.resources --fetch   # bake the corpora into nltk_data/ (needs network, once)
+#   python -m actions.resources           # readiness probe, exit code 0 when ready
+import json
+import os
+import sys
+import threading
+from typing import Any, Dict, List, Text
+
+from . import sidecar
+from .catalog import get_catalog
+from .content_pool import get_content_pool
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+NLTK_DATA_DIR = os.getenv("NLTK_DATA", os.path.join(PROJECT_ROOT, "nltk_data"))
+
+# (resource path for nltk.data.find, package name for nltk.download)
+NLTK_RESOURCES = [
+    ("corpora/stopwords", "stopwords"),
+    ("corpora/wordnet", "wordnet"),
+    ("corpora/omw-1.4", "omw-1.4"),
+]
+# Only needed when PREPROCESS_TOKENIZER=nltk.
+NLTK_TOKENIZER_RESOURCES = [
+    ("tokenizers/punkt", "punkt"),
+    ("tokenizers/punkt_tab", "punkt_tab"),
+]
+
+_checked = False
+_missing: List[Text] = []
+_lock = threading.Lock()
+
+
+def _required() -> List[tuple]:
+    resources = list(NLTK_RESOURCES)
+    if os.getenv("PREPROCESS_TOKENIZER", "regex") == "nltk":
+        resources += NLTK_TOKENIZER_RESOURCES
+    return resources
+
+
+def ensure_nltk_data() -> List[Text]:
+    """Points NLTK at the pre-baked data directory and checks the corpora once per process.
+
+    Missing resources are downloaded if NLTK_ALLOW_DOWNLOAD=true. Returns the
+    names of the resources that are still missing.
+    """
+    global _checked, _missing
+    if _checked:
+        return _missing
+    with _lock:
+        if _checked:
+            return _missing
+        import nltk
+
+        if NLTK_DATA_DIR not in nltk.data.path:
+            nltk.data.path.insert(0, NLTK_DATA_DIR)
+        missing = []
+        for path, package in _required():
+            try:
+                nltk.data.find(path)
+            except LookupError:
+                missing.append(package)
+        if missing and os.getenv("NLTK_ALLOW_DOWNLOAD", "false").lower() in ("1", "true", "yes"):
+            os.makedirs(NLTK_DATA_DIR, exist_ok=True)
+            for package in missing:
+                try:
+                    nltk.download(package, download_dir=NLTK_DATA_DIR, quiet=True)
+                except Exception as e:
+                    print(f"Could not download NLTK resource {package}: {e}")
+            missing = []
+            for path, package in _required():
+                try:
+                    nltk.data.find(path)
+                except LookupError:
+                    missing.append(package)
+        if missing:
+            print(f"Missing NLTK resources {missing}; preprocessing runs degraded (built-in stopword "
+                  f"list, no lemmatization). Run `python -m actions.resources --fetch` to install them.")
+        _missing = missing
+        _checked = True
+        return _missing
+
+
+def fetch_nltk_data() -> None:
+    """Downloads every corpus the actions may need into NLTK_DATA_DIR."""
+    import nltk
+
+    os.makedirs(NLTK_DATA_DIR, exist_ok=True)
+    for _, package in NLTK_RESOURCES + NLTK_TOKENIZER_RESOURCES:
+        nltk.download(package, download_dir=NLTK_DATA_DIR, quiet=True)
+
+
+# --- Warm-up ---
+_warm = threading.Event()
+
+
+def warm_up() -> None:
+    """Builds the preprocessor and the career indexes, so the first recommendation does not pay for
+    the nltk/sklearn imports and the index build on the event loop."""
+    from .inverted_index import get_inverted_index
+    from .preprocessing import get_preprocessor
+
+    try:
+        get_inverted_index(get_catalog(), get_preprocessor().process)
+    except Exception as e:
+        # Reported again by the first request that needs them; /ready shows a catalog error.
+        print(f"Could not build the career indexes: {e}")
+    finally:
+        _warm.set()
+
+
+def preload_indexes() -> None:
+    """Runs ``warm_up`` in a background thread; /ready waits for it."""
+    threading.Thread(target=warm_up, name="index-warm-up", daemon=True).start()
+
+
+# --- Readiness ---
+def readiness() -> Dict[Text, Any]:
+    """Checks that everything the actions load lazily can actually be loaded."""
+    checks: Dict[Text, Any] = {}
+    checks["warm"] = _warm.is_set()
+    missing = ensure_nltk_data()
+    checks["nltk_data"] = not missing
+    # Missing corpora degrade matching quality but do not stop the actions from working.
+    checks["degraded"] = bool(missing)
+    try:
+        checks["catalog_domains"] = len(get_catalog())
+    except (OSError, ValueError) as e:
+        checks["catalog_domains"] = 0
+        checks["catalog_error"] = str(e)
+    # Informational only: without a pool the generative actions fall back to live Gemini calls.
+    checks["content_pool_variants"] = len(get_content_pool())
+    checks["ready"] = checks["warm"] and bool(checks["catalog_domains"])
+    return checks
+
+
+def _serve_ready(request, _rest: Text) -> None:
+    result = readiness()
+    sidecar.send_bytes(request, json.dumps(result).encode("utf-8"), status=200 if result["ready"] else 503)
+
+
+sidecar.register_route("/ready", _serve_ready)
+
+
+if __name__ == "__main__":
+    # Use the package's copy of this module, which preprocessing.py shares, so the corpora are checked once.
+    from actions.resources import NLTK_DATA_DIR, fetch_nltk_data, readiness, warm_up
+
+    if "--fetch" in sys.argv:
+        fetch_nltk_data()
+        print(f"NLTK data written to {NLTK_DATA_DIR}")
+    warm_up()
+    result = readiness()
+    print(json.dumps(result, indent=2))
+    # Stricter than /ready: a deploy step should not ship without the corpora.
+    sys.exit(0 if result["ready"] and not result["degraded"] else 1)
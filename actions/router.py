@@ -0,0 +1,162 @@
+# Session-affine router in front of several action servers
+#
+#   python -m actions.router --workers http://localhost:5060,http://localhost:5061 --port 5055
+#
+# Rasa has one action_endpoint. The router listens there and forwards every
+# /webhook call to one of N action workers, chosen by rendezvous hashing of the
+# sender_id. A conversation therefore always lands on the same worker, which
+# keeps its caches, streams and report jobs warm and lets it read back its own
+# queued session writes. Load spreads evenly, and adding or removing a worker
+# only moves the conversations that hashed to it. A worker that refuses
+# connections is skipped for a while; its conversations go to their next-ranked
+# worker in the meantime.
+import argparse
+import hashlib
+import json
+import os
+import re
+import time
+from typing import Dict, List, Optional, Sequence, Text, Tuple
+
+ACTION_WORKERS = os.getenv("ACTION_WORKERS", "")
+ROUTER_TIMEOUT = float(os.getenv("ACTION_ROUTER_TIMEOUT", "300"))
+# Seconds an unreachable worker is skipped before it is tried again.
+ROUTER_RETRY_AFTER = float(os.getenv("ACTION_ROUTER_RETRY_AFTER", "5"))
+# Trackers of long conversations are sent in full with every action call.
+MAX_BODY_BYTES = 64 * 1024 * 1024
+
+# Every "sender_id" in an action request (top level and inside the tracker) is the
+# conversation's id, so the first one will do and the tracker need not be parsed.
+_SENDER_ID = re.compile(rb'"sender_id"\s*:\s*"((?:[^"\\]|\\.)*)"')
+
+
+def sender_id_of(body: bytes) -> Optional[Text]:
+    match = _SENDER_ID.search(body)
+    if match is None:
+        return None
+    return json.loads(b'"' + match.group(1) + b'"')
+
+
+def rank_workers(workers: Sequence[Text], sender_id: Text) -> List[Text]:
+    """Orders workers by rendezvous-hash weight for ``sender_id``, preferred worker first."""
+    def weight(worker: Text) -> bytes:
+        return hashlib.blake2b(f"{worker}\x00{sender_id}".encode("utf-8"), digest_size=8).digest()
+
+    return sorted(workers, key=weight, reverse=True)
+
+
+class ActionRouter:
+    """Forwards action server requests to the worker that owns the conversation."""
+
+    def __init__(self, workers: Sequence[Text], timeout: float = ROUTER_TIMEOUT,
+                 retry_after: float = ROUTER_RETRY_AFTER):
+        if not workers:
+            raise ValueError("The action router needs at least one worker URL")
+        self.workers = [w.rstrip("/") for w in workers]
+        self.timeout = timeout
+        self.retry_after = retry_after
+        self.requests: Dict[Text, int] = dict.fromkeys(self.workers, 0)
+        self._down_until: Dict[Text, float] = {}
+        self._session = None
+
+    def candidates(self, sender_id: Text) -> List[Text]:
+        ranked = rank_workers(self.workers, sender_id)
+        now = time.monotonic()
+        up = [w for w in ranked if self._down_until.get(w, 0.0) <= now]
+        # If every worker looks down, try them all anyway rather than failing outright.
+        return up or ranked
+
+    async def forward(self, method: Text, path: Text, body: bytes, sender_id: Text,
+                      content_type: Optional[Text] = None) -> Tuple[int, Text, bytes]:
+        import aiohttp
+
+        if self._session is None:
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=0, keepalive_timeout=30),
+                timeout=aiohttp.ClientTimeout(total=self.timeout))
+        headers = {"Content-Type": content_type} if content_type else None
+        error: Optional[Exception] = None
+        for worker in self.candidates(sender_id):
+            try:
+                async with self._session.request(method, worker + path, data=body, headers=headers) as response:
+                    payload = await response.read()
+                    self.requests[worker] += 1
+                    return response.status, response.content_type, payload
+            except aiohttp.ClientConnectorError as e:
+                # The request never reached the worker, so the action did not run and another worker may take it.
+                print(f"Action worker {worker} unreachable, rerouting: {e}")
+                self._down_until[worker] = time.monotonic() + self.retry_after
+                error = e
+        raise error
+
+    def health(self) -> Dict[Text, object]:
+        now = time.monotonic()
+        return {
+            "status": "ok",
+            "workers": {w: {"up": self._down_until.get(w, 0.0) <= now, "requests": self.requests[w]}
+                        for w in self.workers},
+        }
+
+    async def close(self) -> None:
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+
+def create_app(router: ActionRouter):
+    """aiohttp application exposing the rasa_sdk endpoints (/webhook, /actions, /health)."""
+    from aiohttp import web
+
+    async def webhook(request):
+        body = await request.read()
+        sender_id = sender_id_of(body)
+        if sender_id is None:
+            return web.json_response({"error": "action request without sender_id"}, status=400)
+        try:
+            status, content_type, payload = await router.forward(
+                "POST", "/webhook", body, sender_id, request.headers.get("Content-Type"))
+        except Exception as e:
+            print(f"Action request for {sender_id} failed: {e}")
+            return web.json_response({"error": f"no action worker available: {e}"}, status=502)
+        return web.Response(status=status, body=payload, content_type=content_type)
+
+    async def actions(request):
+        try:
+            status, content_type, payload = await router.forward("GET", "/actions", b"", "")
+        except Exception as e:
+            return web.json_response({"error": f"no action worker available: {e}"}, status=502)
+        return web.Response(status=status, body=payload, content_type=content_type)
+
+    async def health(request):
+        return web.json_response(router.health())
+
+    async def on_cleanup(app):
+        await router.close()
+
+    app = web.Application(client_max_size=MAX_BODY_BYTES)
+    app.router.add_post("/webhook", webhook)
+    app.router.add_get("/actions", actions)
+    app.router.add_get("/health", health)
+    app.on_cleanup.append(on_cleanup)
+    return app
+
+
+def main(argv: Optional[Sequence[Text]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Route Rasa action calls to action workers by sender_id.")
+    parser.add_argument("--workers", default=ACTION_WORKERS,
+                        help="comma-separated worker base URLs (default: $ACTION_WORKERS)")
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=5055)
+    args = parser.parse_args(argv)
+
+    from aiohttp import web
+
+    workers = [w.strip() for w in args.workers.split(",") if w.strip()]
+    if not workers:
+        parser.error("no workers given")
+    print(f"Routing action calls on port {args.port} to {len(workers)} worker(s)")
+    web.run_app(create_app(ActionRouter(workers)), host=args.host, port=args.port, print=None)
+
+
+if __name__ == "__main__":
+    main()
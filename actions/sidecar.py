@@ -0,0 +1,82 @@
+# Side-channel HTTP server running inside the action-server process
+#
+# Rasa's action webhook returns one JSON response per action, so anything that
+# has to outlive that response (streamed LLM tokens, background jobs) is served
+# from this small threaded HTTP server instead. Modules register a handler for a
+# path prefix. actions.actions starts the server when the action server loads it,
+# so /ready and /metrics are available from start-up; ACTION_SIDECAR_ENABLED=false
+# turns it off (streams then fall back to blocking replies).
+import os
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, Optional, Text
+
+SIDECAR_ENABLED = os.getenv("ACTION_SIDECAR_ENABLED", "true").lower() in ("1", "true", "yes")
+# Loopback by default; set 0.0.0.0 when the Streamlit app runs on another host.
+SIDECAR_HOST = os.getenv("ACTION_SIDECAR_HOST", "127.0.0.1")
+SIDECAR_PORT = int(os.getenv("ACTION_SIDECAR_PORT", "5056"))
+# Address the Streamlit app should use to reach this server.
+SIDECAR_PUBLIC_URL = os.getenv("ACTION_SIDECAR_URL", f"http://localhost:{SIDECAR_PORT}").rstrip("/")
+
+RouteHandler = Callable[[BaseHTTPRequestHandler, Text], None]
+_routes: Dict[Text, RouteHandler] = {}
+_server: Optional[ThreadingHTTPServer] = None
+_lock = threading.Lock()
+
+
+def register_route(prefix: Text, handler: RouteHandler) -> None:
+    """Registers a GET handler for every path starting with ``prefix``.
+
+    The handler receives the request handler and the remainder of the path.
+    """
+    _routes[prefix] = handler
+
+
+def public_url(path: Text) -> Text:
+    return f"{SIDECAR_PUBLIC_URL}{path}"
+
+
+def send_bytes(request: BaseHTTPRequestHandler, body: bytes, status: int = 200,
+               content_type: Text = "application/json") -> None:
+    request.send_response(status)
+    request.send_header("Content-Type", content_type)
+    request.send_header("Content-Length", str(len(body)))
+    request.end_headers()
+    request.wfile.write(body)
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        path = self.path.split("?", 1)[0]
+        # Longest prefix wins so "/reports/x" can coexist with "/r".
+        for prefix in sorted(_routes, key=len, reverse=True):
+            if path.startswith(prefix):
+                _routes[prefix](self, path[len(prefix):])
+                return
+        send_bytes(self, b'{"error": "not found"}', status=404)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def ensure_started() -> bool:
+    """Starts the sidecar in a daemon thread if it is not running yet.
+
+    Returns False if the sidecar is disabled or its port is taken.
+    """
+    global _server
+    if not SIDECAR_ENABLED:
+        return False
+    with _lock:
+        if _server is not None:
+            return True
+        try:
+            _server = ThreadingHTTPServer((SIDECAR_HOST, SIDECAR_PORT), _Handler)
+        except OSError as e:
+            print(f"Action sidecar could not bind {SIDECAR_HOST}:{SIDECAR_PORT}: {e}")
+            return False
+        _server.daemon_threads = True
+        threading.Thread(target=_server.serve_forever, name="action-sidecar", daemon=True).start()
+        return True
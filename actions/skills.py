@@ -0,0 +1,143 @@
+# Local skill taxonomy for the skill-gap analysis
+#
+# actions/data/skills.json maps each canonical skill to its synonyms, and every
+# catalog record lists the skills its careers require. All phrases are compiled
+# into one token-level Aho-Corasick automaton, so extracting skills from a resume
+# is a single pass over its tokens however many skills the dictionary holds, and
+# multi-word skills ("machine learning", "project management") match as phrases.
+# Required-skill profiles are resolved once per catalog version and cached.
+import json
+import os
+import re
+from collections import Counter, deque
+from typing import Dict, Iterable, List, Optional, Text, Tuple
+
+from .catalog import CareerCatalog, get_catalog
+
+DEFAULT_SKILLS_PATH = os.path.join(os.path.dirname(__file__), "data", "skills.json")
+
+# Keeps tokens such as "c++", "node.js", "t-sql" and "pl/sql" whole.
+_TOKEN_RE = re.compile(r"[a-z0-9+#]+(?:[./\-][a-z0-9+#]+)*")
+
+
+def tokenize(text: Optional[Text]) -> List[Text]:
+    return _TOKEN_RE.findall(text.lower()) if text else []
+
+
+class PhraseMatcher:
+    """Aho-Corasick automaton over token sequences; finds every phrase occurrence in one pass."""
+
+    def __init__(self, phrases: Dict[Text, Text]):
+        """``phrases`` maps a surface phrase to the canonical skill it stands for."""
+        # Node 0 is the root. goto[node][token] -> node, fail[node] -> node,
+        # out[node] -> canonical skills of the phrases ending at that node.
+        self._goto: List[Dict[Text, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._out: List[List[Text]] = [[]]
+        for phrase, canonical in phrases.items():
+            self._add(tokenize(phrase), canonical)
+        self._link()
+
+    def _add(self, tokens: List[Text], canonical: Text) -> None:
+        if not tokens:
+            return
+        node = 0
+        for token in tokens:
+            nxt = self._goto[node].get(token)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto[node][token] = nxt
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append([])
+            node = nxt
+        if canonical not in self._out[node]:
+            self._out[node].append(canonical)
+
+    def _link(self) -> None:
+        """Breadth-first construction of failure links and merged outputs."""
+        # Depth-1 nodes fail back to the root, which is how every node starts out.
+        queue = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for token, child in self._goto[node].items():
+                queue.append(child)
+                fail = self._fail[node]
+                while fail and token not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[child] = self._goto[fail].get(token, 0)
+                self._out[child] += [s for s in self._out[self._fail[child]] if s not in self._out[child]]
+
+    def find(self, tokens: Iterable[Text]) -> Counter:
+        """Counts the canonical skills found in a token stream."""
+        found: Counter = Counter()
+        node = 0
+        for token in tokens:
+            while node and token not in self._goto[node]:
+                node = self._fail[node]
+            node = self._goto[node].get(token, 0)
+            for canonical in self._out[node]:
+                found[canonical] += 1
+        return found
+
+
+class SkillTaxonomy:
+    """Skill dictionary plus the required-skill profile of every catalog career."""
+
+    def __init__(self, synonyms: Dict[Text, List[Text]], catalog: CareerCatalog):
+        self.fingerprint = catalog.fingerprint
+        phrases: Dict[Text, Text] = {}
+        for canonical, aliases in synonyms.items():
+            phrases[canonical] = canonical
+            for alias in aliases:
+                phrases.setdefault(alias, canonical)
+
+        # Required skills missing from the dictionary still count, as their own canonical form.
+        records = list(catalog.iter_records())
+        for record in records:
+            for skill in record.get("skills", []):
+                phrases.setdefault(skill.lower(), skill.lower())
+        self._phrases = phrases
+        self.matcher = PhraseMatcher(phrases)
+
+        self._profiles: Dict[Text, Tuple[Text, ...]] = {}
+        for record in records:
+            required = [self.canonicalize(s) for s in record.get("skills", [])]
+            self._profiles[record["domain"]] = tuple(dict.fromkeys(required))
+
+    @classmethod
+    def load(cls, catalog: CareerCatalog, path: Text = DEFAULT_SKILLS_PATH) -> "SkillTaxonomy":
+        with open(path, encoding="utf-8") as f:
+            return cls(json.load(f), catalog)
+
+    def canonicalize(self, skill: Text) -> Text:
+        """Canonical name of a single skill phrase, or the phrase itself if it is unknown."""
+        key = " ".join(tokenize(skill))
+        return self._phrases.get(key, key)
+
+    def extract(self, text: Optional[Text]) -> Counter:
+        """Canonical skills mentioned in free text (e.g. a resume), with their counts."""
+        return self.matcher.find(tokenize(text))
+
+    def required_skills(self, career: Text) -> Tuple[Text, ...]:
+        """The precomputed required-skill profile of a career, most important first."""
+        return self._profiles.get(career, ())
+
+    def gap(self, text: Optional[Text], career: Text,
+            extra_required: Iterable[Text] = ()) -> Tuple[List[Text], List[Text]]:
+        """Splits a career's required skills into (matching, missing) for a resume, in profile order."""
+        have = self.extract(text)
+        required = list(dict.fromkeys(list(self.required_skills(career)) + list(extra_required)))
+        return [s for s in required if s in have], [s for s in required if s not in have]
+
+
+_taxonomy: Optional[SkillTaxonomy] = None
+
+
+def get_skill_taxonomy(catalog: Optional[CareerCatalog] = None) -> SkillTaxonomy:
+    """Returns the shared taxonomy, rebuilt when the catalog changes (SKILLS_PATH overrides the dictionary)."""
+    global _taxonomy
+    catalog = catalog or get_catalog()
+    if _taxonomy is None or _taxonomy.fingerprint != catalog.fingerprint:
+        _taxonomy = SkillTaxonomy.load(catalog, os.getenv("SKILLS_PATH", DEFAULT_SKILLS_PATH))
+    return _taxonomy
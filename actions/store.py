@@ -0,0 +1,305 @@
+# Session persistence for the action server
+#
+# Actions only talk to the SessionBackend interface, so the action server keeps
+# no session state of its own and any worker can serve any conversation. The
+# backend is picked with SESSION_STORE:
+#   sqlite  (default) a small pool of SQLite connections in WAL mode. Writes are
+#           coalesced per session in memory and committed by a background thread
+#           in one transaction per batch (group commit), so a chat turn that sets
+#           several slots costs one upsert and no fsync of its own. Every worker
+#           on a node can share one SESSION_DB file.
+#   memory  an in-process dict, for tests and throwaway runs.
+#   package.module:factory  any other backend; called with no arguments.
+import abc
+import atexit
+import importlib
+import os
+import queue
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Text
+
+from . import metrics
+
+DEFAULT_SESSION_DB = "career_counsellor.db"
+
+SESSION_FIELDS = (
+    "name",
+    "interests",
+    "strengths",
+    "subjects",
+    "resume_keywords",
+    "recommended_career",
+    "report_path",
+)
+
+_SCHEMA = '''
+    CREATE TABLE IF NOT EXISTS sessions (
+        session_id TEXT PRIMARY KEY,
+        name TEXT,
+        interests TEXT,
+        strengths TEXT,
+        subjects TEXT,
+        resume_keywords TEXT,
+        recommended_career TEXT,
+        report_path TEXT,
+        updated_at REAL
+    )
+'''
+
+# One prepared statement for every write: columns that were not set in this
+# batch are passed as NULL and keep their stored value.
+_UPSERT = '''
+    INSERT INTO sessions (session_id, {cols}, updated_at) VALUES (?, {params}, ?)
+    ON CONFLICT(session_id) DO UPDATE SET {updates}, updated_at = excluded.updated_at
+'''.format(
+    cols=", ".join(SESSION_FIELDS),
+    params=", ".join("?" for _ in SESSION_FIELDS),
+    updates=", ".join(f"{c} = COALESCE(excluded.{c}, sessions.{c})" for c in SESSION_FIELDS),
+)
+
+
+class SessionBackend(abc.ABC):
+    """Interface of a session profile store. Implementations must be safe to use from any thread."""
+
+    @abc.abstractmethod
+    def upsert(self, session_id: Text, **fields: Any) -> None:
+        """Sets profile fields for a session. ``None`` values leave the stored value unchanged."""
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def get(self, session_id: Text) -> Optional[Dict[Text, Any]]:
+        """Returns the profile of a session including its own earlier writes, or None."""
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def find_by_career(self, career: Text, limit: int = 100) -> List[Dict[Text, Any]]:
+        """Returns the most recently updated sessions that were recommended ``career``."""
+        raise NotImplementedError
+
+    def flush(self) -> int:
+        """Makes queued writes durable. Returns the number of sessions written."""
+        return 0
+
+    def close(self) -> None:
+        pass
+
+
+def _check_fields(fields: Dict[Text, Any]) -> Dict[Text, Any]:
+    unknown = set(fields) - set(SESSION_FIELDS)
+    if unknown:
+        raise ValueError(f"Unknown session fields: {sorted(unknown)}")
+    return {k: v for k, v in fields.items() if v is not None}
+
+
+class ConnectionPool:
+    """Fixed-size pool of WAL-mode SQLite connections usable from any thread."""
+
+    def __init__(self, db_path: Text, size: int = 4, busy_timeout_ms: int = 10000):
+        self.db_path = db_path
+        self._pool: "queue.Queue[sqlite3.Connection]" = queue.Queue(maxsize=size)
+        for _ in range(size):
+            conn = sqlite3.connect(db_path, timeout=busy_timeout_ms / 1000, check_same_thread=False,
+                                   isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            # WAL + NORMAL only fsyncs at checkpoints; a crash can lose the last batch, never corrupt.
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(f"PRAGMA busy_timeout={busy_timeout_ms}")
+            conn.row_factory = sqlite3.Row
+            self._pool.put(conn)
+
+    @contextmanager
+    def connection(self) -> Iterator[sqlite3.Connection]:
+        conn = self._pool.get()
+        try:
+            yield conn
+        finally:
+            self._pool.put(conn)
+
+    def close(self) -> None:
+        while not self._pool.empty():
+            self._pool.get_nowait().close()
+
+
+class SessionStore(SessionBackend):
+    """Write-behind SQLite session profile store on top of a ConnectionPool."""
+
+    def __init__(self, db_path: Text = DEFAULT_SESSION_DB, pool_size: int = 4,
+                 flush_interval: float = 0.05, max_batch: int = 500):
+        self.pool = ConnectionPool(db_path, size=pool_size)
+        self.flush_interval = flush_interval
+        self.max_batch = max_batch
+        self._pending: Dict[Text, Dict[Text, Any]] = {}
+        # Batch currently being committed, still visible to readers until the commit lands.
+        self._flushing: Dict[Text, Dict[Text, Any]] = {}
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._closed = False
+        self._init_schema()
+        self._flusher = threading.Thread(target=self._run_flusher, name="session-store-flush", daemon=True)
+        self._flusher.start()
+        atexit.register(self.close)
+
+    def _init_schema(self) -> None:
+        with self.pool.connection() as conn:
+            conn.execute(_SCHEMA)
+            columns = {row["name"] for row in conn.execute("PRAGMA table_info(sessions)")}
+            if "updated_at" not in columns:
+                # Tables created by older versions of the action server.
+                try:
+                    conn.execute("ALTER TABLE sessions ADD COLUMN updated_at REAL")
+                except sqlite3.OperationalError:
+                    pass  # another worker migrated it first
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_sessions_career ON sessions(recommended_career)")
+
+    # --- Writes ---
+    def upsert(self, session_id: Text, **fields: Any) -> None:
+        """Queues profile fields for a session; the background flusher commits them shortly after."""
+        fields = _check_fields(fields)
+        with self._lock:
+            self._pending.setdefault(session_id, {}).update(fields)
+            backlog = len(self._pending)
+        if backlog >= self.max_batch:
+            self._wakeup.set()
+
+    def flush(self) -> int:
+        """Commits every queued write in one transaction. Returns the number of sessions written."""
+        with self._flush_lock:
+            with self._lock:
+                batch, self._pending = self._pending, {}
+                self._flushing = batch
+            if not batch:
+                return 0
+            now = time.time()
+            rows = [(sid, *[fields.get(c) for c in SESSION_FIELDS], now) for sid, fields in batch.items()]
+            try:
+                with metrics.span("sqlite_flush"), self.pool.connection() as conn:
+                    conn.execute("BEGIN IMMEDIATE")
+                    try:
+                        conn.executemany(_UPSERT, rows)
+                        conn.execute("COMMIT")
+                    except BaseException:
+                        conn.execute("ROLLBACK")
+                        raise
+            except sqlite3.Error as e:
+                print(f"Session store flush failed, will retry: {e}")
+                with self._lock:
+                    # Newer writes for the same session win over the failed batch.
+                    for sid, fields in batch.items():
+                        self._pending[sid] = {**fields, **self._pending.get(sid, {})}
+                    self._flushing = {}
+                return 0
+            with self._lock:
+                self._flushing = {}
+            return len(rows)
+
+    def _run_flusher(self) -> None:
+        while not self._closed:
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            self.flush()
+
+    def close(self) -> None:
+        if self._closed:
+            return
+        self._closed = True
+        self._wakeup.set()
+        self._flusher.join(timeout=5)
+        self.flush()
+        self.pool.close()
+
+    # --- Reads ---
+    def get(self, session_id: Text) -> Optional[Dict[Text, Any]]:
+        """Returns the stored profile merged with any not yet flushed writes."""
+        # Queued writes first: flush() keeps a batch in _flushing until it is committed, so anything
+        # missing from this snapshot is already in the database when the row is read below.
+        with self._lock:
+            pending = {**self._flushing.get(session_id, {}), **self._pending.get(session_id, {})}
+        with self.pool.connection() as conn:
+            row = conn.execute("SELECT * FROM sessions WHERE session_id = ?", (session_id,)).fetchone()
+        if row is None and not pending:
+            return None
+        profile = dict(row) if row is not None else {"session_id": session_id}
+        profile.update(pending)
+        return profile
+
+    def find_by_career(self, career: Text, limit: int = 100) -> List[Dict[Text, Any]]:
+        """Returns the most recently updated sessions that were recommended ``career``."""
+        self.flush()
+        with self.pool.connection() as conn:
+            rows = conn.execute(
+                "SELECT * FROM sessions WHERE recommended_career = ? ORDER BY updated_at DESC LIMIT ?",
+                (career, limit)).fetchall()
+        return [dict(r) for r in rows]
+
+
+class MemorySessionStore(SessionBackend):
+    """In-process session store with the same semantics as SessionStore, for tests and single runs."""
+
+    def __init__(self):
+        self._sessions: Dict[Text, Dict[Text, Any]] = {}
+        self._lock = threading.Lock()
+
+    def upsert(self, session_id: Text, **fields: Any) -> None:
+        fields = _check_fields(fields)
+        with self._lock:
+            profile = self._sessions.setdefault(
+                session_id, {"session_id": session_id, **dict.fromkeys(SESSION_FIELDS)})
+            profile.update(fields, updated_at=time.time())
+
+    def get(self, session_id: Text) -> Optional[Dict[Text, Any]]:
+        with self._lock:
+            profile = self._sessions.get(session_id)
+            return dict(profile) if profile is not None else None
+
+    def find_by_career(self, career: Text, limit: int = 100) -> List[Dict[Text, Any]]:
+        with self._lock:
+            rows = [dict(p) for p in self._sessions.values() if p["recommended_career"] == career]
+        rows.sort(key=lambda p: p["updated_at"], reverse=True)
+        return rows[:limit]
+
+
+def create_session_store(kind: Text = "sqlite", db_path: Text = DEFAULT_SESSION_DB) -> SessionBackend:
+    """Builds the backend named by ``kind``: "sqlite", "memory" or "package.module:factory"."""
+    if kind == "sqlite":
+        return SessionStore(db_path)
+    if kind == "memory":
+        return MemorySessionStore()
+    module, _, factory = kind.partition(":")
+    if not factory:
+        raise ValueError(f"Unknown session store {kind!r}; use sqlite, memory or package.module:factory")
+    return getattr(importlib.import_module(module), factory)()
+
+
+_store: Optional[SessionBackend] = None
+_store_lock = threading.Lock()
+
+
+def get_session_store() -> SessionBackend:
+    """Returns the process-wide store chosen by SESSION_STORE, on SESSION_DB for SQLite."""
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = create_session_store(os.getenv("SESSION_STORE", "sqlite"),
+                                              os.getenv("SESSION_DB", DEFAULT_SESSION_DB))
+    return _store
+
+
+def set_session_store(store: Optional[SessionBackend]) -> None:
+    """Replaces the process-wide store, e.g. with a MemorySessionStore in tests."""
+    global _store
+    with _store_lock:
+        _store = store
+
+
+def _collect_metrics() -> Iterable[metrics.Sample]:
+    if not isinstance(_store, SessionStore):
+        return []
+    return [("session_store_pending_writes", "gauge", "Sessions queued for the next group commit.", len(_store._pending))]
+
+
+metrics.register_collector(_collect_metrics)
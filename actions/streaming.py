@@ -0,0 +1,142 @@
+# Relays partial LLM output from the action server to the chat UI
+#
+# An action opens a stream, returns its URL to Rasa straight away and keeps
+# feeding chunks from a background task. The Streamlit app reads the stream as
+# Server-Sent Events from the action sidecar (see sidecar.py):
+#   data: {"text": "<chunk>"}      one per chunk
+#   event: done / event: error     terminates the stream
+import asyncio
+import json
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler
+from typing import AsyncIterator, Dict, List, Optional, Set, Text
+
+from . import sidecar
+
+STREAM_PATH = "/streams/"
+# Finished streams are kept this long so a late reader still gets the full text.
+STREAM_RETENTION = 300.0
+# A reader gives up on a stream that produces nothing for this long.
+STREAM_IDLE_TIMEOUT = 90.0
+
+
+class TokenStream:
+    """Thread-safe append-only buffer of text chunks for one generation."""
+
+    def __init__(self):
+        self.chunks: List[Text] = []
+        self.done = False
+        self.error: Optional[Text] = None
+        self.finished_at: Optional[float] = None
+        self._cond = threading.Condition()
+
+    def append(self, chunk: Text) -> None:
+        with self._cond:
+            self.chunks.append(chunk)
+            self._cond.notify_all()
+
+    def close(self, error: Optional[Text] = None) -> None:
+        with self._cond:
+            self.done = True
+            self.error = error
+            self.finished_at = time.time()
+            self._cond.notify_all()
+
+    def wait_from(self, position: int, timeout: float):
+        """Blocks until chunks beyond ``position`` exist or the stream ends. Returns (new_chunks, done)."""
+        with self._cond:
+            self._cond.wait_for(lambda: len(self.chunks) > position or self.done, timeout=timeout)
+            return self.chunks[position:], self.done
+
+    def text(self) -> Text:
+        with self._cond:
+            return "".join(self.chunks)
+
+
+_streams: Dict[Text, TokenStream] = {}
+_streams_lock = threading.Lock()
+# Strong references so pending producer tasks are not garbage collected.
+_tasks: Set["asyncio.Task"] = set()
+
+
+def _prune() -> None:
+    cutoff = time.time() - STREAM_RETENTION
+    for stream_id in [k for k, s in _streams.items() if s.finished_at and s.finished_at < cutoff]:
+        del _streams[stream_id]
+
+
+def _serve_stream(request: BaseHTTPRequestHandler, stream_id: Text) -> None:
+    with _streams_lock:
+        stream = _streams.get(stream_id)
+    if stream is None:
+        sidecar.send_bytes(request, b'{"error": "unknown stream"}', status=404)
+        return
+
+    request.send_response(200)
+    request.send_header("Content-Type", "text/event-stream")
+    request.send_header("Cache-Control", "no-cache")
+    # Chunked framing lets HTTP clients hand each event over as soon as it is written.
+    request.send_header("Transfer-Encoding", "chunked")
+    request.send_header("Connection", "close")
+    request.end_headers()
+    request.close_connection = True
+
+    def write_event(payload: Text) -> None:
+        data = payload.encode("utf-8")
+        request.wfile.write(b"%x\r\n%s\r\n" % (len(data), data))
+
+    position = 0
+    try:
+        while True:
+            chunks, done = stream.wait_from(position, STREAM_IDLE_TIMEOUT)
+            if chunks:
+                write_event("".join(f"data: {json.dumps({'text': chunk})}\n\n" for chunk in chunks))
+            position += len(chunks)
+            if done and position >= len(stream.chunks):
+                if stream.error:
+                    write_event(f"event: error\ndata: {json.dumps({'error': stream.error})}\n\n")
+                else:
+                    write_event("event: done\ndata: {}\n\n")
+                break
+            if not chunks and not done:
+                # Idle timeout; let the client fall back to whatever it has.
+                break
+        request.wfile.write(b"0\r\n\r\n")
+    except (BrokenPipeError, ConnectionResetError):
+        return
+
+
+sidecar.register_route(STREAM_PATH, _serve_stream)
+
+
+def start_stream(source: AsyncIterator[Text]) -> Optional[Text]:
+    """Consumes ``source`` in a background task and returns the URL the UI can read it from.
+
+    Returns None when the sidecar is unavailable, in which case the caller should
+    fall back to a blocking call.
+    """
+    if not sidecar.ensure_started():
+        return None
+
+    stream_id = uuid.uuid4().hex
+    stream = TokenStream()
+    with _streams_lock:
+        _prune()
+        _streams[stream_id] = stream
+
+    async def pump():
+        try:
+            async for chunk in source:
+                stream.append(chunk)
+        except Exception as e:
+            print(f"Stream {stream_id} failed: {e}")
+            stream.close(error=str(e))
+        else:
+            stream.close()
+
+    task = asyncio.get_running_loop().create_task(pump())
+    _tasks.add(task)
+    task.add_done_callback(_tasks.discard)
+    return sidecar.public_url(STREAM_PATH + stream_id)
@@ -4,8 +4,11 @@ import requests
 import uuid
 import time
 import os
-import PyPDF2
+import json
+from concurrent.futures import ThreadPoolExecutor
 from dotenv import load_dotenv
+from requests.adapters import HTTPAdapter
+from resume_ingestion import summarize_resume
 
 # --- Page Configuration ---
 st.set_page_config(
@@ -60,40 +63,146 @@ st.markdown("""
 
 # --- Rasa Server Configuration ---
 RASA_SERVER_URL = "http://localhost:5005/webhooks/rest/webhook"
+# Number of recent Rasa round-trips kept for the latency panel in the sidebar.
+LATENCY_WINDOW = 50
+
+# --- Front-end Performance Settings ---
+# Keep-alive connections shared by every browser session of this Streamlit process.
+HTTP_POOL_SIZE = int(os.getenv("APP_HTTP_POOL_SIZE", "32"))
+# Rasa requests run on a shared thread pool so a slow action never blocks a script run.
+RASA_WORKERS = int(os.getenv("APP_RASA_WORKERS", "16"))
+# Only the most recent messages are rendered; older ones are one click away (0 renders all).
+CHAT_WINDOW = int(os.getenv("APP_CHAT_WINDOW", "30"))
+# A rendering report is checked once per script run; the page reruns at this interval until it is ready.
+REPORT_POLL_SECONDS = 1.0
+REPORT_TIMEOUT_SECONDS = 60
+
+@st.cache_resource
+def get_http_session():
+    """Process-wide requests session with a keep-alive connection pool to Rasa and the action server."""
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=4, pool_maxsize=HTTP_POOL_SIZE)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+@st.cache_resource
+def get_rasa_executor():
+    return ThreadPoolExecutor(max_workers=RASA_WORKERS, thread_name_prefix="rasa-request")
+
+@st.cache_data(max_entries=32, show_spinner=False)
+def load_report_bytes(path, mtime):
+    """PDF bytes for the download button; ``mtime`` is part of the cache key so a re-rendered file is re-read."""
+    with open(path, "rb") as f:
+        return f.read()
 
 # --- Helper Functions ---
-def parse_resume(file_path):
-    """Extracts text from a PDF or TXT file."""
-    text = ""
-    try:
-        if file_path.endswith('.pdf'):
-            with open(file_path, 'rb') as f:
-                reader = PyPDF2.PdfReader(f)
-                for page in reader.pages:
-                    text += page.extract_text() or ""
-        elif file_path.endswith('.txt'):
-            with open(file_path, 'r') as f:
-                text = f.read()
-    except Exception as e:
-        st.error(f"Error parsing resume: {e}")
-    return text
+def post_to_rasa(message, sender_id):
+    """Sends a message to the Rasa server. Safe to run off the script thread (no Streamlit calls).
 
-def send_message_to_rasa(message, sender_id):
-    """Sends a message to the Rasa server and gets the response."""
+    Returns (bot responses, round-trip ms or None, error message or None).
+    """
+    fallback = [{"text": "I'm having trouble connecting to my brain right now. Please check if the Rasa server is running and try again."}]
     try:
         payload = {
             "sender": sender_id,
             "message": message
         }
-        response = requests.post(RASA_SERVER_URL, json=payload, timeout=120)
+        start = time.perf_counter()
+        response = get_http_session().post(RASA_SERVER_URL, json=payload, timeout=120)
         response.raise_for_status()
-        return response.json()
+        return response.json(), (time.perf_counter() - start) * 1000, None
     except requests.exceptions.RequestException as e:
-        st.error(f"Failed to connect to the AI engine. Please ensure Rasa is running. Error: {e}")
-        return [{"text": "I'm having trouble connecting to my brain right now. Please check if the Rasa server is running and try again."}]
+        return fallback, None, f"Failed to connect to the AI engine. Please ensure Rasa is running. Error: {e}"
     except Exception as e:
-        st.error(f"An unexpected error occurred: {e}")
-        return [{"text": "Oops, something went wrong on my end."}]
+        return [{"text": "Oops, something went wrong on my end."}], None, f"An unexpected error occurred: {e}"
+
+def finish_rasa_request(result):
+    """Records the latency and surfaces the error of a finished ``post_to_rasa`` call."""
+    responses, latency_ms, error = result
+    if latency_ms is not None:
+        record_latency(latency_ms)
+    if error:
+        st.error(error)
+    return responses
+
+def send_message_to_rasa(message, sender_id):
+    """Sends a message to the Rasa server and gets the response."""
+    return finish_rasa_request(post_to_rasa(message, sender_id))
+
+def submit_message_to_rasa(message, sender_id):
+    """Starts ``post_to_rasa`` on the shared pool and returns its future."""
+    return get_rasa_executor().submit(post_to_rasa, message, sender_id)
+
+def wait_for_rasa(future, placeholder, started):
+    """Waits for a pending request while keeping the page live (reruns can interrupt and resume the wait)."""
+    while not future.done():
+        placeholder.markdown(f"_Thinking… {time.time() - started:.0f}s_")
+        time.sleep(0.1)
+    return finish_rasa_request(future.result())
+
+def record_latency(ms):
+    """Keeps the most recent Rasa round-trip times (ms) for this browser session."""
+    latencies = st.session_state.setdefault("rasa_latencies", [])
+    latencies.append(ms)
+    del latencies[:-LATENCY_WINDOW]
+
+def latency_summary(latencies):
+    """Last, p50 and p95 round-trip times in ms."""
+    ordered = sorted(latencies)
+
+    def pick(q):
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+    return latencies[-1], pick(0.5), pick(0.95)
+
+def stream_from_action_server(stream_url):
+    """Yields text chunks from an action-server stream (Server-Sent Events) as they arrive."""
+    try:
+        with get_http_session().get(stream_url, stream=True, timeout=(5, 90)) as response:
+            response.raise_for_status()
+            event = "message"
+            for line in response.iter_lines(chunk_size=None, decode_unicode=True):
+                if not line:
+                    event = "message"
+                    continue
+                if line.startswith("event:"):
+                    event = line[6:].strip()
+                    if event == "done":
+                        return
+                elif line.startswith("data:"):
+                    data = json.loads(line[5:])
+                    if event == "error":
+                        yield f"\n\n_(Generation stopped: {data.get('error')})_"
+                        return
+                    yield data.get("text", "")
+    except requests.exceptions.RequestException as e:
+        yield f"\n\n_(Lost connection to the live response: {e})_"
+
+def check_report(job):
+    """Checks a background report job once, without waiting. Returns ("done", path), ("pending", None) or ("error", None)."""
+    report_path = job.get("report_path")
+    if job.get("report_status_url"):
+        try:
+            status = get_http_session().get(job["report_status_url"], timeout=2).json()
+            if status.get("status") == "done":
+                return "done", status.get("report_path", report_path)
+            if status.get("status") in ("error", "unknown"):
+                return "error", None
+            return "pending", None
+        except (requests.exceptions.RequestException, ValueError):
+            job["report_status_url"] = None  # Sidecar unreachable; fall back to watching the file.
+    if report_path and os.path.exists(report_path):
+        return "done", report_path
+    return "pending", None
+
+def submit_prompt(prompt):
+    """Adds a user message to the chat and sends it to Rasa as the pending request."""
+    st.session_state.messages.append({"role": "user", "content": prompt})
+    st.session_state.pending_request = {
+        "future": submit_message_to_rasa(prompt, st.session_state.session_id),
+        "started": time.time(),
+    }
 
 # --- Main App Logic ---
 def main():
@@ -112,6 +221,7 @@ def main():
     
     if "report_path" not in st.session_state:
         st.session_state.report_path = None
+        st.session_state.report_name = None
 
 
     # --- Sidebar ---
@@ -121,70 +231,135 @@ def main():
             st.session_state.messages = []
             st.session_state.session_id = f"session_{uuid.uuid4()}"
             st.session_state.report_path = None
+            st.session_state.report_name = None
+            st.session_state.pending_request = None
+            st.session_state.queued_prompts = []
+            st.session_state.pending_report = None
+            st.session_state.chat_window = CHAT_WINDOW
+            # The new session has no resume yet; send the current upload again on the next run.
+            st.session_state.pop("resume_upload", None)
             st.success("Conversation restarted.")
             st.rerun()
 
         st.header("Upload Your Resume")
         uploaded_file = st.file_uploader("Upload a PDF or TXT file for deeper analysis", type=["pdf", "txt"])
-        if uploaded_file is not None:
+        # Streamlit reruns this script on every interaction; only analyze a given upload once.
+        if uploaded_file is not None and st.session_state.get("resume_upload") != (uploaded_file.name, uploaded_file.size):
+            st.session_state.resume_upload = (uploaded_file.name, uploaded_file.size)
             with st.spinner("Analyzing resume..."):
-                if not os.path.exists("uploads"):
-                    os.makedirs("uploads")
-                file_path = os.path.join("uploads", uploaded_file.name)
-                with open(file_path, "wb") as f:
-                    f.write(uploaded_file.getbuffer())
-
-                resume_text = parse_resume(file_path)
-                # Send resume text to Rasa to be stored in a slot
-                send_message_to_rasa(f"/inform_resume{{\"resume_keywords\": \"{resume_text.replace('\"', ' ')}\"}}", st.session_state.session_id)
+                # Stream pages from the in-memory upload and send only a keyword/frequency summary.
+                try:
+                    resume_keywords = summarize_resume(uploaded_file, uploaded_file.name)
+                except Exception as e:
+                    st.error(f"Error parsing resume: {e}")
+                    resume_keywords = ""
+                # Send the summary to Rasa to be stored in a slot
+                send_message_to_rasa("/inform_resume" + json.dumps({"resume_keywords": resume_keywords}),
+                                     st.session_state.session_id)
                 st.success("Resume analyzed successfully!")
                 st.info("Your resume has been processed and will be used for recommendations.")
-                os.remove(file_path)
 
         st.header("Download Report")
         if st.session_state.report_path and os.path.exists(st.session_state.report_path):
-             with open(st.session_state.report_path, "rb") as pdf_file:
-                PDFbyte = pdf_file.read()
+             # Read from disk once per report version, not on every rerun.
+             PDFbyte = load_report_bytes(st.session_state.report_path,
+                                         os.path.getmtime(st.session_state.report_path))
              st.download_button(label="Download Career Report",
                                 data=PDFbyte,
-                                file_name=os.path.basename(st.session_state.report_path),
+                                file_name=st.session_state.report_name or os.path.basename(st.session_state.report_path),
                                 mime='application/octet-stream')
         else:
             st.info("Your report will be available here once a career has been recommended.")
 
+        if st.session_state.get("rasa_latencies"):
+            last, p50, p95 = latency_summary(st.session_state.rasa_latencies)
+            st.caption(f"⏱️ Rasa round-trip: last {last:.0f} ms · p50 {p50:.0f} ms · p95 {p95:.0f} ms "
+                       f"(over {len(st.session_state.rasa_latencies)} messages)")
+
     # --- Chat Interface ---
-    for message in st.session_state.messages:
+    # Long sessions only render the latest messages, so each rerun costs the same however long the chat is.
+    messages = st.session_state.messages
+    window = st.session_state.setdefault("chat_window", CHAT_WINDOW)
+    hidden = len(messages) - window if window else 0
+    if hidden > 0 and st.button(f"Show earlier messages ({hidden} hidden)"):
+        st.session_state.chat_window += CHAT_WINDOW
+        st.rerun()
+    for message in messages[max(hidden, 0):]:
         with st.chat_message(message["role"]):
             st.markdown(message["content"])
 
+    # Messages sent while Rasa is still answering wait their turn, so replies never overtake each other.
+    queued = st.session_state.setdefault("queued_prompts", [])
     if prompt := st.chat_input("Your response..."):
-        st.session_state.messages.append({"role": "user", "content": prompt})
-        with st.chat_message("user"):
-            st.markdown(prompt)
+        if st.session_state.get("pending_request") or queued:
+            queued.append(prompt)
+        else:
+            submit_prompt(prompt)
+            with st.chat_message("user"):
+                st.markdown(prompt)
+    if queued:
+        st.caption(f"⏳ {len(queued)} message(s) will be sent once the current reply is complete.")
 
+    # The request runs on the shared pool; if this run is interrupted by another widget, the next run resumes waiting.
+    pending = st.session_state.get("pending_request")
+    if pending:
         with st.chat_message("assistant"):
             message_placeholder = st.empty()
-            with st.spinner("Thinking..."):
-                bot_responses = send_message_to_rasa(prompt, st.session_state.session_id)
-                
-                full_response = ""
-                for r in bot_responses:
-                    full_response += r.get("text", "") + "\n\n"
-                    if r.get("buttons"):
-                        full_response += "**Choose an option by typing its title:**\n"
-                        for button in r.get("buttons"):
-                            full_response += f"- `{button['title']}`\n"
-                    
-                    # Check for custom data, like a report path
-                    if "report_path" in r.get("custom", {}):
-                        st.session_state.report_path = r["custom"]["report_path"]
-
-                message_placeholder.markdown(full_response.strip())
-                st.session_state.messages.append({"role": "assistant", "content": full_response.strip()})
-                
-                # Rerun to update the download button if a report was generated
-                if "report_path" in [r.get("custom", {}) for r in bot_responses]:
-                    st.rerun()
+            bot_responses = wait_for_rasa(pending["future"], message_placeholder, pending["started"])
+
+            full_response = ""
+            for r in bot_responses:
+                full_response += r.get("text", "")
+                # Long generations are streamed from the action server instead of waiting for the full text.
+                stream_url = r.get("custom", {}).get("stream_url")
+                if stream_url:
+                    message_placeholder.markdown(full_response + "▌")
+                    for chunk in stream_from_action_server(stream_url):
+                        full_response += chunk
+                        message_placeholder.markdown(full_response + "▌")
+                full_response += "\n\n"
+                if r.get("buttons"):
+                    full_response += "**Choose an option by typing its title:**\n"
+                    for button in r.get("buttons"):
+                        full_response += f"- `{button['title']}`\n"
+
+                # Check for custom data, like a report path
+                if "report_path" in r.get("custom", {}):
+                    st.session_state.report_path = r["custom"]["report_path"]
+                    st.session_state.report_name = r["custom"].get("report_name")
+
+            message_placeholder.markdown(full_response.strip())
+            st.session_state.messages.append({"role": "assistant", "content": full_response.strip()})
+            # Cleared only now: an interrupted run replays the finished request (streams are buffered server-side).
+            st.session_state.pending_request = None
+
+            # Reports render in the background; later runs poll the job (see below) without blocking the page.
+            report_job = next((r["custom"] for r in bot_responses if "report_path" in r.get("custom", {})), None)
+            if report_job:
+                st.session_state.pending_report = dict(report_job, started=time.time())
+
+    if queued and not st.session_state.get("pending_request"):
+        submit_prompt(queued.pop(0))
+        st.rerun()
+
+    report_job = st.session_state.get("pending_report")
+    if report_job:
+        status, report_path = check_report(report_job)
+        if status == "done":
+            st.session_state.pending_report = None
+            st.session_state.report_path = report_path
+            st.rerun()
+        elif status == "error":
+            st.session_state.pending_report = None
+            st.warning("The report could not be prepared. Please ask for it again.")
+        elif time.time() - report_job["started"] > REPORT_TIMEOUT_SECONDS:
+            st.session_state.pending_report = None
+            st.warning("The report is taking longer than expected. It will appear in the sidebar once it's ready.")
+        else:
+            st.caption("📄 Rendering your report...")
+            # Any interaction during the wait starts a new run straight away.
+            time.sleep(REPORT_POLL_SECONDS)
+            st.rerun()
 
 if __name__ == "__main__":
     main()
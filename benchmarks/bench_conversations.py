@@ -0,0 +1,390 @@
+"""Load test of the conversation flows in data/stories.yml, with a stub Gemini server.
+
+Against a Rasa server, which calls the action server as in production:
+
+    python benchmarks/bench_conversations.py --target rasa --concurrency 8 --conversations 200 -o load.json
+
+Straight against the action server (no NLU or policies). This starts a local
+action server wired to the stub, with a throwaway database and report directory:
+
+    python benchmarks/bench_conversations.py --target actions --launch-actions --concurrency 16 \\
+        --conversations 400 --follow-streams --wait-reports -o actions.json
+
+Add ``--workers N`` to launch N action workers behind the sender_id router
+(``python -m actions.cluster``) instead, to check that throughput scales.
+
+Every story becomes a scripted conversation, with story references inlined and a
+resume upload inserted where the bot asks for one. A "report" flow is added for
+the affirm -> action_generate_report rule. Each user turn is labelled with the
+custom action it triggers, and latency percentiles and throughput are reported
+per label. ``--follow-streams`` and ``--wait-reports`` also time how long the
+streamed answer and the background PDF take after the action returned
+("<action>:stream", "<action>:render").
+
+The stub answers on --stub-port (default 8765). An action server you start
+yourself needs GEMINI_API_KEY=stub and GEMINI_API_BASE=http://localhost:8765.
+"""
+import argparse
+import asyncio
+import itertools
+import json
+import os
+import random
+import re
+import subprocess
+import sys
+import tempfile
+import time
+import uuid
+from collections import defaultdict
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+from benchmarks.common import summarize, write_results  # noqa: E402
+from benchmarks.stub_gemini import start_stub  # noqa: E402
+
+# A resume_ingestion.summarize_resume-style summary, as the Streamlit app would send it.
+RESUME_SUMMARY = ("python (14), data (11), machine learning (6), sql (5), analysis (5), statistics (4), "
+                  "project management (2), communication (2), aws (2), teamwork (1), git (1)")
+
+_ANNOTATION = re.compile(r"\[([^\]]+)\](?:\([^)]*\)|\{[^}]*\})")
+
+
+# --- Flows ---
+def _load_yaml(name):
+    import yaml
+
+    with open(os.path.join(REPO_ROOT, name), encoding="utf-8") as f:
+        return yaml.safe_load(f)
+
+
+def nlu_examples():
+    """intent -> example utterances from data/nlu.yml, with entity markup removed."""
+    examples = {}
+    for block in _load_yaml("data/nlu.yml").get("nlu", []):
+        if "intent" in block:
+            lines = [line[2:].strip() for line in block.get("examples", "").splitlines() if line.strip().startswith("- ")]
+            examples[block["intent"]] = [_ANNOTATION.sub(r"\1", line) for line in lines]
+    return examples
+
+
+def _expand(steps, stories, depth=0):
+    for step in steps:
+        if "story" in step and depth < 10:
+            # data/stories.yml starts some stories with "- story: <name>" to mean "continue from <name>".
+            yield from _expand(stories.get(step["story"], []), stories, depth + 1)
+        else:
+            yield step
+
+
+def load_flows():
+    """Scripted conversations: [{"name", "turns": [{"intent", "entities", "label"}]}]."""
+    stories = {s["story"]: s.get("steps", []) for s in _load_yaml("data/stories.yml").get("stories", [])}
+    flows = []
+    for name, steps in stories.items():
+        turns = []
+        for step in _expand(steps, stories):
+            if "intent" in step:
+                entities = {k: v for e in step.get("entities", []) for k, v in e.items()}
+                turns.append({"intent": step["intent"], "entities": entities, "actions": []})
+            elif "action" in step:
+                if turns:
+                    turns[-1]["actions"].append(step["action"])
+                if step["action"] == "utter_ask_resume":
+                    turns.append({"intent": "inform_resume", "entities": {}, "actions": []})
+        flows.append({"name": name, "turns": [_labelled(t) for t in turns]})
+
+    happy = next((f for f in flows if f["name"].startswith("Happy Path")), None)
+    if happy is not None:
+        # rules.yml: affirm once a career is recommended -> action_generate_report
+        flows.append({"name": "Report after recommendation", "turns": happy["turns"] + [
+            {"intent": "affirm", "entities": {}, "label": "action_generate_report"}]})
+    return flows
+
+
+def _labelled(turn):
+    actions = turn.pop("actions")
+    custom = [a for a in actions if a.startswith("action_")]
+    turn["label"] = custom[0] if custom else (actions[0] if actions else f"intent:{turn['intent']}")
+    return turn
+
+
+class MessageFactory:
+    """Turns a scripted (intent, entities) step into the text a user would send."""
+
+    def __init__(self, mode, seed):
+        self.mode = mode
+        self.examples = nlu_examples()
+        self.rng = random.Random(seed)
+
+    def text(self, turn):
+        if turn["intent"] == "inform_resume":
+            return "/inform_resume" + json.dumps({"resume_keywords": RESUME_SUMMARY})
+        examples = self.examples.get(turn["intent"])
+        if self.mode == "nlu" and examples:
+            return self.rng.choice(examples)
+        return f"/{turn['intent']}" + (json.dumps(turn["entities"]) if turn["entities"] else "")
+
+
+# --- Clients ---
+class Recorder:
+    def __init__(self):
+        self.latencies = defaultdict(list)
+        self.errors = defaultdict(int)
+        self.turns = 0
+
+    def add(self, label, ms):
+        self.latencies[label].append(ms)
+
+    def error(self, label, reason):
+        self.errors[f"{label}: {reason}"[:200]] += 1
+
+
+async def follow_custom(session, label, custom, recorder, args):
+    """Times the streamed answer and the background report that an action handed off."""
+    start = time.perf_counter()
+    if args.follow_streams and custom.get("stream_url"):
+        try:
+            async with session.get(custom["stream_url"]) as response:
+                async for line in response.content:
+                    if line.startswith(b"event: done") or line.startswith(b"event: error"):
+                        break
+            recorder.add(f"{label}:stream", (time.perf_counter() - start) * 1000)
+        except Exception as e:
+            recorder.error(f"{label}:stream", repr(e))
+    if args.wait_reports and custom.get("report_status_url"):
+        deadline = time.perf_counter() + 120
+        try:
+            while time.perf_counter() < deadline:
+                async with session.get(custom["report_status_url"]) as response:
+                    status = (await response.json(content_type=None)).get("status")
+                if status != "pending":
+                    break
+                await asyncio.sleep(0.05)
+            if status == "done":
+                recorder.add(f"{label}:render", (time.perf_counter() - start) * 1000)
+            else:
+                recorder.error(f"{label}:render", status)
+        except Exception as e:
+            recorder.error(f"{label}:render", repr(e))
+
+
+async def run_rasa_conversation(session, flow, messages, recorder, args):
+    sender = f"bench_{uuid.uuid4().hex}"
+    for turn in flow["turns"]:
+        payload = {"sender": sender, "message": messages.text(turn)}
+        start = time.perf_counter()
+        try:
+            async with session.post(f"{args.rasa_url}/webhooks/rest/webhook", json=payload) as response:
+                body = await response.json(content_type=None)
+                if response.status != 200:
+                    recorder.error(turn["label"], f"HTTP {response.status}")
+                    continue
+        except Exception as e:
+            recorder.error(turn["label"], repr(e))
+            continue
+        recorder.add(turn["label"], (time.perf_counter() - start) * 1000)
+        recorder.turns += 1
+        for message in body or []:
+            if message.get("custom"):
+                await follow_custom(session, turn["label"], message["custom"], recorder, args)
+
+
+async def run_action_conversation(session, flow, messages, recorder, args, domain):
+    sender = f"bench_{uuid.uuid4().hex}"
+    slots = {"name": "Alex", "user_interests": messages.text({"intent": "inform_interest", "entities": {}}),
+             "user_strengths": messages.text({"intent": "inform_strength", "entities": {}}),
+             "user_subjects": messages.text({"intent": "inform_subject", "entities": {}}),
+             "resume_keywords": RESUME_SUMMARY}
+    if args.career:
+        slots["recommended_career"] = args.career
+    for turn in flow["turns"]:
+        if not turn["label"].startswith("action_"):
+            continue
+        text = messages.text(turn)
+        payload = {
+            "next_action": turn["label"],
+            "sender_id": sender,
+            "version": "3.0.0",
+            "domain": domain,
+            "tracker": {
+                "sender_id": sender,
+                "slots": dict(slots),
+                "latest_message": {"text": text, "intent": {"name": turn["intent"], "confidence": 1.0},
+                                   "entities": [{"entity": k, "value": v} for k, v in turn["entities"].items()]},
+                "latest_event_time": time.time(),
+                "followup_action": None,
+                "paused": False,
+                "events": [],
+                "latest_input_channel": "rest",
+                "latest_action_name": "action_listen",
+                "active_loop": {},
+            },
+        }
+        start = time.perf_counter()
+        try:
+            async with session.post(f"{args.actions_url}/webhook", json=payload) as response:
+                body = await response.json(content_type=None)
+                if response.status != 200:
+                    recorder.error(turn["label"], f"HTTP {response.status}")
+                    continue
+        except Exception as e:
+            recorder.error(turn["label"], repr(e))
+            continue
+        recorder.add(turn["label"], (time.perf_counter() - start) * 1000)
+        recorder.turns += 1
+        for event in body.get("events", []):
+            if event.get("event") == "slot":
+                slots[event["name"]] = event.get("value")
+        for message in body.get("responses", []):
+            if message.get("custom"):
+                await follow_custom(session, turn["label"], message["custom"], recorder, args)
+
+
+async def drive(args, flows):
+    import aiohttp
+
+    recorder = Recorder()
+    messages = MessageFactory(args.messages, args.seed)
+    domain = _load_yaml("domain.yml") if args.target == "actions" else None
+    order = itertools.cycle(flows)
+    started = {"n": 0}
+    deadline = time.perf_counter() + args.duration if args.duration else None
+
+    def next_flow():
+        if deadline is not None:
+            return next(order) if time.perf_counter() < deadline else None
+        if started["n"] >= args.conversations:
+            return None
+        started["n"] += 1
+        return next(order)
+
+    async def user(session):
+        while True:
+            flow = next_flow()
+            if flow is None:
+                return
+            if args.target == "rasa":
+                await run_rasa_conversation(session, flow, messages, recorder, args)
+            else:
+                await run_action_conversation(session, flow, messages, recorder, args, domain)
+
+    connector = aiohttp.TCPConnector(limit=args.concurrency * 2)
+    timeout = aiohttp.ClientTimeout(total=args.timeout)
+    async with aiohttp.ClientSession(connector=connector, timeout=timeout) as session:
+        start = time.perf_counter()
+        await asyncio.gather(*(user(session) for _ in range(args.concurrency)))
+        wall = time.perf_counter() - start
+    return recorder, wall, started["n"]
+
+
+# --- Local stack ---
+def _wait_for(url, process, timeout):
+    import urllib.error
+    import urllib.request
+
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"{process.args[0]} exited with code {process.returncode}")
+        try:
+            urllib.request.urlopen(url, timeout=2).read()
+            return
+        except (urllib.error.URLError, OSError):
+            time.sleep(0.5)
+    raise RuntimeError(f"{url} did not come up within {timeout}s")
+
+
+def launch_actions(args, stub_url, workdir):
+    """Starts the action server on --actions-url's port, wired to the stub and a scratch directory.
+
+    With --workers N > 1 that is ``python -m actions.cluster``: N workers behind the sender_id router.
+    """
+    port = int(args.actions_url.rsplit(":", 1)[1].split("/")[0])
+    env = dict(os.environ,
+               GEMINI_API_KEY="stub",
+               GEMINI_API_BASE=stub_url,
+               SESSION_DB=os.path.join(workdir, "sessions.db"),
+               LLM_CACHE_DB=os.path.join(workdir, "llm_cache.db"),
+               REPORTS_DIR=os.path.join(workdir, "reports"),
+               ACTION_SIDECAR_PORT=str(args.sidecar_port),
+               ACTION_SIDECAR_URL=f"http://localhost:{args.sidecar_port}")
+    command = [sys.executable, "-m", "rasa_sdk", "--actions", "actions", "--port", str(port)]
+    if args.workers > 1:
+        command = [sys.executable, "-m", "actions.cluster", "--workers", str(args.workers), "--port", str(port),
+                   "--sidecar-port", str(args.sidecar_port), "--state-dir", workdir]
+    process = subprocess.Popen(command,
+                               cwd=REPO_ROOT, env=env, stdout=subprocess.DEVNULL,
+                               stderr=open(os.path.join(workdir, "actions.log"), "w"))
+    _wait_for(f"{args.actions_url}/health", process, 120)
+    return process
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0],
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--target", choices=["rasa", "actions"], default="rasa")
+    parser.add_argument("--rasa-url", default="http://localhost:5005")
+    parser.add_argument("--actions-url", default="http://localhost:5055")
+    parser.add_argument("--launch-actions", action="store_true", help="start a local action server for the run")
+    parser.add_argument("--sidecar-port", type=int, default=5056, help="sidecar port of a launched action server")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="launch this many action workers behind the sender_id router")
+    parser.add_argument("--concurrency", type=int, default=4, help="simulated users talking at the same time")
+    parser.add_argument("--conversations", type=int, default=40, help="total conversations to run")
+    parser.add_argument("--duration", type=float, help="run for this many seconds instead")
+    parser.add_argument("--messages", choices=["nlu", "intents"], default="nlu",
+                        help="send NLU example texts, or /intent payloads that skip classification")
+    parser.add_argument("--flows", help="comma-separated story names to run (default: all)")
+    parser.add_argument("--career", help="actions target: pre-set recommended_career, so the follow-up "
+                                         "actions can be measured without the recommender")
+    parser.add_argument("--follow-streams", action="store_true")
+    parser.add_argument("--wait-reports", action="store_true")
+    parser.add_argument("--timeout", type=float, default=120.0, help="per-request timeout in seconds")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--no-stub", action="store_true", help="do not start the stub Gemini server")
+    parser.add_argument("--stub-port", type=int, default=8765)
+    parser.add_argument("--stub-latency-ms", type=float, default=300.0)
+    parser.add_argument("-o", "--output", help="write results as JSON to this file")
+    args = parser.parse_args()
+
+    flows = load_flows()
+    if args.flows:
+        wanted = set(args.flows.split(","))
+        flows = [f for f in flows if f["name"] in wanted]
+    if not flows:
+        parser.error("no flows selected")
+
+    stub = None if args.no_stub else start_stub(port=args.stub_port, latency_ms=args.stub_latency_ms)
+    process = None
+    with tempfile.TemporaryDirectory() as workdir:
+        try:
+            if args.launch_actions:
+                process = launch_actions(args, stub.url if stub else os.getenv("GEMINI_API_BASE", ""), workdir)
+            recorder, wall, conversations = asyncio.run(drive(args, flows))
+        finally:
+            if process is not None:
+                process.terminate()
+                process.wait(timeout=30)
+
+    write_results({
+        "benchmark": "conversations",
+        "target": args.target,
+        "messages": args.messages,
+        "concurrency": args.concurrency,
+        "workers": args.workers if args.launch_actions else None,
+        "conversations": conversations,
+        "flows": [f["name"] for f in flows],
+        "wall_s": wall,
+        "turns": recorder.turns,
+        "turns_per_s": recorder.turns / wall if wall else 0.0,
+        "conversations_per_s": conversations / wall if wall else 0.0,
+        "stub": {"latency_ms": args.stub_latency_ms, "requests": stub.requests} if stub else None,
+        "actions": {label: summarize(ms, wall) for label, ms in sorted(recorder.latencies.items())},
+        "errors": dict(recorder.errors),
+    }, args.output)
+
+
+if __name__ == "__main__":
+    main()
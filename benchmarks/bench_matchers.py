@@ -0,0 +1,115 @@
+"""Latency and accuracy of the TF-IDF and embedding career matchers on labelled profiles.
+
+    python benchmarks/bench_matchers.py --model-dir models/all-MiniLM-L6-v2 --output matchers.json
+
+Builds the domain embedding index into a temporary directory with the given local
+encoder (or uses --index-dir), then scores every labelled profile with both
+matchers. Reports top-1 / top-3 accuracy and per-query latency percentiles. Without
+--model-dir only the TF-IDF matcher is measured.
+"""
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+from actions.catalog import get_catalog  # noqa: E402
+from actions.inverted_index import get_inverted_index  # noqa: E402
+from actions.preprocessing import get_preprocessor  # noqa: E402
+from benchmarks.common import write_results  # noqa: E402
+
+# (profile text, expected domain). Several deliberately avoid the catalog keywords.
+LABELLED_PROFILES = [
+    ("I enjoy building apps and automating boring tasks with scripts", "Tech / Data Science"),
+    ("I love python, statistics and working with large datasets", "Tech / Data Science"),
+    ("I spend weekends writing web services and deploying them", "Tech / Data Science"),
+    ("Good at logical puzzles; favourite subject was computer science", "Tech / Data Science"),
+    ("I like training neural networks and reading ML papers", "Tech / Data Science"),
+    ("I sketch characters and make comics in my free time", "Arts / Design"),
+    ("I enjoy painting, music and anything creative", "Arts / Design"),
+    ("I redesign websites so they look better and are easier to use", "Arts / Design"),
+    ("Photography and film editing are my passions", "Arts / Design"),
+    ("I run a small online shop and track my profit every month", "Commerce / Management"),
+    ("I like leading teams and negotiating deals", "Commerce / Management"),
+    ("Economics and accounting were my best subjects", "Commerce / Management"),
+    ("I follow the stock market and enjoy budgeting", "Commerce / Management"),
+    ("I volunteer at a hospital and want to help sick people", "Medicine / Biology"),
+    ("Biology and chemistry labs are my favourite part of school", "Medicine / Biology"),
+    ("I am fascinated by how the human body heals itself", "Medicine / Biology"),
+    ("I want to research vaccines and diseases", "Medicine / Biology"),
+    ("I love debating and standing up for people's rights", "Law / Social Sciences"),
+    ("I am curious about why people behave the way they do", "Law / Social Sciences"),
+    ("History and civics, and I follow elections closely", "Law / Social Sciences"),
+    ("I want to work on public policy and fight injustice in court", "Law / Social Sciences"),
+]
+
+
+def percentile(samples, q):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(round(q / 100 * (len(ordered) - 1))))]
+
+
+def evaluate(rank, repeat: int) -> dict:
+    """``rank(text)`` returns a list of domain names, best first."""
+    top1 = top3 = 0
+    latencies = []
+    for text, expected in LABELLED_PROFILES:
+        ranked = rank(text)
+        top1 += bool(ranked) and ranked[0] == expected
+        top3 += expected in ranked[:3]
+        for _ in range(repeat):
+            start = time.perf_counter()
+            rank(text)
+            latencies.append((time.perf_counter() - start) * 1000)
+    n = len(LABELLED_PROFILES)
+    return {
+        "top1_accuracy": top1 / n,
+        "top3_accuracy": top3 / n,
+        "p50_ms": statistics.median(latencies),
+        "p95_ms": percentile(latencies, 95),
+        "p99_ms": percentile(latencies, 99),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--model-dir", help="local sentence-encoder directory")
+    parser.add_argument("--index-dir", help="prebuilt domain embedding index (skips building)")
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--output", help="write results as JSON to this file")
+    args = parser.parse_args()
+
+    catalog = get_catalog()
+    preprocessor = get_preprocessor()
+    inverted = get_inverted_index(catalog, preprocessor.process)
+
+    def rank_tfidf(text):
+        return [m.domain for m in inverted.search(preprocessor.process(text), 3)]
+
+    results = {"profiles": len(LABELLED_PROFILES), "domains": len(catalog),
+               "tfidf": evaluate(rank_tfidf, args.repeat)}
+
+    if args.model_dir:
+        from actions.embeddings import DomainEmbeddingIndex, SentenceEncoder
+
+        load_start = time.perf_counter()
+        encoder = SentenceEncoder(args.model_dir)
+        results["encoder_load_s"] = time.perf_counter() - load_start
+        with tempfile.TemporaryDirectory() as tmp:
+            index_dir = args.index_dir or DomainEmbeddingIndex.build(catalog, encoder, tmp)
+            index = DomainEmbeddingIndex.load(index_dir, encoder)
+
+            def rank_embedding(text):
+                return [domain for domain, _ in index.search(encoder.encode([text])[0], 3)]
+
+            results["embedding"] = evaluate(rank_embedding, args.repeat)
+
+    write_results(results, args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+"""Micro-benchmarks of the per-turn building blocks of the action server.
+
+    python benchmarks/bench_micro.py --repeat 200 -o micro.json
+
+Times, in-process and without any network:
+  preprocess        preprocess_text on a short answer and on a resume summary
+  scoring           inverted-index top-k search and the full CareerIndex score
+  skill_extraction  skill-taxonomy gap analysis on a resume summary
+  pdf               render_report for one career report
+
+Missing NLTK data does not stop preprocessing: it runs degraded (built-in
+stopword list, no lemmatization), and the mode actually measured is recorded
+as "mode" under preprocess and as "preprocess" under scoring, e.g.
+"fallback (no stopwords, no wordnet)". If the preprocessor cannot be built at
+all, that is reported as an error and scoring runs on lower-cased text.
+"""
+import argparse
+import os
+import sys
+import tempfile
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+from benchmarks.common import summarize, time_calls, write_results  # noqa: E402
+
+SHORT_TEXT = "I love building web apps, playing chess and reading about machine learning."
+RESUME_SUMMARY = ("python (14), data (11), machine learning (6), sql (5), analysis (5), statistics (4), "
+                  "project management (2), communication (2), aws (2), teamwork (1), git (1)")
+PROFILE = {
+    "name": "Alex",
+    "interests": "building apps and automating things",
+    "strengths": "problem solving, logical thinking",
+    "subjects": "mathematics and computer science",
+    "ranking": [{"domain": "Tech / Data Science", "score": 61.0, "terms": "python, data, machine learning"},
+                {"domain": "Commerce / Management", "score": 12.0, "terms": "management"}],
+}
+
+
+def preprocess_mode(preprocessor):
+    """"nltk", or which missing NLTK resources the preprocessor is falling back for."""
+    from actions.resources import ensure_nltk_data
+
+    missing = [name for name in ("stopwords", "wordnet") if name in ensure_nltk_data()]
+    if preprocessor.tokenizer_missing:
+        missing.append("punkt")
+    return f"fallback (no {', no '.join(missing)})" if missing else "nltk"
+
+
+def bench_preprocess(repeat):
+    from actions.preprocessing import get_preprocessor
+
+    preprocessor = get_preprocessor()
+    preprocessor.process(SHORT_TEXT)  # loads the stopwords and lemmatizer
+    # The memo caches would turn every repeat into a dict lookup; measure cold and warm separately.
+    cold = time_calls(lambda: preprocessor.process(SHORT_TEXT + str(os.urandom(4).hex())), repeat)
+    return {
+        "mode": preprocess_mode(preprocessor),
+        "short_cold": summarize(cold),
+        "short_warm": summarize(time_calls(lambda: preprocessor.process(SHORT_TEXT), repeat)),
+        "resume_summary": summarize(time_calls(lambda: preprocessor.process(RESUME_SUMMARY), repeat)),
+    }
+
+
+def bench_scoring(repeat, preprocess):
+    from actions.career_index import CareerIndex
+    from actions.catalog import get_catalog
+    from actions.inverted_index import InvertedIndex
+
+    catalog = get_catalog()
+    index = CareerIndex.from_catalog(catalog, preprocess)
+    inverted = InvertedIndex(index)
+    profile = preprocess(f"{SHORT_TEXT} {RESUME_SUMMARY}")
+    return {
+        "domains": len(catalog),
+        "inverted_search_top3": summarize(time_calls(lambda: inverted.search(profile, 3), repeat)),
+        "career_index_score": summarize(time_calls(lambda: index.score(profile), repeat)),
+        "index_build": summarize(time_calls(lambda: InvertedIndex(CareerIndex.from_catalog(catalog, preprocess)),
+                                            max(1, repeat // 20))),
+    }
+
+
+def bench_skills(repeat):
+    from actions.skills import get_skill_taxonomy
+
+    taxonomy = get_skill_taxonomy()
+    return {"gap_resume_summary": summarize(
+        time_calls(lambda: taxonomy.gap(RESUME_SUMMARY, "Tech / Data Science"), repeat))}
+
+
+def bench_pdf(repeat):
+    from actions.reports import render_report
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "report.pdf")
+        latencies = time_calls(lambda: render_report(path, "Tech / Data Science",
+                                                     "Designing and applying technology and data.", PROFILE),
+                               max(1, repeat // 10))
+        return {"render_report": summarize(latencies), "pdf_kb": os.path.getsize(path) / 1024}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=200)
+    parser.add_argument("--only", help="comma-separated subset: preprocess,scoring,skill_extraction,pdf")
+    parser.add_argument("-o", "--output", help="write results as JSON to this file")
+    args = parser.parse_args()
+    only = set(args.only.split(",")) if args.only else None
+
+    results = {"benchmark": "micro", "repeat": args.repeat}
+    preprocess = None
+    mode = "lowercase fallback"
+    if not only or "preprocess" in only or "scoring" in only:
+        try:
+            results["preprocess"] = bench_preprocess(args.repeat)
+            from actions.preprocessing import get_preprocessor
+            preprocess = get_preprocessor().process
+            mode = results["preprocess"]["mode"]
+        except (LookupError, ImportError, OSError) as e:
+            # NLTK's LookupError message is framed in lines of asterisks.
+            lines = [line.strip() for line in str(e).splitlines() if line.strip(" *")]
+            results["preprocess"] = {"error": lines[0] if lines else repr(e)}
+    if not only or "scoring" in only:
+        results["scoring"] = bench_scoring(args.repeat, preprocess or str.lower)
+        results["scoring"]["preprocess"] = mode
+    if not only or "skill_extraction" in only:
+        results["skill_extraction"] = bench_skills(args.repeat)
+    if not only or "pdf" in only:
+        results["pdf"] = bench_pdf(args.repeat)
+    if only and "preprocess" not in only:
+        results.pop("preprocess", None)
+    write_results(results, args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,197 @@
+"""Compares Rasa model configurations on NLU accuracy, per-message CPU latency and load time.
+
+    python benchmarks/bench_rasa_config.py --configs config.yml,config_fast.yml -o rasa_configs.json
+
+Each configuration is trained with ``rasa train``, unless ``--models-dir`` already
+holds ``<config name>.tar.gz``. The training data is data/, plus data_<x>/ for
+config_<x>.yml if that directory exists (e.g. data_fast/ for config_fast.yml).
+Each model is then evaluated in a fresh interpreter:
+- model load time (``Agent.load``)
+- intent accuracy on the held-out examples in benchmarks/data/nlu_eval.yml
+- wall and CPU time per message, for NLU parsing alone and for NLU plus next-action prediction
+
+``rasa test core`` checks that data/stories.yml is still reproduced. A config
+meets the budget when inform_interest, inform_strength and inform_subject each
+keep a recall of at least --min-accuracy; use --fail to exit with status 1 otherwise.
+"""
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+import uuid
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+from benchmarks.common import summarize, write_results  # noqa: E402
+
+EVAL_FILE = os.path.join(REPO_ROOT, "benchmarks", "data", "nlu_eval.yml")
+KEY_INTENTS = ("inform_interest", "inform_strength", "inform_subject")
+
+
+def load_eval_examples(path):
+    """(text, intent) pairs from a Rasa NLU YAML file."""
+    import yaml
+
+    with open(path, encoding="utf-8") as f:
+        data = yaml.safe_load(f)
+    pairs = []
+    for block in data.get("nlu", []):
+        for line in block.get("examples", "").splitlines():
+            if line.strip().startswith("- "):
+                pairs.append((line.strip()[2:], block["intent"]))
+    return pairs
+
+
+# --- Runs inside a fresh interpreter per model ---
+async def _evaluate(model_path, eval_path, repeat):
+    from rasa.core.agent import Agent
+    from rasa.core.channels.channel import UserMessage
+
+    start = time.perf_counter()
+    agent = Agent.load(model_path)
+    load_s = time.perf_counter() - start
+
+    examples = load_eval_examples(eval_path)
+    await agent.parse_message(examples[0][0])  # warm-up
+
+    per_intent = {}
+    fallbacks = 0
+    parse_ms, parse_cpu_ms = [], []
+    for _ in range(repeat):
+        for text, expected in examples:
+            wall, cpu = time.perf_counter(), time.process_time()
+            result = await agent.parse_message(text)
+            parse_ms.append((time.perf_counter() - wall) * 1000)
+            parse_cpu_ms.append((time.process_time() - cpu) * 1000)
+            predicted = (result.get("intent") or {}).get("name")
+            hits, total = per_intent.get(expected, (0, 0))
+            per_intent[expected] = (hits + (predicted == expected), total + 1)
+            fallbacks += predicted == "nlu_fallback"
+
+    # NLU + policy prediction for a message in a fresh conversation.
+    turn_ms, turn_cpu_ms = [], []
+    turn_error = None
+    try:
+        for text, _ in examples:
+            sender = f"bench_{uuid.uuid4().hex}"
+            wall, cpu = time.perf_counter(), time.process_time()
+            await agent.log_message(UserMessage(text, sender_id=sender))
+            await agent.predict_next_for_sender_id(sender)
+            turn_ms.append((time.perf_counter() - wall) * 1000)
+            turn_cpu_ms.append((time.process_time() - cpu) * 1000)
+    except Exception as e:  # older/newer Rasa versions expose a different Agent API
+        turn_error = repr(e)
+
+    total = sum(t for _, t in per_intent.values())
+    correct = sum(h for h, _ in per_intent.values())
+    return {
+        "load_s": load_s,
+        "nlu": {
+            "examples": len(examples),
+            "accuracy": correct / total if total else 0.0,
+            "fallback_rate": fallbacks / total if total else 0.0,
+            "per_intent_recall": {intent: h / t for intent, (h, t) in sorted(per_intent.items())},
+        },
+        "latency": {
+            "parse": summarize(parse_ms),
+            "parse_cpu": summarize(parse_cpu_ms),
+            "turn": summarize(turn_ms) if turn_ms else {"error": turn_error},
+            "turn_cpu": summarize(turn_cpu_ms) if turn_cpu_ms else {"error": turn_error},
+        },
+    }
+
+
+def worker(model_path, eval_path, repeat):
+    print(json.dumps(asyncio.run(_evaluate(model_path, eval_path, repeat))))
+
+
+# --- Driver ---
+def training_data(name):
+    """data/ plus the data_<x>/ directory that belongs to config_<x>.yml, if any."""
+    paths = ["data"]
+    if name.startswith("config_") and os.path.isdir(os.path.join(REPO_ROOT, "data_" + name[len("config_"):])):
+        paths.append("data_" + name[len("config_"):])
+    return paths
+
+
+def train(config, models_dir, name):
+    start = time.perf_counter()
+    subprocess.run(["rasa", "train", "--config", config, "--data", *training_data(name), "--out", models_dir,
+                    "--fixed-model-name", name],
+                   cwd=REPO_ROOT, check=True, stdout=subprocess.DEVNULL)
+    return time.perf_counter() - start
+
+
+def test_core(model_path, out_dir):
+    """Runs ``rasa test core`` on data/stories.yml and returns the number of stories that failed."""
+    subprocess.run(["rasa", "test", "core", "--model", model_path, "--stories", "data/stories.yml",
+                    "--out", out_dir], cwd=REPO_ROOT, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    failed_path = os.path.join(out_dir, "failed_test_stories.yml")
+    if not os.path.exists(failed_path):
+        return {"error": "rasa test core wrote no results"}
+    with open(failed_path, encoding="utf-8") as f:
+        failed = sum(1 for line in f if line.lstrip().startswith("- story:"))
+    return {"failed_stories": failed}
+
+
+def evaluate_config(config, args, models_dir):
+    name = os.path.splitext(os.path.basename(config))[0]
+    model_path = os.path.join(models_dir, f"{name}.tar.gz")
+    result = {"config": config}
+    if not os.path.exists(model_path):
+        result["train_s"] = train(os.path.join(REPO_ROOT, config), models_dir, name)
+    result["model_mb"] = os.path.getsize(model_path) / 1024 / 1024
+
+    out = subprocess.run([sys.executable, os.path.abspath(__file__), "--worker", model_path,
+                          "--eval-file", args.eval_file, "--repeat", str(args.repeat)],
+                         cwd=REPO_ROOT, capture_output=True, text=True)
+    if out.returncode != 0:
+        result["error"] = (out.stderr.strip().splitlines() or ["evaluation failed"])[-1]
+        return result
+    result.update(json.loads(out.stdout.strip().splitlines()[-1]))
+
+    recalls = result["nlu"]["per_intent_recall"]
+    result["meets_accuracy_budget"] = all(recalls.get(i, 0.0) >= args.min_accuracy for i in KEY_INTENTS)
+    if not args.skip_core:
+        with tempfile.TemporaryDirectory() as out_dir:
+            result["core"] = test_core(model_path, out_dir)
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0],
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--configs", default="config.yml,config_fast.yml")
+    parser.add_argument("--models-dir", help="reuse/write trained models here (default: a temporary directory)")
+    parser.add_argument("--eval-file", default=EVAL_FILE)
+    parser.add_argument("--repeat", type=int, default=3, help="passes over the evaluation set for latency")
+    parser.add_argument("--min-accuracy", type=float, default=0.8,
+                        help="required recall for inform_interest/strength/subject")
+    parser.add_argument("--skip-core", action="store_true", help="do not run rasa test core")
+    parser.add_argument("--fail", action="store_true", help="exit with status 1 if a config misses the budget")
+    parser.add_argument("-o", "--output", help="write results as JSON to this file")
+    parser.add_argument("--worker", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        worker(args.worker, args.eval_file, args.repeat)
+        return
+
+    with tempfile.TemporaryDirectory() as tmp:
+        models_dir = args.models_dir or tmp
+        os.makedirs(models_dir, exist_ok=True)
+        results = {c: evaluate_config(c, args, models_dir) for c in args.configs.split(",")}
+
+    write_results({"benchmark": "rasa_configs", "min_accuracy": args.min_accuracy, "configs": results},
+                  args.output)
+    if args.fail and not all(r.get("meets_accuracy_budget") for r in results.values()):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+"""Compares the old and the streaming resume ingestion on large generated PDFs.
+
+    python benchmarks/bench_resume_ingestion.py --pages 50 --repeat 3 --output ingestion.json
+
+"legacy" reproduces the previous app.py path: write the upload to uploads/, read it
+back, concatenate every page with ``text +=`` and JSON-encode the full text for
+Rasa. "streaming" is resume_ingestion.summarize_resume on the in-memory buffer.
+Peak Python memory is measured with tracemalloc.
+"""
+import argparse
+import io
+import json
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+from benchmarks.common import write_results  # noqa: E402
+from resume_ingestion import summarize_resume  # noqa: E402
+
+_VOCAB = (
+    "python java sql data analysis machine learning statistics cloud aws docker kubernetes "
+    "project management leadership communication teamwork marketing finance design figma "
+    "research biology chemistry patient care policy law psychology customer stakeholder "
+    "developed implemented improved managed delivered reduced increased built designed led"
+).split()
+
+
+def make_pdf(pages: int, lines_per_page: int = 45, seed: int = 0) -> bytes:
+    """Builds a text-heavy PDF CV in memory with reportlab."""
+    from reportlab.lib.pagesizes import letter
+    from reportlab.pdfgen import canvas
+
+    rng = random.Random(seed)
+    buffer = io.BytesIO()
+    c = canvas.Canvas(buffer, pagesize=letter)
+    _, height = letter
+    for _ in range(pages):
+        y = height - 50
+        for _ in range(lines_per_page):
+            c.drawString(40, y, " ".join(rng.choice(_VOCAB) for _ in range(14)))
+            y -= 15
+        c.showPage()
+    c.save()
+    return buffer.getvalue()
+
+
+def legacy_ingest(pdf_bytes: bytes, upload_dir: str) -> str:
+    import PyPDF2
+
+    file_path = os.path.join(upload_dir, "resume.pdf")
+    with open(file_path, "wb") as f:
+        f.write(pdf_bytes)
+    text = ""
+    with open(file_path, "rb") as f:
+        reader = PyPDF2.PdfReader(f)
+        for page in reader.pages:
+            text += page.extract_text() or ""
+    os.remove(file_path)
+    return "/inform_resume" + json.dumps({"resume_keywords": text.replace('"', ' ')})
+
+
+def streaming_ingest(pdf_bytes: bytes, _upload_dir: str, max_pages: int = 50) -> str:
+    upload = io.BytesIO(pdf_bytes)
+    summary = summarize_resume(upload, "resume.pdf", max_pages=max_pages)
+    return "/inform_resume" + json.dumps({"resume_keywords": summary})
+
+
+def run(fn, pdf_bytes: bytes, repeat: int) -> dict:
+    times, peaks, payload = [], [], ""
+    with tempfile.TemporaryDirectory() as upload_dir:
+        for _ in range(repeat):
+            tracemalloc.start()
+            start = time.perf_counter()
+            payload = fn(pdf_bytes, upload_dir)
+            times.append(time.perf_counter() - start)
+            peaks.append(tracemalloc.get_traced_memory()[1])
+            tracemalloc.stop()
+    return {
+        "median_s": statistics.median(times),
+        "peak_mem_mb": max(peaks) / 1024 / 1024,
+        "payload_kb": len(payload.encode("utf-8")) / 1024,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--pages", type=int, default=50)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--output", help="write results as JSON to this file")
+    args = parser.parse_args()
+
+    pdf_bytes = make_pdf(args.pages)
+    results = {
+        "pages": args.pages,
+        "pdf_kb": len(pdf_bytes) / 1024,
+        "legacy": run(legacy_ingest, pdf_bytes, args.repeat),
+        # Lift the page cap so both paths read the whole document.
+        "streaming": run(lambda data, d: streaming_ingest(data, d, max_pages=args.pages), pdf_bytes, args.repeat),
+    }
+    write_results(results, args.output)
+
+
+if __name__ == "__main__":
+    main()
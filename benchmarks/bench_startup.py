@@ -0,0 +1,78 @@
+"""Measures how long it takes to import the actions module in a fresh interpreter.
+
+Compare the working tree against an older commit:
+
+    python benchmarks/bench_startup.py --ref HEAD~1 --repeat 10 --output startup.json
+
+Each sample is a new ``python -c "import actions.actions"`` process, so the
+numbers include everything a restarted action-server worker pays before it can
+register its actions (NLTK checks, sklearn/reportlab imports, database setup).
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+from benchmarks.common import write_results  # noqa: E402
+
+_SNIPPET = (
+    "import time; t = time.perf_counter(); import actions.actions; "
+    "print(time.perf_counter() - t)"
+)
+
+
+def measure(tree: str, repeat: int) -> dict:
+    samples = []
+    for _ in range(repeat):
+        out = subprocess.run([sys.executable, "-c", _SNIPPET], cwd=tree, capture_output=True, text=True)
+        if out.returncode != 0:
+            # e.g. the old tree tries to download NLTK data without network access
+            errors = [line for line in out.stderr.splitlines() if "Error" in line] or ["import failed"]
+            return {"error": errors[-1].strip()}
+        samples.append(float(out.stdout.strip().splitlines()[-1]))
+    samples.sort()
+    return {
+        "samples_s": samples,
+        "min_s": samples[0],
+        "median_s": statistics.median(samples),
+        "max_s": samples[-1],
+    }
+
+
+def measure_ref(ref: str, repeat: int) -> dict:
+    """Checks ``ref`` out into a temporary worktree and measures it there."""
+    with tempfile.TemporaryDirectory() as tmp:
+        tree = os.path.join(tmp, "tree")
+        subprocess.run(["git", "worktree", "add", "--detach", tree, ref], cwd=REPO_ROOT,
+                       check=True, capture_output=True)
+        try:
+            return measure(tree, repeat)
+        finally:
+            subprocess.run(["git", "worktree", "remove", "--force", tree], cwd=REPO_ROOT,
+                           capture_output=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--ref", help="git ref to compare against (e.g. a commit before the change)")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--output", help="write results as JSON to this file")
+    args = parser.parse_args()
+
+    results = {"python": sys.version.split()[0], "current": measure(REPO_ROOT, args.repeat)}
+    if args.ref:
+        results["ref"] = args.ref
+        results["baseline"] = measure_ref(args.ref, args.repeat)
+        if "median_s" in results["baseline"]:
+            results["speedup"] = results["baseline"]["median_s"] / results["current"]["median_s"]
+
+    write_results(results, args.output)
+
+
+if __name__ == "__main__":
+    main()
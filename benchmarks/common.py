@@ -0,0 +1,78 @@
+"""Shared helpers for the benchmark scripts: latency summaries and JSON results.
+
+Every result file records the git revision it was measured on, so two files can
+be compared with ``python benchmarks/compare.py old.json new.json``.
+"""
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def percentile(samples, q):
+    """Nearest-rank percentile (q in 0-100) of a non-empty sample list."""
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(round(q / 100 * (len(ordered) - 1))))]
+
+
+def summarize(latencies_ms, wall_s=None):
+    """p50/p95/p99/mean/max of latencies in ms, plus throughput when the wall time is known."""
+    if not latencies_ms:
+        return {"count": 0}
+    summary = {
+        "count": len(latencies_ms),
+        "p50_ms": statistics.median(latencies_ms),
+        "p95_ms": percentile(latencies_ms, 95),
+        "p99_ms": percentile(latencies_ms, 99),
+        "mean_ms": statistics.fmean(latencies_ms),
+        "max_ms": max(latencies_ms),
+    }
+    if wall_s:
+        summary["throughput_per_s"] = len(latencies_ms) / wall_s
+    return summary
+
+
+def time_calls(fn, repeat, warmup=1):
+    """Calls ``fn()`` ``warmup`` + ``repeat`` times and returns the timed latencies in ms."""
+    for _ in range(warmup):
+        fn()
+    latencies = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        latencies.append((time.perf_counter() - start) * 1000)
+    return latencies
+
+
+def git_revision():
+    try:
+        out = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=REPO_ROOT,
+                             capture_output=True, text=True, check=True)
+        dirty = subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"], cwd=REPO_ROOT,
+                               capture_output=True, text=True).stdout.strip()
+        return out.stdout.strip() + ("-dirty" if dirty else "")
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def write_results(results, output=None):
+    """Adds run metadata, prints the JSON and optionally writes it to ``output``."""
+    results = {
+        "revision": git_revision(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        **results,
+    }
+    text = json.dumps(results, indent=2)
+    if output:
+        with open(output, "w") as f:
+            f.write(text)
+    print(text)
+    return results
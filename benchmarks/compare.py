@@ -0,0 +1,76 @@
+"""Compares two benchmark result files and flags regressions.
+
+    python benchmarks/compare.py baseline.json candidate.json --threshold 10 --fail
+
+Every numeric field found in both files is compared:
+- times (``*_ms``, ``*_s``) are better when lower
+- throughput (``*per_s``, ``*per_second``) and accuracy are better when higher
+
+A change worse than --threshold percent is marked REGRESSION. With --fail the
+exit code is 1 if any regression was found, for use in CI.
+"""
+import argparse
+import json
+import sys
+
+SKIP = {"wall_s", "repeat", "count", "cpus", "concurrency", "conversations", "turns", "domains", "profiles"}
+
+
+def flatten(data, prefix=""):
+    for key, value in data.items():
+        path = f"{prefix}.{key}" if prefix else key
+        if isinstance(value, dict):
+            yield from flatten(value, path)
+        elif isinstance(value, (int, float)) and not isinstance(value, bool) and key not in SKIP:
+            yield path, key, float(value)
+
+
+def direction(key):
+    """+1 if higher is better, -1 if lower is better, 0 if the field is not a performance number."""
+    if "per_s" in key or "per_second" in key or "accuracy" in key:
+        return 1
+    if key.endswith("_ms") or key.endswith("_s") or key.endswith("_mb") or key.endswith("_kb"):
+        return -1
+    return 0
+
+
+def compare(old, new, threshold):
+    rows = []
+    new_values = {path: value for path, _, value in flatten(new)}
+    for path, key, before in flatten(old):
+        sign = direction(key)
+        if not sign or path not in new_values:
+            continue
+        after = new_values[path]
+        change = (after - before) / before * 100 if before else 0.0
+        rows.append((path, before, after, change, change * sign < -threshold))
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("baseline")
+    parser.add_argument("candidate")
+    parser.add_argument("--threshold", type=float, default=10.0, help="percent change that counts as a regression")
+    parser.add_argument("--fail", action="store_true", help="exit with status 1 on any regression")
+    args = parser.parse_args()
+
+    with open(args.baseline) as f:
+        old = json.load(f)
+    with open(args.candidate) as f:
+        new = json.load(f)
+
+    rows = compare(old, new, args.threshold)
+    print(f"{old.get('revision')} -> {new.get('revision')}")
+    width = max((len(r[0]) for r in rows), default=10)
+    for path, before, after, change, regressed in rows:
+        flag = "  REGRESSION" if regressed else ""
+        print(f"{path:<{width}}  {before:>12.3f}  {after:>12.3f}  {change:+7.1f}%{flag}")
+    regressions = sum(r[4] for r in rows)
+    print(f"{regressions} regression(s) beyond {args.threshold:.0f}%")
+    if args.fail and regressions:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,134 @@
+"""Local stand-in for the Gemini API, for load tests that must not hit the network.
+
+    python benchmarks/stub_gemini.py --port 8765 --latency-ms 400
+    GEMINI_API_KEY=stub GEMINI_API_BASE=http://localhost:8765 rasa run actions
+
+Answers ``models/<model>:generateContent`` with a canned response after a fixed
+(optionally jittered) delay, and ``:streamGenerateContent?alt=sse`` with the same
+text split into Server-Sent Events. The text depends on the prompt, so response
+caching in the action server behaves as it would against the real API.
+"""
+import argparse
+import hashlib
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+_WORDS = (
+    "the role involves planning reviewing building testing data design meetings clients "
+    "reports analysis research team project deadline feedback strategy learning skills"
+).split()
+
+
+def canned_text(prompt, words):
+    """Deterministic filler text for a prompt; comma-separated when a list is asked for."""
+    rng = random.Random(hashlib.sha256(prompt.encode("utf-8")).digest())
+    if "comma-separated" in prompt:
+        return ", ".join(rng.sample(_WORDS, 15))
+    return " ".join(rng.choice(_WORDS) for _ in range(words)) + "."
+
+
+class StubGemini(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, latency_ms=300.0, jitter_ms=50.0, words=120, chunks=12):
+        super().__init__(address, _Handler)
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.words = words
+        self.chunks = chunks
+        self.requests = 0
+        self._lock = threading.Lock()
+
+    @property
+    def url(self):
+        return f"http://{self.server_address[0]}:{self.server_address[1]}"
+
+    def delay(self):
+        return max(0.0, self.latency_ms + random.uniform(-self.jitter_ms, self.jitter_ms)) / 1000
+
+    def start(self):
+        threading.Thread(target=self.serve_forever, name="stub-gemini", daemon=True).start()
+        return self
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_POST(self):
+        server = self.server
+        with server._lock:
+            server.requests += 1
+        body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+        prompt = "".join(part.get("text", "") for content in body.get("contents", [])
+                         for part in content.get("parts", []))
+        text = canned_text(prompt, server.words)
+        path = self.path.split("?", 1)[0]
+
+        if path.endswith(":streamGenerateContent"):
+            self._stream(text)
+        elif path.endswith(":generateContent"):
+            time.sleep(server.delay())
+            self._send_json({"candidates": [{"content": {"parts": [{"text": text}]}}]})
+        else:
+            self._send_json({"error": {"message": "not found"}}, status=404)
+
+    def _send_json(self, payload, status=200):
+        data = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _stream(self, text):
+        server = self.server
+        words = text.split(" ")
+        size = max(1, len(words) // server.chunks)
+        pieces = [" ".join(words[i:i + size]) + " " for i in range(0, len(words), size)]
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        # The total delay is spread over the chunks, like a model emitting tokens.
+        pause = server.delay() / len(pieces)
+        try:
+            for piece in pieces:
+                time.sleep(pause)
+                event = json.dumps({"candidates": [{"content": {"parts": [{"text": piece}]}}]})
+                data = f"data: {event}\r\n\r\n".encode("utf-8")
+                self.wfile.write(b"%x\r\n%s\r\n" % (len(data), data))
+            self.wfile.write(b"0\r\n\r\n")
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_stub(host="127.0.0.1", port=0, **options):
+    """Starts the stub in a daemon thread; port 0 picks a free port (see ``.url``)."""
+    return StubGemini((host, port), **options).start()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency-ms", type=float, default=300.0, help="time to a full response")
+    parser.add_argument("--jitter-ms", type=float, default=50.0)
+    parser.add_argument("--words", type=int, default=120, help="length of generated answers")
+    args = parser.parse_args()
+
+    server = StubGemini((args.host, args.port), args.latency_ms, args.jitter_ms, args.words)
+    print(f"Stub Gemini listening on {server.url} (set GEMINI_API_BASE to this)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+# Streaming resume ingestion for the Streamlit app
+#
+# Text is extracted page by page straight from the in-memory upload, folded into
+# a term-frequency counter and dropped, so memory stays bounded no matter how long
+# the CV is. Only a compact keyword summary is sent to Rasa.
+#
+# The same pass runs the skill taxonomy (actions/skills.py) over the full text,
+# so skills that are mentioned once ("project management") are sent by their
+# canonical name even though the frequency summary would drop them.
+import codecs
+import os
+import re
+from collections import Counter
+
+MAX_PAGES = int(os.getenv("RESUME_MAX_PAGES", "30"))
+MAX_TEXT_BYTES = int(os.getenv("RESUME_MAX_BYTES", str(2 * 1024 * 1024)))
+TOP_TERMS = int(os.getenv("RESUME_TOP_TERMS", "60"))
+TOP_PHRASES = int(os.getenv("RESUME_TOP_PHRASES", "20"))
+
+_WORD = re.compile(r"[^\W\d_][\w+#.-]*[\w+#]|[^\W\d_]")
+
+# Small built-in list so the app does not need NLTK corpora just to summarise a CV.
+STOP_WORDS = frozenset("""
+a about above after again against all am an and any are as at be because been before being below
+between both but by can could did do does doing down during each etc few for from further had has
+have having he her here hers herself him himself his how i if in into is it its itself just me more
+most my myself no nor not now of off on once only or other our ours ourselves out over own same she
+should so some such than that the their theirs them themselves then there these they this those
+through to too under until up very was we were what when where which while who whom why will with
+would you your yours yourself yourselves also using used use including include includes within per
+via new well like one two three year years month months
+""".split())
+
+
+def iter_text_chunks(uploaded_file, file_name, max_pages=MAX_PAGES, max_bytes=MAX_TEXT_BYTES):
+    """Yields text from an uploaded PDF/TXT buffer one page (or block) at a time, up to the caps."""
+    emitted = 0
+    if file_name.lower().endswith(".pdf"):
+        import PyPDF2
+
+        uploaded_file.seek(0)
+        reader = PyPDF2.PdfReader(uploaded_file)
+        for i, page in enumerate(reader.pages):
+            if i >= max_pages or emitted >= max_bytes:
+                return
+            text = page.extract_text() or ""
+            # Extracted text is capped by characters, which is close enough to bytes for a limit.
+            text = text[:max_bytes - emitted]
+            emitted += len(text)
+            yield text
+    else:
+        uploaded_file.seek(0)
+        decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+        while emitted < max_bytes:
+            block = uploaded_file.read(min(64 * 1024, max_bytes - emitted))
+            if not block:
+                break
+            emitted += len(block)
+            yield decoder.decode(block)
+        yield decoder.decode(b"", final=True)
+
+
+def summarize_terms(chunks, top_terms=TOP_TERMS, top_phrases=TOP_PHRASES, skill_taxonomy=None):
+    """Folds text chunks into unigram/bigram counts and returns the most frequent ones.
+
+    With a ``skill_taxonomy``, also returns the canonical skills found in the text, most frequent first.
+    """
+    terms = Counter()
+    phrases = Counter()
+
+    def count(chunks):
+        previous = None
+        for chunk in chunks:
+            for match in _WORD.finditer(chunk.lower()):
+                word = match.group(0).strip(".-")
+                if word in STOP_WORDS or len(word) < 2:
+                    previous = None
+                    continue
+                terms[word] += 1
+                if previous is not None:
+                    phrases[f"{previous} {word}"] += 1
+                previous = word
+            if skill_taxonomy is not None:
+                yield from skill_tokenize(chunk)
+
+    # The skill matcher pulls tokens chunk by chunk, so the text is still never held whole.
+    if skill_taxonomy is not None:
+        from actions.skills import tokenize as skill_tokenize
+
+        skills = skill_taxonomy.matcher.find(count(chunks)).most_common()
+    else:
+        for _ in count(chunks):
+            pass
+        skills = []
+    # A phrase that occurs once is usually just two neighbouring words.
+    common_phrases = [(p, n) for p, n in phrases.most_common(top_phrases) if n > 1]
+    return terms.most_common(top_terms), common_phrases, skills
+
+
+def summarize_resume(uploaded_file, file_name, max_pages=MAX_PAGES, max_bytes=MAX_TEXT_BYTES):
+    """Returns a compact "term (count), ..." summary of a resume: canonical skills, then phrases, then terms."""
+    from actions.skills import get_skill_taxonomy
+
+    top_terms, top_phrases, skills = summarize_terms(
+        iter_text_chunks(uploaded_file, file_name, max_pages, max_bytes), skill_taxonomy=get_skill_taxonomy())
+    return ", ".join(f"{term} ({count})" for term, count in skills + top_phrases + top_terms)